@@ -0,0 +1,72 @@
+"""
+Benchmark of the validation of the CFDIs in ``tests/samples`` with every pydantic backend available.
+
+Each backend runs in its own interpreter (the backend is selected when ``cfdibills`` is imported, see
+``cfdibills.schemas.compat``): pydantic v1 always, and pydantic v2 only if it is the installed version. Both the
+validation of already normalized dicts and the whole ``read_xml`` are measured, along with their counterparts without
+validation (``validate=False``).
+
+Run from the root of the repository with the package installed (``pip install -e .``)::
+
+    python benchmarks/bench_backends.py
+"""
+import glob
+import os
+import subprocess
+import sys
+import timeit
+
+SAMPLES = "tests/samples/*.xml"
+REPEAT = 5
+NUMBER = 50
+
+
+def _report(name: str, timings: list, items: int):
+    best = min(timings) / NUMBER
+    print(f"  {name:<20} {best * 1e3:8.2f} ms/corpus {items / best:10.0f} CFDIs/s")
+
+
+def run_backend():
+    import pydantic
+
+    from cfdibills import read_xml
+    from cfdibills.io import _get_cfdi_with_version, _xml_to_json
+    from cfdibills.schemas.cfdi33 import CFDI33
+    from cfdibills.schemas.cfdi40 import CFDI40
+    from cfdibills.schemas.compat import PYDANTIC_V2, parse_model
+    from cfdibills.schemas.construct import build_model
+
+    models = {"3.3": CFDI33, "4.0": CFDI40}
+    paths, cfdis = [], []
+    for path in sorted(glob.glob(SAMPLES)):
+        cfdi, version = _get_cfdi_with_version(_xml_to_json(path))
+        if (model := models.get(version)) is not None:
+            paths.append(path)
+            cfdis.append((model, cfdi))
+    print(f"pydantic {pydantic.VERSION} ({'v2' if PYDANTIC_V2 else 'v1'} backend), {len(cfdis)} CFDIs")
+
+    validate = timeit.repeat(lambda: [parse_model(m, cfdi) for m, cfdi in cfdis], repeat=REPEAT, number=NUMBER)
+    _report("validation", validate, len(cfdis))
+    construct = timeit.repeat(lambda: [build_model(m, cfdi) for m, cfdi in cfdis], repeat=REPEAT, number=NUMBER)
+    _report("construction", construct, len(cfdis))
+    read = timeit.repeat(lambda: [read_xml(path) for path in paths], repeat=REPEAT, number=NUMBER)
+    _report("read_xml", read, len(paths))
+    trusted = timeit.repeat(lambda: [read_xml(path, validate=False) for path in paths], repeat=REPEAT, number=NUMBER)
+    _report("read_xml (trusted)", trusted, len(paths))
+
+
+def main():
+    import pydantic
+
+    backends = ["1", "2"] if pydantic.VERSION.startswith("2.") else ["1"]
+    for backend in backends:
+        env = dict(os.environ, CFDIBILLS_PYDANTIC=backend)
+        subprocess.run([sys.executable, __file__, "--backend"], env=env, check=True)
+        print()
+
+
+if __name__ == "__main__":
+    if "--backend" in sys.argv:
+        run_backend()
+    else:
+        main()
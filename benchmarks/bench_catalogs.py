@@ -0,0 +1,79 @@
+"""
+Benchmark of checking codes against the catalogs.
+
+A mix of valid and unknown codes is checked against ``UsoCFDI`` by calling the enum (catching the error of the unknown
+codes), which was the only way before ``cfdibills.catalogs``, and with ``validate_codes``. Then a synthetic catalog the
+size of "Clave Prod Serv" is written and checked in bulk, both read to memory and packed in a ``CatalogStore``.
+
+Run from the root of the repository with the package installed (``pip install -e .``)::
+
+    python benchmarks/bench_catalogs.py
+"""
+import os
+import tempfile
+import timeit
+
+from cfdibills.catalogs import (
+    CatalogEntry,
+    CatalogStore,
+    pack_catalog,
+    read_catalog,
+    validate_codes,
+    write_catalog,
+)
+from cfdibills.schemas.catalogs import UsoCFDI
+
+REPEAT = 5
+NUMBER = 20
+CODES = [member.value for member in UsoCFDI] * 200 + [f"X{i:02d}" for i in range(100)] * 50
+BIG_CATALOG_SIZE = 50_000
+
+
+def _call_enum(codes: list) -> list:
+    valid = []
+    for code in codes:
+        try:
+            UsoCFDI(code)
+            valid.append(True)
+        except ValueError:
+            valid.append(False)
+    return valid
+
+
+def _report(name: str, seconds: float, items: int):
+    print(f"  {name:<24} {seconds * 1e3:8.2f} ms {items / seconds:12.0f} codes/s")
+
+
+def main():
+    assert _call_enum(CODES) == validate_codes(UsoCFDI, CODES)
+    print(f"UsoCFDI, {len(CODES)} codes ({CODES.count('X00') * 100} unknown)")
+    enum = min(timeit.repeat(lambda: _call_enum(CODES), repeat=REPEAT, number=NUMBER)) / NUMBER
+    _report("calling the enum", enum, len(CODES))
+    bulk = min(timeit.repeat(lambda: validate_codes(UsoCFDI, CODES), repeat=REPEAT, number=NUMBER)) / NUMBER
+    _report("validate_codes", bulk, len(CODES))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "c_ClaveProdServ.tsv.gz")
+        write_catalog(path, (CatalogEntry(f"{i:08d}", f"Producto {i}") for i in range(0, BIG_CATALOG_SIZE * 2, 2)))
+        print(f"\nsynthetic catalog of {BIG_CATALOG_SIZE} codes, {os.path.getsize(path) / 1024:.0f} KiB")
+        read = min(timeit.repeat(lambda: read_catalog(path), repeat=REPEAT, number=1))
+        print(f"  {'read_catalog':<24} {read * 1e3:8.2f} ms")
+        catalog = read_catalog(path)
+        codes = [f"{i:08d}" for i in range(BIG_CATALOG_SIZE)]
+        bulk = min(timeit.repeat(lambda: validate_codes(catalog, codes), repeat=REPEAT, number=NUMBER)) / NUMBER
+        _report("validate_codes", bulk, len(codes))
+
+        packed = os.path.join(directory, "c_ClaveProdServ.bin")
+        pack_catalog(packed, catalog.entries.values())
+        print(f"\npacked in {os.path.getsize(packed) / 1024:.0f} KiB")
+        opened = min(timeit.repeat(lambda: CatalogStore(packed).close(), repeat=REPEAT, number=1))
+        print(f"  {'CatalogStore':<24} {opened * 1e3:8.2f} ms")
+        store = CatalogStore(packed)
+        assert validate_codes(store, codes) == validate_codes(catalog, codes)
+        bulk = min(timeit.repeat(lambda: validate_codes(store, codes), repeat=REPEAT, number=1))
+        _report("validate_codes", bulk, len(codes))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
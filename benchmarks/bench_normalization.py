@@ -0,0 +1,56 @@
+"""
+Micro-benchmark of the normalization of the keys of the CFDIs in ``tests/samples``.
+
+Compares converting every key with ``camel_to_snake`` (two regex substitutions per key) against looking it up with
+``_normalize_key`` (keys index generated from the schemas plus an LRU cache for unknown keys).
+
+Run from the root of the repository with the package installed (``pip install -e .``)::
+
+    python benchmarks/bench_normalization.py
+"""
+import glob
+import timeit
+
+from cfdibills.io import _normalize_key, _xml_to_json, normalize_dict_keys
+from cfdibills.schemas.naming import camel_to_snake
+
+SAMPLES = "tests/samples/*.xml"
+REPEAT = 5
+NUMBER = 200
+
+
+def _collect_keys(node, keys: list):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            keys.append(key[1:] if "@" in key else key.split(":")[-1])
+            _collect_keys(value, keys)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_keys(item, keys)
+    return keys
+
+
+def _report(name: str, timings: list, items: int):
+    best = min(timings) / NUMBER
+    print(f"{name:<30} {best * 1e6:10.1f} us/corpus {items / best / 1e6:8.2f} M keys/s")
+
+
+def main():
+    raw_cfdis = [_xml_to_json(path, normalize=False) for path in sorted(glob.glob(SAMPLES))]
+    keys: list = []
+    for raw in raw_cfdis:
+        _collect_keys(raw, keys)
+    print(f"{len(raw_cfdis)} CFDIs, {len(keys)} keys\n")
+
+    regex = timeit.repeat(lambda: [camel_to_snake(key) for key in keys], repeat=REPEAT, number=NUMBER)
+    lookup = timeit.repeat(lambda: [_normalize_key(key) for key in keys], repeat=REPEAT, number=NUMBER)
+    _report("camel_to_snake (regex)", regex, len(keys))
+    _report("_normalize_key (index)", lookup, len(keys))
+    print(f"speedup: {min(regex) / min(lookup):.1f}x\n")
+
+    normalize = timeit.repeat(lambda: [normalize_dict_keys(raw) for raw in raw_cfdis], repeat=REPEAT, number=NUMBER)
+    _report("normalize_dict_keys", normalize, len(keys))
+
+
+if __name__ == "__main__":
+    main()
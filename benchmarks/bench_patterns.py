@@ -0,0 +1,86 @@
+"""
+Benchmark of the validation of the strings constrained by a pattern in the CFDIs of ``tests/samples``.
+
+For every CFDI, its pattern-constrained strings (RFCs, texts, digits...) are validated with the types of
+``cfdibills.schemas.fields`` and with the ``constr(regex=...)`` they replaced, reporting the cost per CFDI. It runs
+with the pydantic v1 backend, as with pydantic v2 the patterns are matched by pydantic-core.
+
+Run from the root of the repository with the package installed (``pip install -e .``)::
+
+    python benchmarks/bench_patterns.py
+"""
+import glob
+import os
+import timeit
+
+os.environ["CFDIBILLS_PYDANTIC"] = "1"
+
+from cfdibills import read_xml  # noqa: E402
+from cfdibills.schemas.compat import (  # noqa: E402
+    BaseModel,
+    constr,
+    dump_model,
+    parse_model,
+)
+from cfdibills.schemas.patterns import _REPEATED_CLASS  # noqa: E402
+
+try:
+    from pydantic.v1 import create_model
+except ImportError:
+    from pydantic import create_model  # type: ignore
+
+SAMPLES = "tests/samples/*.xml"
+REPEAT = 5
+NUMBER = 1000
+
+
+def _previous_type(pattern_type: type) -> type:
+    """
+    ``constr`` as the pattern was declared before: unanchored regex with the lengths of the pattern.
+    """
+    min_length, max_length = pattern_type.min_length, pattern_type.max_length
+    if (repeated := _REPEATED_CLASS.fullmatch(pattern_type.pattern)) is not None:
+        min_length = int(repeated.group(2))
+        max_length = int(repeated.group(3) or min_length)
+    return constr(
+        pattern=pattern_type.pattern,
+        min_length=min_length,
+        max_length=max_length,
+        strip_whitespace=pattern_type.strip_whitespace,
+    )
+
+
+def _collect(instance: BaseModel, found: list):
+    """
+    Collects the type and value of every pattern-constrained string in ``instance`` and its nested models.
+    """
+    for name, field in instance.__fields__.items():
+        value = getattr(instance, name)
+        if hasattr(field.type_, "pattern") and isinstance(value, str):
+            found.append((field.type_, value))
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, BaseModel):
+                _collect(item, found)
+    return found
+
+
+def main():
+    before_total = after_total = 0.0
+    print(f"{'CFDI':<36} {'fields':>6} {'before (us)':>12} {'after (us)':>12}")
+    for path in sorted(glob.glob(SAMPLES)):
+        found = _collect(read_xml(path), [])
+        values = {f"f{i}": value for i, (_, value) in enumerate(found)}
+        after = create_model("After", **{f"f{i}": (cls, ...) for i, (cls, _) in enumerate(found)})
+        before = create_model("Before", **{f"f{i}": (_previous_type(cls), ...) for i, (cls, _) in enumerate(found)})
+        assert dump_model(parse_model(before, values)) == dump_model(parse_model(after, values))
+
+        before_time = min(timeit.repeat(lambda: parse_model(before, values), repeat=REPEAT, number=NUMBER)) / NUMBER
+        after_time = min(timeit.repeat(lambda: parse_model(after, values), repeat=REPEAT, number=NUMBER)) / NUMBER
+        before_total += before_time
+        after_total += after_time
+        print(f"{os.path.basename(path):<36} {len(found):>6} {before_time * 1e6:>12.1f} {after_time * 1e6:>12.1f}")
+    print(f"\nspeedup: {before_total / after_total:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
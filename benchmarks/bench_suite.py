@@ -0,0 +1,108 @@
+"""
+Benchmark suite of the reading of CFDIs, over synthetic CFDIs of ``corpus.py`` instead of the few ``tests/samples``.
+
+Measures ``read_xml`` and its steps (``normalize_dict_keys`` and ``_parse_cfdi``), the overhead of tracing it (see
+``cfdibills.tracing``), ``get_complemento`` and the tax helpers for CFDIs 3.3 and 4.0 of 1 to 5000 conceptos (set
+``CFDIBILLS_BENCH_SIZES=1,50000`` for others), reporting the stats of pytest-benchmark plus latency percentiles,
+throughput (conceptos and MB per second) and peak memory.
+
+Run from the root of the repository with the package and pytest-benchmark installed (``pip install -e .
+pytest-benchmark``)::
+
+    python -m pytest benchmarks/bench_suite.py
+
+To catch regressions, save a baseline on the base commit and compare against it on the new one::
+
+    python -m pytest benchmarks/bench_suite.py --benchmark-autosave
+    python -m pytest benchmarks/bench_suite.py --benchmark-compare --benchmark-compare-fail=median:10%
+"""
+import os
+
+import pytest
+from pytest import mark
+
+pytest.importorskip("pytest_benchmark")
+
+from corpus import COMPLEMENTOS, VERSIONS, generate_cfdi  # noqa: E402
+
+from cfdibills import read_xml  # noqa: E402
+from cfdibills.io import (  # noqa: E402
+    _get_cfdi_with_version,
+    _parse_cfdi,
+    _xml_to_json,
+    normalize_dict_keys,
+)
+from cfdibills.schemas.catalogs import Impuesto  # noqa: E402
+from cfdibills.schemas.complementos import get_complemento_model  # noqa: E402
+from cfdibills.tracing import Tracer, tracing  # noqa: E402
+
+#: Name of the environment variable with the number of conceptos of the CFDIs benchmarked, separated by commas
+SIZES_ENV_VAR = "CFDIBILLS_BENCH_SIZES"
+#: Number of conceptos of the CFDIs benchmarked
+SIZES = [int(size) for size in os.environ.get(SIZES_ENV_VAR, "1,100,5000").split(",")]
+
+
+@mark.parametrize("version", VERSIONS)
+def test_corpus_is_deterministic_and_valid(version):
+    options = dict(conceptos=3, partes=2, pedimentos=2, complementos=COMPLEMENTOS, seed=7)
+    xml = generate_cfdi(version, **options)
+    assert generate_cfdi(version, **options) == xml
+    cfdi = read_xml(xml)
+    assert len(cfdi.conceptos) == 3 and len(cfdi.conceptos[0].parte[1].informacion_aduanera) == 2
+    assert [type(complemento) for complemento in cfdi.complemento] == [
+        get_complemento_model(name) for name in COMPLEMENTOS
+    ]
+    assert cfdi.sub_total == sum(concepto.importe for concepto in cfdi.conceptos)
+
+
+@mark.parametrize("conceptos", SIZES)
+@mark.parametrize("version", VERSIONS)
+@mark.parametrize("validate", [True, False], ids=["validated", "not-validated"])
+def test_read_xml(measure, xml, version, conceptos, validate):
+    content = xml(version, conceptos)
+    measure(read_xml, content, False, validate, items=conceptos, size=len(content))
+
+
+@mark.parametrize("conceptos", SIZES)
+@mark.parametrize("version", VERSIONS)
+def test_normalize_dict_keys(measure, xml, version, conceptos):
+    content = xml(version, conceptos)
+    measure(normalize_dict_keys, _xml_to_json(content, normalize=False), items=conceptos, size=len(content))
+
+
+@mark.parametrize("conceptos", SIZES)
+@mark.parametrize("version", VERSIONS)
+@mark.parametrize("validate", [True, False], ids=["validated", "not-validated"])
+def test_parse_cfdi(measure, xml, version, conceptos, validate):
+    cfdi, _ = _get_cfdi_with_version(_xml_to_json(xml(version, conceptos)))
+    measure(_parse_cfdi, cfdi, version, False, validate, items=conceptos)
+
+
+@mark.parametrize("complemento", COMPLEMENTOS)
+def test_get_complemento(measure, xml, complemento):
+    cfdi = read_xml(xml("4.0", 1))
+    measure(cfdi.get_complemento, get_complemento_model(complemento))
+
+
+@mark.parametrize("version", VERSIONS)
+def test_tax_helpers(measure, xml, version):
+    cfdi = read_xml(xml(version, max(SIZES)))
+
+    def taxes():
+        return [
+            helper(impuesto)
+            for helper in (cfdi.get_total_transferred_tax, cfdi.get_total_withheld_tax)
+            for impuesto in Impuesto
+        ]
+
+    measure(taxes, items=2 * len(Impuesto))
+
+
+@mark.parametrize("traced", [False, True], ids=["not-traced", "traced"])
+def test_read_xml_tracing_overhead(measure, xml, traced):
+    content = xml("4.0", 100)
+    if not traced:
+        measure(read_xml, content, items=100, size=len(content))
+        return
+    with tracing(Tracer(keep=False)):
+        measure(read_xml, content, items=100, size=len(content))
@@ -0,0 +1,89 @@
+"""
+Fixtures of the benchmark suite (``bench_suite.py``), which needs ``pytest-benchmark``.
+
+Besides the stats of pytest-benchmark, every benchmark records the latency percentiles of its rounds, its throughput
+and the peak memory of a single call in its ``extra_info`` (saved with ``--benchmark-autosave`` or
+``--benchmark-json``), and they are summarized at the end of the session.
+"""
+import tracemalloc
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import pytest
+from corpus import COMPLEMENTOS, generate_cfdi
+
+#: Latency percentiles reported
+PERCENTILES = (50, 90, 99)
+
+_results: List[Tuple[str, dict]] = []
+
+
+def _percentile(sorted_data: Sequence[float], percentile: int) -> float:
+    # nearest-rank percentile, as there are few rounds of the slow benchmarks
+    rank = max(1, -(-percentile * len(sorted_data) // 100))
+    return sorted_data[rank - 1]
+
+
+def _peak_memory(function: Callable, *args: Any) -> int:
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """
+    Benchmarks ``function(*args)`` like the ``benchmark`` fixture, recording the percentiles, the throughput (in
+    ``items`` and bytes per second) and the peak memory.
+    """
+
+    def run(function: Callable, *args: Any, items: int = 1, size: Optional[int] = None) -> Any:
+        result = benchmark(function, *args)
+        if benchmark.stats is None:
+            # --benchmark-disable
+            return result
+        stats = benchmark.stats.stats
+        info = benchmark.extra_info
+        for percentile in PERCENTILES:
+            info[f"p{percentile}"] = _percentile(stats.sorted_data, percentile)
+        info["items_per_second"] = items / stats.mean
+        if size is not None:
+            info["mb_per_second"] = size / stats.mean / 1e6
+        info["peak_memory"] = _peak_memory(function, *args)
+        _results.append((request.node.name, info))
+        return result
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def xml():
+    """
+    XML of a synthetic CFDI of the given version and number of conceptos, generated once per session.
+    """
+    cache = {}
+
+    def get(version: str, conceptos: int) -> bytes:
+        if (version, conceptos) not in cache:
+            cache[version, conceptos] = generate_cfdi(
+                version, conceptos, partes=1, pedimentos=1, complementos=COMPLEMENTOS, seed=conceptos
+            )
+        return cache[version, conceptos]
+
+    return get
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.section("latency percentiles, throughput and peak memory")
+    percentiles = "".join(f"{f'p{percentile} (ms)':>11}" for percentile in PERCENTILES)
+    terminalreporter.write_line(f"{'benchmark':<52}{percentiles}{'items/s':>12}{'MB/s':>8}{'peak (MB)':>11}")
+    for name, info in _results:
+        values = "".join(f"{info[f'p{percentile}'] * 1e3:>11.3f}" for percentile in PERCENTILES)
+        mb_per_second = f"{info['mb_per_second']:>8.1f}" if "mb_per_second" in info else f"{'':>8}"
+        terminalreporter.write_line(
+            f"{name:<52}{values}{info['items_per_second']:>12.0f}{mb_per_second}{info['peak_memory'] / 1e6:>11.2f}"
+        )
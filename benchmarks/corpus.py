@@ -0,0 +1,275 @@
+"""
+Deterministic generator of synthetic CFDIs for the benchmarks.
+
+Generates CFDI 3.3 and 4.0 XMLs of any size, from a single concepto to tens of thousands, with every supported
+complemento and with ``Parte`` / ``InformacionAduanera`` nodes nested in every concepto. The same arguments (including
+``seed``) always produce the same bytes, so timings of different commits are comparable. Amounts are consistent: every
+importe is cantidad * valor unitario and the taxes of the comprobante are the sum of the ones of its conceptos.
+
+The values are nonsense, but valid for the schemas of ``cfdibills``. To write a corpus to disk, run from the root of
+the repository::
+
+    python benchmarks/corpus.py path/to/corpus --count 100 --conceptos 1000 --version 4.0
+"""
+import argparse
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+#: Versions of CFDI that can be generated
+VERSIONS = ("3.3", "4.0")
+#: Complementos that can be added to the CFDIs, by the normalized name of their node
+COMPLEMENTOS = ("timbre_fiscal_digital", "aerolineas", "certificadodedestruccion", "comercio_exterior")
+
+_NAMESPACES = {"3.3": "http://www.sat.gob.mx/cfd/3", "4.0": "http://www.sat.gob.mx/cfd/4"}
+_CENTS = Decimal("0.01")
+_START = datetime(2022, 1, 1)
+#: (ClaveProdServ, ClaveUnidad, Unidad, Descripcion) of the conceptos
+_PRODUCTS = (
+    ("01010101", "H87", "PIEZA", "ARTICULO DE PRUEBA"),
+    ("10101500", "KGM", "KILOGRAMO", "ANIMALES VIVOS DE GRANJA"),
+    ("43211500", "H87", "PIEZA", "COMPUTADORA PORTATIL"),
+    ("50202306", "LTR", "LITRO", "BEBIDA REFRESCANTE"),
+    ("80141628", "E48", "SERVICIO", "SERVICIO DE COMISIONES"),
+    ("95141904", "WEE", "SEMANA", "RENTA DE ESTRUCTURAS"),
+)
+#: (Impuesto, TasaOCuota) of the traslados and retenciones of the conceptos
+_TRASLADOS = (("002", Decimal("0.160000")), ("002", Decimal("0.080000")), ("003", Decimal("0.265000")))
+_RETENCIONES = (("001", Decimal("0.100000")), ("002", Decimal("0.106667")))
+
+_COMPLEMENTO_TEMPLATES = {
+    "aerolineas": (
+        '<aerolineas:Aerolineas xmlns:aerolineas="http://www.sat.gob.mx/aerolineas" Version="1.0" TUA="10" importe="1">'
+        '<aerolineas:OtrosCargos TotalCargos="30">'
+        '<aerolineas:Cargo CodigoCargo="A1" Importe="10"/><aerolineas:Cargo CodigoCargo="B1" Importe="20"/>'
+        "</aerolineas:OtrosCargos></aerolineas:Aerolineas>"
+    ),
+    "certificadodedestruccion": (
+        '<destruccion:certificadodedestruccion xmlns:destruccion="http://www.sat.gob.mx/certificadodestruccion" '
+        'Version="1.0" Serie="SERIE A" NumFolDesVeh="{folio:09d}">'
+        '<destruccion:VehiculoDestruido Marca="HONDA" TipooClase="1234" Año="2003" NumPlacas="123445" '
+        'NumFolTarjCir="12345678"/></destruccion:certificadodedestruccion>'
+    ),
+    "comercio_exterior": (
+        '<cce11:ComercioExterior xmlns:cce11="http://www.sat.gob.mx/ComercioExterior11" Version="1.1" '
+        'TipoOperacion="2" ClaveDePedimento="A1" CertificadoOrigen="0" Incoterm="FOB" Subdivision="0" '
+        'TipoCambioUSD="18.845100" TotalUSD="7463.46">'
+        '<cce11:Emisor><cce11:Domicilio Calle="CALLE DEL PAPEL" Estado="QUE" Pais="MEX" CodigoPostal="76224"/>'
+        "</cce11:Emisor>"
+        '<cce11:Receptor><cce11:Domicilio Calle="ZAPATA" Estado="DIF" Pais="MEX" CodigoPostal="01000"/>'
+        "</cce11:Receptor>"
+        '<cce11:Mercancias><cce11:Mercancia NoIdentificacion="A-123LFM" FraccionArancelaria="39011001" '
+        'ValorDolares="2076.00"/><cce11:Mercancia NoIdentificacion="A-RTGT-56" FraccionArancelaria="39012001" '
+        'ValorDolares="5387.46"/></cce11:Mercancias></cce11:ComercioExterior>'
+    ),
+    "timbre_fiscal_digital": (
+        '<tfd:TimbreFiscalDigital xmlns:tfd="http://www.sat.gob.mx/TimbreFiscalDigital" Version="1.1" UUID="{uuid}" '
+        'FechaTimbrado="{fecha}" RfcProvCertif="AAA010101AAA" SelloCFD="c2VsbG8=" '
+        'NoCertificadoSAT="30001000000400002495" SelloSAT="c2VsbG8="/>'
+    ),
+}
+
+
+def _pedimento(rng: random.Random) -> str:
+    return f"{rng.randrange(15, 23):02d}  {rng.randrange(10, 99):02d}  {rng.randrange(10000):04d}  {rng.randrange(10**7):07d}"
+
+
+def _concepto(
+    rng: random.Random, version: str, partes: int, pedimentos: int, taxes: Dict[Tuple[str, str, Decimal], Decimal]
+) -> Tuple[str, Decimal]:
+    """
+    XML of a random concepto and its importe. Its taxes are added to ``taxes`` (by their type, impuesto and tasa).
+    """
+    clave, clave_unidad, unidad, descripcion = rng.choice(_PRODUCTS)
+    cantidad = Decimal(rng.randrange(1, 1000))
+    valor_unitario = Decimal(rng.randrange(100, 10**6)) * _CENTS
+    importe = cantidad * valor_unitario
+    objeto_imp = ' ObjetoImp="02"' if version == "4.0" else ""
+    nodes = ["<cfdi:Impuestos><cfdi:Traslados>"]
+    impuesto, tasa = rng.choice(_TRASLADOS)
+    tax = (importe * tasa).quantize(_CENTS)
+    taxes["traslado", impuesto, tasa] = taxes.get(("traslado", impuesto, tasa), Decimal(0)) + tax
+    nodes.append(
+        f'<cfdi:Traslado Base="{importe}" Impuesto="{impuesto}" TipoFactor="Tasa" TasaOCuota="{tasa}" Importe="{tax}"/>'
+    )
+    nodes.append("</cfdi:Traslados>")
+    if rng.random() < 0.5:
+        impuesto, tasa = rng.choice(_RETENCIONES)
+        tax = (importe * tasa).quantize(_CENTS)
+        taxes["retencion", impuesto, tasa] = taxes.get(("retencion", impuesto, tasa), Decimal(0)) + tax
+        nodes.append(
+            f'<cfdi:Retenciones><cfdi:Retencion Base="{importe}" Impuesto="{impuesto}" TipoFactor="Tasa" '
+            f'TasaOCuota="{tasa}" Importe="{tax}"/></cfdi:Retenciones>'
+        )
+    nodes.append("</cfdi:Impuestos>")
+    nodes.extend(f'<cfdi:InformacionAduanera NumeroPedimento="{_pedimento(rng)}"/>' for _ in range(pedimentos))
+    for i in range(partes):
+        nodes.append(
+            f'<cfdi:Parte ClaveProdServ="{clave}" NoIdentificacion="P{i:05d}" Cantidad="1" Unidad="{unidad}" '
+            f'Descripcion="PARTE {i} DE {descripcion}">'
+        )
+        nodes.extend(f'<cfdi:InformacionAduanera NumeroPedimento="{_pedimento(rng)}"/>' for _ in range(pedimentos))
+        nodes.append("</cfdi:Parte>")
+    return (
+        f'<cfdi:Concepto ClaveProdServ="{clave}" NoIdentificacion="{rng.randrange(10**8):08d}" Cantidad="{cantidad}" '
+        f'ClaveUnidad="{clave_unidad}" Unidad="{unidad}" Descripcion="{descripcion}" ValorUnitario="{valor_unitario}" '
+        f'Importe="{importe}"{objeto_imp}>{"".join(nodes)}</cfdi:Concepto>',
+        importe,
+    )
+
+
+def generate_cfdi(
+    version: str = "4.0",
+    conceptos: int = 1,
+    partes: int = 0,
+    pedimentos: int = 0,
+    complementos: Sequence[str] = ("timbre_fiscal_digital",),
+    seed: int = 0,
+) -> bytes:
+    """
+    Generates the XML of a synthetic CFDI.
+
+    Parameters
+    ----------
+    version: str
+        Version of the CFDI, one of ``VERSIONS``
+    conceptos: int
+        Number of conceptos
+    partes: int
+        Number of ``Parte`` nodes of every concepto
+    pedimentos: int
+        Number of ``InformacionAduanera`` nodes of every concepto and of every one of its partes
+    complementos: Sequence[str]
+        Complementos of the CFDI, from ``COMPLEMENTOS``
+    seed: int
+        Seed of the random values. The same arguments always generate the same XML.
+
+    Returns
+    -------
+    bytes
+        XML of the CFDI, encoded in UTF-8
+    """
+    if version not in VERSIONS:
+        raise ValueError(f"Version '{version}' can't be generated. It must be one of {VERSIONS}.")
+    if unknown := set(complementos) - set(COMPLEMENTOS):
+        raise ValueError(f"Unknown complementos {sorted(unknown)}. They must be in {COMPLEMENTOS}.")
+    if conceptos < 1:
+        raise ValueError("A CFDI needs at least one concepto")
+    rng = random.Random(f"{version}-{seed}")
+    fecha = (_START + timedelta(seconds=rng.randrange(365 * 24 * 3600))).isoformat()
+    taxes: Dict[Tuple[str, str, Decimal], Decimal] = {}
+    nodes: List[str] = []
+    sub_total = Decimal(0)
+    for _ in range(conceptos):
+        node, importe = _concepto(rng, version, partes, pedimentos, taxes)
+        nodes.append(node)
+        sub_total += importe
+    transferred = sum((tax for (kind, _, _), tax in taxes.items() if kind == "traslado"), Decimal(0))
+    withheld = sum((tax for (kind, _, _), tax in taxes.items() if kind == "retencion"), Decimal(0))
+    retenciones: Dict[str, Decimal] = {}
+    for (kind, impuesto, _), tax in taxes.items():
+        if kind == "retencion":
+            retenciones[impuesto] = retenciones.get(impuesto, Decimal(0)) + tax
+    impuestos = [f'<cfdi:Impuestos TotalImpuestosTrasladados="{transferred}"']
+    if retenciones:
+        impuestos.append(f' TotalImpuestosRetenidos="{withheld}"><cfdi:Retenciones>')
+        impuestos.extend(
+            f'<cfdi:Retencion Impuesto="{impuesto}" Importe="{tax}"/>' for impuesto, tax in sorted(retenciones.items())
+        )
+        impuestos.append("</cfdi:Retenciones>")
+    else:
+        impuestos.append(">")
+    impuestos.append("<cfdi:Traslados>")
+    for (kind, impuesto, tasa), tax in sorted(taxes.items()):
+        if kind == "traslado":
+            base = f' Base="{(tax / tasa).quantize(_CENTS)}"' if version == "4.0" else ""
+            impuestos.append(
+                f'<cfdi:Traslado{base} Impuesto="{impuesto}" TipoFactor="Tasa" TasaOCuota="{tasa}" Importe="{tax}"/>'
+            )
+    impuestos.append("</cfdi:Traslados></cfdi:Impuestos>")
+    uuid_ = uuid.UUID(int=rng.getrandbits(128), version=4)
+    complemento = "".join(
+        _COMPLEMENTO_TEMPLATES[name].format(uuid=uuid_, fecha=fecha, folio=seed) for name in complementos
+    )
+    if version == "4.0":
+        exportacion = ' Exportacion="01"'
+        receptor = (
+            '<cfdi:Receptor Rfc="BASJ600902KL9" Nombre="JUANITO BANANAS DE LA SIERRA" DomicilioFiscalReceptor="06300" '
+            'RegimenFiscalReceptor="612" UsoCFDI="G03"/>'
+        )
+    else:
+        exportacion = ""
+        receptor = '<cfdi:Receptor Rfc="BASJ600902KL9" Nombre="JUANITO BANANAS DE LA SIERRA" UsoCFDI="G03"/>'
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<cfdi:Comprobante xmlns:cfdi="{_NAMESPACES[version]}" '
+        f'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" Version="{version}" Serie="A" Folio="{seed}" '
+        f'Fecha="{fecha}" FormaPago="03" NoCertificado="30001000000400002434" Certificado="Y2VydGlmaWNhZG8=" '
+        f'Sello="c2VsbG8=" SubTotal="{sub_total}" Moneda="MXN" Total="{sub_total + transferred - withheld}" '
+        f'TipoDeComprobante="I"{exportacion} MetodoPago="PUE" LugarExpedicion="06300">'
+        '<cfdi:Emisor Rfc="AAA010101AAA" Nombre="ESCUELA KEMPER URGATE" RegimenFiscal="601"/>'
+        f'{receptor}<cfdi:Conceptos>{"".join(nodes)}</cfdi:Conceptos>{"".join(impuestos)}'
+        f"<cfdi:Complemento>{complemento}</cfdi:Complemento></cfdi:Comprobante>"
+    )
+    return xml.encode("utf-8")
+
+
+def write_corpus(directory: str, count: int, version: Optional[str] = None, **options) -> List[str]:
+    """
+    Writes ``count`` synthetic CFDIs (with seeds 0 to ``count - 1``) to ``directory``.
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the XMLs, created if it doesn't exist
+    count: int
+        Number of CFDIs
+    version: Optional[str]
+        Version of the CFDIs. By default, they alternate between the versions of ``VERSIONS``.
+    **options
+        Other arguments of ``generate_cfdi``
+
+    Returns
+    -------
+    List[str]
+        Paths of the XMLs written
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for seed in range(count):
+        path = os.path.join(directory, f"cfdi-{seed:06d}.xml")
+        with open(path, "wb") as f:
+            f.write(generate_cfdi(version or VERSIONS[seed % len(VERSIONS)], seed=seed, **options))
+        paths.append(path)
+    return paths
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Writes a corpus of synthetic CFDIs.")
+    parser.add_argument("directory", help="directory of the XMLs")
+    parser.add_argument("--count", type=int, default=100, help="number of CFDIs")
+    parser.add_argument("--version", choices=VERSIONS, help="version of the CFDIs (alternated by default)")
+    parser.add_argument("--conceptos", type=int, default=1, help="conceptos of every CFDI")
+    parser.add_argument("--partes", type=int, default=0, help="partes of every concepto")
+    parser.add_argument("--pedimentos", type=int, default=0, help="pedimentos of every concepto and parte")
+    parser.add_argument(
+        "--complementos", nargs="*", choices=COMPLEMENTOS, default=["timbre_fiscal_digital"], help="complementos"
+    )
+    args = parser.parse_args(argv)
+    paths = write_corpus(
+        args.directory,
+        args.count,
+        args.version,
+        conceptos=args.conceptos,
+        partes=args.partes,
+        pedimentos=args.pedimentos,
+        complementos=args.complementos,
+    )
+    print(f"{len(paths)} CFDIs written to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Load test of the verification of CFDIs against the local stand-in of SAT's web service (``cfdibills.testing``).
+
+Starts a ``SATStandIn`` with the given latency and error rate and verifies the same CFDIs with every client of
+``cfdibills``: sequentially with ``verify``, in a pool of threads with ``verify_many`` and with ``verify_many_async``,
+reporting for every one its throughput, the percentiles of the latency of the calls that succeeded and the errors. No
+request reaches SAT. With ``--attempts`` or ``--rate``, the calls go through a ``cfdibills.resilience.Resilience``
+(retries with backoff, rate limit and circuit breaker) whose metrics are reported too.
+
+Run from the root of the repository with the package installed (plus ``httpx`` for the asynchronous client)::
+
+    python benchmarks/load_sat.py --requests 500 --latency 0.05 0.2 --error-rate 0.01 --concurrency 20
+    python benchmarks/load_sat.py --error-rate 0.2 --error-status 503 --attempts 5 --rate 100
+"""
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from cfdibills import verify, verify_many
+from cfdibills.api import SATConsultaResponse
+from cfdibills.io import VerificationKey
+from cfdibills.resilience import Resilience, RetryPolicy
+from cfdibills.testing import ESTADOS, SATStandIn
+
+#: Latency percentiles reported
+PERCENTILES = (50, 90, 99)
+
+Results = List[Union[SATConsultaResponse, BaseException]]
+
+
+def _keys(count: int) -> List[VerificationKey]:
+    return [
+        VerificationKey(f"00000000-0000-4000-8000-{i:012d}", "AAA010101AAA", "XAXX010101000", Decimal(i), "4.0")
+        for i in range(count)
+    ]
+
+
+def _percentile(sorted_data: Sequence[float], percentile: int) -> float:
+    rank = max(1, -(-percentile * len(sorted_data) // 100))
+    return sorted_data[rank - 1]
+
+
+def _verify(
+    key: VerificationKey, url: str, resilience: Optional[Resilience]
+) -> Union[SATConsultaResponse, BaseException]:
+    try:
+        return verify(key, url=url, resilience=resilience)
+    except Exception as error:
+        return error
+
+
+def run_sequential(
+    keys: List[VerificationKey], url: str, concurrency: int, resilience: Optional[Resilience] = None
+) -> Results:
+    return [_verify(key, url, resilience) for key in keys]
+
+
+def run_threaded(
+    keys: List[VerificationKey], url: str, concurrency: int, resilience: Optional[Resilience] = None
+) -> Results:
+    return verify_many(keys, max_workers=concurrency, url=url, resilience=resilience)
+
+
+def run_async(
+    keys: List[VerificationKey], url: str, concurrency: int, resilience: Optional[Resilience] = None
+) -> Results:
+    from cfdibills.verifiers import verify_many_async
+
+    return asyncio.run(
+        verify_many_async(keys, concurrency=concurrency, return_exceptions=True, url=url, resilience=resilience)
+    )
+
+
+#: Clients load-tested, by name
+CLIENTS: Dict[str, Callable[[List[VerificationKey], str, int, Optional[Resilience]], Results]] = {
+    "sequential": run_sequential,
+    "threaded": run_threaded,
+    "async": run_async,
+}
+
+
+def report(name: str, results: Results, elapsed: float) -> str:
+    """
+    Line of the report of a client: throughput, latency percentiles (in ms) and errors.
+    """
+    latencies = sorted(
+        result.timings.build + result.timings.network + result.timings.parse
+        for result in results
+        if isinstance(result, SATConsultaResponse) and result.timings is not None
+    )
+    percentiles = "".join(
+        f"{_percentile(latencies, percentile) * 1e3 if latencies else float('nan'):>11.1f}"
+        for percentile in PERCENTILES
+    )
+    errors = sum(isinstance(result, BaseException) for result in results)
+    return f"{name:<12}{len(results) / elapsed:>12.1f}{percentiles}{errors:>8}"
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Load-tests the verification of CFDIs against a stand-in of SAT.")
+    parser.add_argument("--requests", type=int, default=200, help="CFDIs verified by every client")
+    parser.add_argument(
+        "--latency", type=float, nargs="+", default=[0.05], help="seconds of latency, or their min and max"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--concurrency", type=int, default=10, help="threads or concurrent requests")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of the errors")
+    parser.add_argument("--attempts", type=int, default=1, help="max attempts of every call (1 = no retries)")
+    parser.add_argument("--rate", type=float, help="max calls per second to the stand-in")
+    parser.add_argument("--estado", choices=list(ESTADOS), default="Vigente", help="status answered")
+    parser.add_argument("--clients", nargs="*", choices=list(CLIENTS), default=list(CLIENTS), help="clients tested")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the latencies and errors")
+    args = parser.parse_args(argv)
+    if len(args.latency) > 2:
+        parser.error("--latency takes a number of seconds or a min and a max")
+    latency = args.latency[0] if len(args.latency) == 1 else tuple(args.latency)
+
+    keys = _keys(args.requests)
+    print(f"{'client':<12}{'requests/s':>12}" + "".join(f"{f'p{p} (ms)':>11}" for p in PERCENTILES) + f"{'errors':>8}")
+    for name in args.clients:
+        resilience = None
+        if args.attempts > 1 or args.rate is not None:
+            resilience = Resilience(RetryPolicy(attempts=args.attempts), rate=args.rate, seed=args.seed)
+        with SATStandIn(
+            default=args.estado,
+            latency=latency,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            seed=args.seed,
+        ) as sat:
+            start = time.perf_counter()
+            results = CLIENTS[name](keys, sat.url, args.concurrency, resilience)
+            print(report(name, results, time.perf_counter() - start))
+        if resilience is not None:
+            print(f"{'':<12}{resilience.metrics}")
+
+
+if __name__ == "__main__":
+    main()
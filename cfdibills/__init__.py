@@ -1,8 +1,25 @@
 """
 cfdibills main package
+
+The functions exported here are imported the first time they are used, so importing ``cfdibills`` doesn't import
+pydantic, the schemas or the HTTP client.
 """
-from .io import read_xml
-from .verifiers import verify
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .io import read_many, read_xml
+    from .verifiers import verify, verify_many
+
+#: Module that defines every function exported by the package
+_LAZY_ATTRIBUTES = {
+    "read_many": "io",
+    "read_xml": "io",
+    "verify": "verifiers",
+    "verify_many": "verifiers",
+}
+
+__all__ = ["read_many", "read_xml", "verify", "verify_many"]
 
 
 def _get_version() -> str:
@@ -19,4 +36,17 @@ def _get_version() -> str:
         return f.read().strip()
 
 
-__version__ = _get_version()
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        value = _get_version()
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # cached, so __getattr__ is not called again for this name
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES, "__version__"})
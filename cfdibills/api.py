@@ -2,11 +2,60 @@
 Definition of the SAT's API used to verify CFDIs.
 """
 
-from dataclasses import dataclass
-from typing import Optional
+import os
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from xml.parsers import expat
 
-import requests
-import xmltodict
+from cfdibills.errors import SATServiceError
+from cfdibills.tracing import get_tracer
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+#: URL of SAT's ConsultaCFDIService
+SAT_URL = "https://consultaqr.facturaelectronica.sat.gob.mx/ConsultaCFDIService.svc?wsdl"
+#: Name of the environment variable with the URL of the ConsultaCFDIService to call instead of ``SAT_URL`` (like a
+#: proxy or the stand-in of ``cfdibills.testing``)
+SAT_URL_ENV_VAR = "CFDIBILLS_SAT_URL"
+_SOAP_HEADERS = {
+    "content-type": 'text/xml;charset="utf-8"',
+    "SOAPAction": "http://tempuri.org/IConsultaCFDIService/Consulta",
+}
+#: Default number of seconds to wait for SAT's web service
+DEFAULT_TIMEOUT = 30.0
+#: Default max number of connections kept open by the async client
+DEFAULT_MAX_CONNECTIONS = 20
+_ENVELOPE_TEMPLATE = (
+    b'<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tem="http://tempuri.org/">'
+    b"<soapenv:Header/><soapenv:Body><tem:Consulta><tem:expresionImpresa>"
+    b"<![CDATA[?re=%s&rr=%s&tt=%s&id=%s]]>"
+    b"</tem:expresionImpresa></tem:Consulta></soapenv:Body></soapenv:Envelope>"
+)
+#: Fields of ConsultaResult mapped to the attributes of SATConsultaResponse
+_RESULT_FIELDS = {
+    "CodigoEstatus": "codigo_estatus",
+    "EsCancelable": "es_cancelable",
+    "Estado": "estado",
+    "EstatusCancelacion": "estatus_cancelacion",
+    "ValidacionEFOS": "validacion_efos",
+}
+
+
+@dataclass
+class SATTimings:
+    """
+    Seconds spent in every phase of a call to SAT's web service.
+    """
+
+    #: Building the SOAP envelope
+    build: float
+    #: Sending the request and waiting for the response
+    network: float
+    #: Parsing the response
+    parse: float
 
 
 @dataclass
@@ -27,37 +76,129 @@ class SATConsultaResponse:
     estatus_cancelacion: Optional[str]
     #: Validación EFOS
     validacion_efos: str
+    #: Time spent in every phase of the call that got this response (not set when it comes from a cache)
+    timings: Optional[SATTimings] = field(default=None, compare=False, repr=False)
+
+
+def sat_url(url: Optional[str] = None) -> str:
+    """
+    URL of the ConsultaCFDIService to call: ``url`` when given, else the one in the environment variable
+    ``CFDIBILLS_SAT_URL``, else SAT's (``SAT_URL``).
+    """
+    return url or os.environ.get(SAT_URL_ENV_VAR) or SAT_URL
+
+
+def _build_envelope(uuid: str, rfc_emisor: str, rfc_receptor: str, total_facturado: float) -> bytes:
+    values = (rfc_emisor, rfc_receptor, total_facturado, uuid)
+    return _ENVELOPE_TEMPLATE % tuple(str(value).encode() for value in values)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    # only the delay in seconds is supported, not the HTTP date
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
 
 
-def _call_sat(uuid: str, rfc_emisor: str, rfc_receptor: str, total_facturado: float) -> dict:
-    """
-    Sends a SOAP request to SAT's web service to get the status of a CFDI
-    """
-    body = f"""
-    <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tem="http://tempuri.org/">
-        <soapenv:Header/>
-        <soapenv:Body>
-            <tem:Consulta>
-                <!--Optional:-->
-                <tem:expresionImpresa>
-                    <![CDATA[?re={rfc_emisor}&rr={rfc_receptor}&tt={total_facturado}&id={uuid}]]>
-                </tem:expresionImpresa>
-            </tem:Consulta>
-        </soapenv:Body>
-    </soapenv:Envelope>
-    """
-    url = "https://consultaqr.facturaelectronica.sat.gob.mx/ConsultaCFDIService.svc?wsdl"
-    headers = {
-        "content-type": 'text/xml;charset="utf-8"',
-        "SOAPAction": "http://tempuri.org/IConsultaCFDIService/Consulta",
-    }
-    response = requests.post(url, data=body, headers=headers)
+def _check_status(response: Any) -> None:
+    """
+    Raises a ``SATServiceError`` if the response of ``requests`` or ``httpx`` is not successful.
+    """
     if response.status_code != 200:
-        raise ValueError(f"An error occurred when verifying with SAT. Response: {response.text}")
-    return xmltodict.parse(response.content)
+        raise SATServiceError(
+            f"An error occurred when verifying with SAT. Response: {response.text}",
+            status_code=response.status_code,
+            retry_after=_retry_after(response.headers.get("Retry-After")),
+        )
 
 
-def consulta_cfdi_service(uuid: str, rfc_emisor: str, rfc_receptor: str, total_facturado: float) -> SATConsultaResponse:
+class _ConsultaResultHandler:
+    """
+    Expat handler that only collects the text of the fields of ConsultaResult.
+    """
+
+    def __init__(self) -> None:
+        # SAT omits EstatusCancelacion in some responses
+        self.values: Dict[str, Optional[str]] = {"estatus_cancelacion": None}
+        self._current: Optional[str] = None
+        self._chunks: list = []
+
+    def start(self, name: str, attrs: dict) -> None:
+        local_name = name.split(":")[-1]
+        if local_name in _RESULT_FIELDS:
+            self._current = _RESULT_FIELDS[local_name]
+            self._chunks = []
+
+    def characters(self, data: str) -> None:
+        if self._current is not None:
+            self._chunks.append(data)
+
+    def end(self, name: str) -> None:
+        if self._current is not None:
+            self.values[self._current] = "".join(self._chunks).strip() or None
+            self._current = None
+
+
+def _trace_call(
+    start: float,
+    built: float,
+    received: float,
+    end: float,
+    body: bytes,
+    content: bytes,
+    response: "SATConsultaResponse",
+) -> None:
+    """
+    Records the phases of a call to SAT's web service in the active tracer (see ``cfdibills.tracing``), if any.
+    """
+    if (tracer := get_tracer()) is None:
+        return
+    tracer.record("sat.build", start, built, bytes=len(body))
+    tracer.record("sat.network", built, received, bytes_sent=len(body), bytes_received=len(content))
+    tracer.record("sat.parse", received, end, estado=response.estado)
+
+
+def _parse_consulta_response(content: bytes) -> SATConsultaResponse:
+    handler = _ConsultaResultHandler()
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.characters
+    try:
+        parser.Parse(content, True)
+        return SATConsultaResponse(**handler.values)  # type: ignore
+    except (expat.ExpatError, TypeError):
+        raise SATServiceError(f"The response from SAT was not in a known format. Response: {content!r}") from None
+
+
+def _call_sat(
+    body: bytes,
+    url: Optional[str] = None,
+    session: Optional["requests.Session"] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> bytes:
+    """
+    Sends a SOAP request to SAT's web service (or the one at ``url``, see ``sat_url``) to get the status of a CFDI,
+    through ``session`` to reuse its connections when given
+    """
+    import requests
+
+    client = session if session is not None else requests
+    response = client.post(sat_url(url), data=body, headers=_SOAP_HEADERS, timeout=timeout)
+    _check_status(response)
+    return response.content
+
+
+def consulta_cfdi_service(
+    uuid: str,
+    rfc_emisor: str,
+    rfc_receptor: str,
+    total_facturado: float,
+    url: Optional[str] = None,
+    session: Optional["requests.Session"] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> SATConsultaResponse:
     """
     Gets the status of the given CFDI by calling SAT's web service.
 
@@ -73,21 +214,127 @@ def consulta_cfdi_service(uuid: str, rfc_emisor: str, rfc_receptor: str, total_f
         RFC if the recipient of the CFDI to check
     total_facturado: float
         Total amount of money billed in the CFDI
+    url: Optional[str]
+        URL of the web service to call. Defaults to the one in ``CFDIBILLS_SAT_URL`` or SAT's (see ``sat_url``).
+    session: Optional[requests.Session]
+        Session used to call the web service, to reuse its connections between calls. A session must not be shared
+        between threads. By default, a new connection is opened for every call.
+    timeout: Optional[float]
+        Seconds to wait when connecting to the web service and between the bytes of its response. ``None`` waits
+        forever.
 
     Returns
     -------
     SATConsultaResponse
-        Container of the result emmitted by SAT's web service
+        Container of the result emmitted by SAT's web service. Its ``timings`` tell where the time was spent.
+
+    Raises
+    ------
+    SATServiceError
+        When SAT answers with an error or with a response in an unknown format. To retry the calls that fail, see
+        ``cfdibills.resilience``.
+    requests.Timeout
+        When SAT doesn't answer within ``timeout``.
+    """
+    start = time.perf_counter()
+    body = _build_envelope(uuid, rfc_emisor, rfc_receptor, total_facturado)
+    built = time.perf_counter()
+    content = _call_sat(body, url, session, timeout)
+    received = time.perf_counter()
+    response = _parse_consulta_response(content)
+    end = time.perf_counter()
+    response.timings = SATTimings(built - start, received - built, end - received)
+    _trace_call(start, built, received, end, body, content, response)
+    return response
+
+
+def create_async_client(
+    timeout: float = DEFAULT_TIMEOUT, max_connections: int = DEFAULT_MAX_CONNECTIONS
+) -> "httpx.AsyncClient":
+    """
+    Creates an HTTP client that keeps its connections to SAT's web service alive, so they are reused between calls
+    to ``consulta_cfdi_service_async``.
+
+    Requires ``httpx`` (``pip install cfdibills[async]``).
+
+    Parameters
+    ----------
+    timeout: float
+        Seconds to wait when connecting, sending the request or reading the response
+    max_connections: int
+        Max number of connections open at the same time
+
+    Returns
+    -------
+    httpx.AsyncClient
+        Client to be passed to ``consulta_cfdi_service_async``. It must be closed by the caller.
     """
-    data = _call_sat(uuid, rfc_emisor, rfc_receptor, total_facturado)
     try:
-        result = data["s:Envelope"]["s:Body"]["ConsultaResponse"]["ConsultaResult"]
-        return SATConsultaResponse(
-            result["a:CodigoEstatus"],
-            result["a:EsCancelable"],
-            result["a:Estado"],
-            result["a:EstatusCancelacion"],
-            result["a:ValidacionEFOS"],
-        )
-    except KeyError:
-        raise ValueError(f"The response from SAT was not in a known format. Response: {data}")
+        import httpx
+    except ImportError:
+        raise ImportError("httpx is required to verify asynchronously. Run: pip install cfdibills[async]") from None
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+
+async def _call_sat_async(client: "httpx.AsyncClient", body: bytes, url: Optional[str] = None) -> bytes:
+    response = await client.post(sat_url(url), content=body, headers=_SOAP_HEADERS)
+    _check_status(response)
+    return response.content
+
+
+async def consulta_cfdi_service_async(
+    uuid: str,
+    rfc_emisor: str,
+    rfc_receptor: str,
+    total_facturado: float,
+    client: Optional["httpx.AsyncClient"] = None,
+    url: Optional[str] = None,
+) -> SATConsultaResponse:
+    """
+    Same as ``consulta_cfdi_service`` but without blocking the event loop.
+
+    Parameters
+    ----------
+    uuid: str
+        UUID of the CFDI to check
+    rfc_emisor: str
+        RFC if the issuer of the CFDI to check
+    rfc_receptor: str
+        RFC if the recipient of the CFDI to check
+    total_facturado: float
+        Total amount of money billed in the CFDI
+    client: Optional[httpx.AsyncClient]
+        Client created with ``create_async_client`` to reuse its connections. When not given, a new client is created
+        (and closed) for this call only.
+    url: Optional[str]
+        URL of the web service to call. Defaults to the one in ``CFDIBILLS_SAT_URL`` or SAT's (see ``sat_url``).
+
+    Returns
+    -------
+    SATConsultaResponse
+        Container of the result emmitted by SAT's web service. Its ``timings`` tell where the time was spent.
+    """
+    start = time.perf_counter()
+    body = _build_envelope(uuid, rfc_emisor, rfc_receptor, total_facturado)
+    built = time.perf_counter()
+    if client is None:
+        async with create_async_client() as new_client:
+            content = await _call_sat_async(new_client, body, url)
+    else:
+        content = await _call_sat_async(client, body, url)
+    received = time.perf_counter()
+    response = _parse_consulta_response(content)
+    end = time.perf_counter()
+    response.timings = SATTimings(built - start, received - built, end - received)
+    _trace_call(start, built, received, end, body, content, response)
+    return response
+
+
+def __getattr__(name: str) -> Any:
+    # requests is imported when it is needed, as it is slow to import
+    if name == "requests":
+        import requests
+
+        return requests
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
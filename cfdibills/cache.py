@@ -0,0 +1,261 @@
+"""
+Caches of the responses of SAT's web service, so unchanged CFDIs are not verified again.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import Callable, Optional, Tuple, Union
+
+from cfdibills.api import SATConsultaResponse
+
+#: Key of a verification: (uuid, rfc_emisor, rfc_receptor, total_facturado)
+CacheKey = Tuple[str, str, str, str]
+
+MINUTE = 60.0
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+def make_key(uuid: str, rfc_emisor: str, rfc_receptor: str, total_facturado: Union[float, Decimal, str]) -> CacheKey:
+    """
+    Builds the key of a verification, normalizing the details so the same CFDI always gets the same key.
+
+    Parameters
+    ----------
+    uuid: str
+        UUID of the CFDI
+    rfc_emisor: str
+        RFC of the issuer of the CFDI
+    rfc_receptor: str
+        RFC of the recipient of the CFDI
+    total_facturado: Union[float, Decimal, str]
+        Total amount of money billed in the CFDI
+
+    Returns
+    -------
+    CacheKey
+        Key of the verification
+    """
+    total = format(Decimal(str(total_facturado)).normalize(), "f")
+    return str(uuid).lower(), rfc_emisor.upper(), rfc_receptor.upper(), total
+
+
+@dataclass
+class TTLPolicy:
+    """
+    Decides for how many seconds a response of SAT is valid depending on the status of the CFDI.
+
+    A TTL of ``None`` means that the response never expires and a TTL of 0 means that it must not be cached.
+    """
+
+    #: TTL of a cancelled CFDI. Cancellations are final.
+    cancelado: Optional[float] = None
+    #: TTL of a CFDI whose cancellation is in process.
+    en_proceso: Optional[float] = 5 * MINUTE
+    #: TTL of a valid CFDI that can still be cancelled.
+    vigente_cancelable: Optional[float] = HOUR
+    #: TTL of a valid CFDI that can't be cancelled anymore.
+    vigente_no_cancelable: Optional[float] = 7 * DAY
+    #: TTL of a CFDI not found by SAT (recently stamped CFDIs may take some time to appear).
+    no_encontrado: Optional[float] = 5 * MINUTE
+
+    def __call__(self, response: SATConsultaResponse) -> Optional[float]:
+        estado = response.estado.strip().lower()
+        if estado == "cancelado":
+            return self.cancelado
+        if estado == "vigente":
+            if "proceso" in (response.estatus_cancelacion or "").lower():
+                return self.en_proceso
+            if response.es_cancelable.strip().lower() == "no cancelable":
+                return self.vigente_no_cancelable
+            return self.vigente_cancelable
+        return self.no_encontrado
+
+
+class VerificationCache(ABC):
+    """
+    Base class of the caches of the responses of SAT. Subclasses only need to define how entries are stored.
+
+    Parameters
+    ----------
+    ttl: Callable[[SATConsultaResponse], Optional[float]]
+        Gives the seconds a response is valid (``None`` = forever, 0 = not cached). Defaults to ``TTLPolicy()``.
+    """
+
+    def __init__(self, ttl: Optional[Callable[[SATConsultaResponse], Optional[float]]] = None) -> None:
+        self.ttl = ttl if ttl is not None else TTLPolicy()
+
+    def get(self, key: CacheKey) -> Optional[SATConsultaResponse]:
+        """
+        Gets the response cached for ``key`` if it has not expired.
+        """
+        entry = self._load(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            self._delete(key)
+            return None
+        return response
+
+    def set(self, key: CacheKey, response: SATConsultaResponse) -> None:
+        """
+        Caches ``response`` for ``key`` with the TTL that corresponds to its status.
+        """
+        ttl = self.ttl(response)
+        if ttl is not None and ttl <= 0:
+            return
+        self._store(key, response, None if ttl is None else time.time() + ttl)
+
+    @abstractmethod
+    def _load(self, key: CacheKey) -> Optional[Tuple[SATConsultaResponse, Optional[float]]]:
+        """Returns the response stored for ``key`` and its expiration timestamp"""
+
+    @abstractmethod
+    def _store(self, key: CacheKey, response: SATConsultaResponse, expires_at: Optional[float]) -> None:
+        """Stores ``response`` for ``key``, replacing any previous entry"""
+
+    @abstractmethod
+    def _delete(self, key: CacheKey) -> None:
+        """Removes the entry of ``key``"""
+
+
+class MemoryCache(VerificationCache):
+    """
+    In-memory cache that evicts the least recently used entries when full. It is safe to use from many threads.
+
+    Parameters
+    ----------
+    maxsize: int
+        Max number of responses to keep.
+    ttl: Callable[[SATConsultaResponse], Optional[float]]
+        Gives the seconds a response is valid (``None`` = forever, 0 = not cached). Defaults to ``TTLPolicy()``.
+    """
+
+    def __init__(
+        self, maxsize: int = 100_000, ttl: Optional[Callable[[SATConsultaResponse], Optional[float]]] = None
+    ) -> None:
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[CacheKey, Tuple[SATConsultaResponse, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, key: CacheKey) -> Optional[Tuple[SATConsultaResponse, Optional[float]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: CacheKey, response: SATConsultaResponse, expires_at: Optional[float]) -> None:
+        # a copy, as the timings of the call don't apply to the hits and the caller may change the response
+        response = replace(response, timings=None)
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key: CacheKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteCache(VerificationCache):
+    """
+    On-disk cache stored in a SQLite database, so it can be shared between runs and processes.
+
+    Parameters
+    ----------
+    path: str
+        Path of the database file. It is created if it doesn't exist.
+    ttl: Callable[[SATConsultaResponse], Optional[float]]
+        Gives the seconds a response is valid (``None`` = forever, 0 = not cached). Defaults to ``TTLPolicy()``.
+    """
+
+    _CREATE_TABLE = """
+        CREATE TABLE IF NOT EXISTS verifications (
+            uuid TEXT NOT NULL,
+            rfc_emisor TEXT NOT NULL,
+            rfc_receptor TEXT NOT NULL,
+            total TEXT NOT NULL,
+            codigo_estatus TEXT,
+            es_cancelable TEXT,
+            estado TEXT,
+            estatus_cancelacion TEXT,
+            validacion_efos TEXT,
+            expires_at REAL,
+            PRIMARY KEY (uuid, rfc_emisor, rfc_receptor, total)
+        )
+    """
+    _KEY_CONDITION = "uuid = ? AND rfc_emisor = ? AND rfc_receptor = ? AND total = ?"
+
+    def __init__(self, path: str, ttl: Optional[Callable[[SATConsultaResponse], Optional[float]]] = None) -> None:
+        import sqlite3
+
+        super().__init__(ttl)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(self._CREATE_TABLE)
+
+    def _load(self, key: CacheKey) -> Optional[Tuple[SATConsultaResponse, Optional[float]]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT codigo_estatus, es_cancelable, estado, estatus_cancelacion, validacion_efos, expires_at "
+                f"FROM verifications WHERE {self._KEY_CONDITION}",
+                key,
+            ).fetchone()
+        return None if row is None else (SATConsultaResponse(*row[:5]), row[5])
+
+    def _store(self, key: CacheKey, response: SATConsultaResponse, expires_at: Optional[float]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO verifications VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    *key,
+                    response.codigo_estatus,
+                    response.es_cancelable,
+                    response.estado,
+                    response.estatus_cancelacion,
+                    response.validacion_efos,
+                    expires_at,
+                ),
+            )
+
+    def _delete(self, key: CacheKey) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM verifications WHERE {self._KEY_CONDITION}", key)
+
+    def purge_expired(self) -> int:
+        """
+        Removes all the expired entries.
+
+        Returns
+        -------
+        int
+            Number of entries removed
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute("DELETE FROM verifications WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """
+        Closes the connection to the database.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "SQLiteCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,561 @@
+"""
+Lookups by code in the catalogs of SAT.
+
+Every catalog is indexed once in frozen mappings by code, so checking a code is a single hash lookup that never raises.
+There are two kinds of catalogs:
+
+* The ones defined as enums in ``cfdibills.schemas.catalogs``, indexed with ``index``.
+* The big ones (``ClaveProdServ``, ``ClaveUnidad`` and ``CodigoPostal``), which are not shipped with cfdibills. They are
+  opened from a file the first time they are used: from the path given to ``FileCatalog.configure`` or, if none, from
+  ``<name>.bin`` or ``<name>.tsv.gz`` in the directory in ``CFDIBILLS_CATALOGS``.
+
+A catalog is written by ``write_catalog`` as a gzip-compressed text with a line per code: the code, its description
+and the dates since and until the code is valid (ISO format, empty if unknown or open), separated by tabs. Reading it
+takes all of its codes to memory, so the big catalogs are better packed with ``pack_catalog``::
+
+    python -m cfdibills.catalogs c_ClaveProdServ.tsv.gz c_ClaveProdServ.bin
+
+into a binary file with the codes sorted, which ``CatalogStore`` maps to memory and looks up with a binary search. The
+pages of the file are loaded on demand and shared by all the processes that open it.
+"""
+
+import bisect
+import gzip
+import mmap
+import os
+import struct
+import threading
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from cfdibills.errors import CatalogNotAvailableError
+from cfdibills.schemas.catalogs import CatalogEnum
+
+#: Name of the environment variable with the directory of the catalogs that are not shipped with cfdibills
+CATALOGS_DIR_ENV_VAR = "CFDIBILLS_CATALOGS"
+
+
+class CatalogEntry(NamedTuple):
+    """
+    A code of a catalog.
+    """
+
+    #: Code
+    code: str
+    #: Description of the code
+    description: Optional[str] = None
+    #: First day the code is valid. None if unknown
+    valid_from: Optional[date] = None
+    #: Last day the code is valid. None if it is still valid
+    valid_until: Optional[date] = None
+
+    def is_valid_on(self, day: date) -> bool:
+        """
+        Whether the code is valid on ``day``.
+        """
+        return (self.valid_from is None or self.valid_from <= day) and (
+            self.valid_until is None or day <= self.valid_until
+        )
+
+
+class CatalogIndex:
+    """
+    Frozen index of the codes of a catalog.
+
+    Parameters
+    ----------
+    name: str
+        Name of the catalog
+    entries: Iterable[CatalogEntry]
+        Codes of the catalog
+    members: Mapping[str, Any]
+        Object that represents every code (like the members of an enum). Defaults to the entries.
+    """
+
+    __slots__ = ("name", "entries", "members", "descriptions")
+
+    def __init__(self, name: str, entries: Iterable[CatalogEntry], members: Mapping[str, Any] = None):
+        #: Name of the catalog
+        self.name = name
+        #: Entry of every code
+        self.entries: Mapping[str, CatalogEntry] = MappingProxyType({entry.code: entry for entry in entries})
+        #: Object that represents every code
+        self.members: Mapping[str, Any] = MappingProxyType(dict(members) if members is not None else self.entries)
+        #: Description of every code
+        self.descriptions: Mapping[str, Optional[str]] = MappingProxyType(
+            {code: entry.description for code, entry in self.entries.items()}
+        )
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, {len(self)} codes)"
+
+    def get(self, code: str) -> Any:
+        """
+        Member of the catalog with the given code, or None if the catalog doesn't have it.
+        """
+        return self.members.get(code)
+
+    def describe(self, code: str) -> Optional[str]:
+        """
+        Description of the code, or None if the catalog doesn't have it or it has no description.
+        """
+        return self.descriptions.get(code)
+
+    def is_valid(self, code: str, on: date = None) -> bool:
+        """
+        Whether the catalog has the code and, if ``on`` is given, the code is valid on that day.
+        """
+        entry = self.entries.get(code)
+        return entry is not None and (on is None or entry.is_valid_on(on))
+
+
+@lru_cache(maxsize=None)
+def index(catalog: Type[CatalogEnum]) -> CatalogIndex:
+    """
+    Index of a catalog defined as an enum, built once.
+
+    Parameters
+    ----------
+    catalog: Type[CatalogEnum]
+        Catalog of ``cfdibills.schemas.catalogs``
+
+    Returns
+    -------
+    CatalogIndex
+        Index whose members are the members of the enum
+    """
+    members = {member.value: member for member in catalog}
+    entries = (CatalogEntry(code, member.description) for code, member in members.items())
+    return CatalogIndex(catalog.__name__, entries, members)
+
+
+def write_catalog(path: Union[str, os.PathLike], entries: Iterable[CatalogEntry]):
+    """
+    Writes a catalog in the format read by ``read_catalog``.
+
+    Tabs and line breaks in the descriptions are replaced by spaces.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        File to write
+    entries: Iterable[CatalogEntry]
+        Codes of the catalog
+    """
+    with gzip.open(path, "wt", encoding="utf-8", newline="\n") as f:
+        for code, description, valid_from, valid_until in entries:
+            f.write(
+                "\t".join(
+                    (
+                        code,
+                        " ".join((description or "").split()),
+                        valid_from.isoformat() if valid_from else "",
+                        valid_until.isoformat() if valid_until else "",
+                    )
+                )
+                + "\n"
+            )
+
+
+def _parse_date(value: str) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def read_catalog(path: Union[str, os.PathLike], name: str = None) -> CatalogIndex:
+    """
+    Reads a catalog written by ``write_catalog``.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        File to read
+    name: str
+        Name of the catalog. Defaults to the name of the file
+
+    Returns
+    -------
+    CatalogIndex
+        Index of the catalog
+    """
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8", newline="\n") as f:
+        for line in f:
+            code, description, valid_from, valid_until = line.rstrip("\n").split("\t")
+            entries.append(CatalogEntry(code, description or None, _parse_date(valid_from), _parse_date(valid_until)))
+    return CatalogIndex(name or os.path.basename(path).split(".")[0], entries)
+
+
+#: Header of the files of ``CatalogStore``: magic, width of the codes and number of codes
+_STORE_HEADER = struct.Struct("<8sHI")
+_STORE_MAGIC = b"CFDICAT1"
+#: Validity dates of a code in ``CatalogStore`` as ordinals, 0 if None
+_STORE_DATES = struct.Struct("<II")
+#: Offset of a description in ``CatalogStore``, and the offsets where a description starts and ends
+_STORE_OFFSET = struct.Struct("<I")
+_STORE_SPAN = struct.Struct("<II")
+#: Number of codes in a block of ``CatalogStore``. The first code of every block is kept in memory
+_STORE_BLOCK = 64
+
+
+def _ordinal(day: Optional[date]) -> int:
+    return day.toordinal() if day is not None else 0
+
+
+def _from_ordinal(ordinal: int) -> Optional[date]:
+    return date.fromordinal(ordinal) if ordinal else None
+
+
+def pack_catalog(path: Union[str, os.PathLike], entries: Iterable[CatalogEntry]):
+    """
+    Writes a catalog in the binary format of ``CatalogStore``.
+
+    The file has a header followed by four sections:
+
+    * The codes, sorted and padded with null bytes to the length of the longest one.
+    * The validity dates of every code, as two ordinals (0 if None).
+    * The offsets of the description of every code (plus the end of the last one).
+    * The descriptions, encoded in UTF-8.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        File to write
+    entries: Iterable[CatalogEntry]
+        Codes of the catalog
+    """
+    ordered = sorted(entries, key=lambda entry: entry.code.encode("ascii"))
+    width = max((len(entry.code) for entry in ordered), default=1)
+    descriptions = [(entry.description or "").encode("utf-8") for entry in ordered]
+    with open(path, "wb") as f:
+        f.write(_STORE_HEADER.pack(_STORE_MAGIC, width, len(ordered)))
+        f.write(b"".join(entry.code.encode("ascii").ljust(width, b"\0") for entry in ordered))
+        f.write(b"".join(_STORE_DATES.pack(_ordinal(e.valid_from), _ordinal(e.valid_until)) for e in ordered))
+        offset = 0
+        for description in descriptions:
+            f.write(_STORE_OFFSET.pack(offset))
+            offset += len(description)
+        f.write(_STORE_OFFSET.pack(offset))
+        f.write(b"".join(descriptions))
+
+
+class CatalogStore:
+    """
+    Catalog in a file written by ``pack_catalog``, mapped to memory.
+
+    Only the first code of every block of ``_STORE_BLOCK`` codes is kept in memory: looking up a code is a binary
+    search of its block, which is then scanned in the file. Only the pages of the file that are touched are loaded.
+    It has the same methods to look up codes as ``CatalogIndex``.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        File written by ``pack_catalog``
+    name: str
+        Name of the catalog. Defaults to the name of the file
+
+    Raises
+    ------
+    ValueError
+        If the file was not written by ``pack_catalog``
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], name: str = None):
+        #: Name of the catalog
+        self.name = name or os.path.basename(path).split(".")[0]
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._width, self._count = _STORE_HEADER.unpack_from(self._buffer)
+        if magic != _STORE_MAGIC:
+            self._buffer.close()
+            raise ValueError(f"{path} is not a catalog written by pack_catalog")
+        self._codes = _STORE_HEADER.size
+        self._dates = self._codes + self._width * self._count
+        self._offsets = self._dates + _STORE_DATES.size * self._count
+        self._descriptions = self._offsets + _STORE_OFFSET.size * (self._count + 1)
+        self._first_codes = [self._code(i) for i in range(0, self._count, _STORE_BLOCK)]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, {len(self)} codes)"
+
+    def _find(self, code: object) -> int:
+        """
+        Position of ``code`` in the file, or -1 if the catalog doesn't have it.
+        """
+        if not isinstance(code, str) or not 0 < len(code) <= self._width or not code.isascii():
+            return -1
+        key = code.encode("ascii").ljust(self._width, b"\0")
+        block = bisect.bisect_right(self._first_codes, key) - 1
+        if block < 0:
+            return -1
+        start = self._codes + block * _STORE_BLOCK * self._width
+        end = min(start + _STORE_BLOCK * self._width, self._dates)
+        position = self._buffer.find(key, start, end)
+        # a match that is not aligned to the codes spans two of them
+        while position >= 0 and (position - self._codes) % self._width:
+            position = self._buffer.find(key, position + 1, end)
+        return (position - self._codes) // self._width if position >= 0 else -1
+
+    def _code(self, i: int) -> bytes:
+        start = self._codes + i * self._width
+        end = start + self._width
+        return self._buffer[start:end]
+
+    def __contains__(self, code: object) -> bool:
+        return self._find(code) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._code(i).rstrip(b"\0").decode("ascii") for i in range(self._count))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int) -> CatalogEntry:
+        valid_from, valid_until = _STORE_DATES.unpack_from(self._buffer, self._dates + _STORE_DATES.size * i)
+        return CatalogEntry(
+            self._code(i).rstrip(b"\0").decode("ascii"),
+            self._description(i),
+            _from_ordinal(valid_from),
+            _from_ordinal(valid_until),
+        )
+
+    def _description(self, i: int) -> Optional[str]:
+        start, end = _STORE_SPAN.unpack_from(self._buffer, self._offsets + _STORE_OFFSET.size * i)
+        start, end = self._descriptions + start, self._descriptions + end
+        return self._buffer[start:end].decode("utf-8") or None
+
+    def get(self, code: str) -> Optional[CatalogEntry]:
+        """
+        Entry of the code, or None if the catalog doesn't have it.
+        """
+        i = self._find(code)
+        return self._entry(i) if i >= 0 else None
+
+    def describe(self, code: str) -> Optional[str]:
+        """
+        Description of the code, or None if the catalog doesn't have it or it has no description.
+        """
+        i = self._find(code)
+        return self._description(i) if i >= 0 else None
+
+    def is_valid(self, code: str, on: date = None) -> bool:
+        """
+        Whether the catalog has the code and, if ``on`` is given, the code is valid on that day.
+        """
+        entry = self.get(code)
+        return entry is not None and (on is None or entry.is_valid_on(on))
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self._buffer.close()
+
+
+class FileCatalog:
+    """
+    Catalog read from a file the first time it is used.
+
+    Parameters
+    ----------
+    name: str
+        Name of the catalog, which is also the name of its file (``<name>.bin`` or ``<name>.tsv.gz``) in the
+        directory of the catalogs
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._path: Optional[str] = None
+        self._index: Union[CatalogIndex, CatalogStore, None] = None
+        #: Whether the file of the catalog existed, by the configuration (file and directory) it was checked with
+        self._exists: Optional[Tuple[Tuple[Optional[str], Optional[str]], bool]] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, loaded={self.loaded})"
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Whether the file of the catalog has been read.
+        """
+        return self._index is not None
+
+    @property
+    def path(self) -> Optional[str]:
+        """
+        File of the catalog: the configured one or the one in the directory in ``CFDIBILLS_CATALOGS``, preferring the
+        packed one (``.bin``) if both exist. None if neither is configured.
+        """
+        if self._path is not None:
+            return self._path
+        directory = os.environ.get(CATALOGS_DIR_ENV_VAR)
+        if not directory:
+            return None
+        packed = os.path.join(directory, f"{self.name}.bin")
+        return packed if os.path.isfile(packed) else os.path.join(directory, f"{self.name}.tsv.gz")
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether the catalog has been opened or its file exists. The file is looked up once per configuration (its
+        file or the directory in ``CFDIBILLS_CATALOGS``), so the catalog is not checked in every validation.
+        """
+        if self._index is not None:
+            return True
+        configuration = (self._path, os.environ.get(CATALOGS_DIR_ENV_VAR))
+        if self._exists is None or self._exists[0] != configuration:
+            path = self.path
+            self._exists = (configuration, path is not None and os.path.isfile(path))
+        return self._exists[1]
+
+    def configure(self, path: Union[str, os.PathLike, None]):
+        """
+        Sets the file of the catalog, discarding the codes read from the previous one.
+
+        Parameters
+        ----------
+        path: str, os.PathLike or None
+            File written by ``pack_catalog`` (if its extension is ``.bin``) or ``write_catalog``. None to look for it
+            in the directory in ``CFDIBILLS_CATALOGS``.
+        """
+        with self._lock:
+            self._path = os.fspath(path) if path is not None else None
+            self._index = None
+            self._exists = None
+
+    @property
+    def index(self) -> Union[CatalogIndex, CatalogStore]:
+        """
+        Index of the catalog, opening its file if it hasn't been opened yet.
+
+        Raises
+        ------
+        CatalogNotAvailableError
+            If the file of the catalog is not configured or doesn't exist
+        """
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    path = self.path
+                    if path is None or not os.path.isfile(path):
+                        raise CatalogNotAvailableError(
+                            f"Catalog {self.name} is not available: configure its file or set {CATALOGS_DIR_ENV_VAR} "
+                            f"to the directory with {self.name}.bin or {self.name}.tsv.gz (missing: {path})"
+                        )
+                    if path.endswith(".bin"):
+                        self._index = CatalogStore(path, self.name)
+                    else:
+                        self._index = read_catalog(path, self.name)
+        return self._index
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, code: str) -> Optional[CatalogEntry]:
+        """
+        Entry of the code, or None if the catalog doesn't have it.
+        """
+        return self.index.get(code)
+
+    def describe(self, code: str) -> Optional[str]:
+        """
+        Description of the code, or None if the catalog doesn't have it or it has no description.
+        """
+        return self.index.describe(code)
+
+    def is_valid(self, code: str, on: date = None) -> bool:
+        """
+        Whether the catalog has the code and, if ``on`` is given, the code is valid on that day.
+        """
+        return self.index.is_valid(code, on)
+
+
+#: Catalog of "Clave Prod Serv"
+ClaveProdServ = FileCatalog("c_ClaveProdServ")
+#: Catalog of "Clave Unidad"
+ClaveUnidad = FileCatalog("c_ClaveUnidad")
+#: Catalog of "Codigo Postal"
+CodigoPostal = FileCatalog("c_CodigoPostal")
+
+AnyCatalog = Union[Type[CatalogEnum], CatalogIndex, CatalogStore, FileCatalog]
+
+
+def _index_of(catalog: AnyCatalog) -> Union[CatalogIndex, CatalogStore]:
+    if isinstance(catalog, (CatalogIndex, CatalogStore)):
+        return catalog
+    if isinstance(catalog, FileCatalog):
+        return catalog.index
+    return index(catalog)
+
+
+def validate_codes(catalog: AnyCatalog, codes: Iterable[str]) -> List[bool]:
+    """
+    Checks many codes against a catalog at once.
+
+    Parameters
+    ----------
+    catalog: Type[CatalogEnum], CatalogIndex, CatalogStore or FileCatalog
+        Catalog to look the codes up in
+    codes: Iterable[str]
+        Codes to check
+
+    Returns
+    -------
+    List[bool]
+        Whether the catalog has each code, in the same order as ``codes``
+
+    Raises
+    ------
+    CatalogNotAvailableError
+        If ``catalog`` is a ``FileCatalog`` whose file can't be found
+    """
+    lookup = _index_of(catalog)
+    contains = lookup.entries.__contains__ if isinstance(lookup, CatalogIndex) else lookup.__contains__
+    return list(map(contains, codes))
+
+
+def main(argv: List[str] = None):
+    """
+    Packs a catalog written by ``write_catalog`` with ``pack_catalog``.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m cfdibills.catalogs", description=main.__doc__)
+    parser.add_argument("source", help="catalog written by write_catalog (.tsv.gz)")
+    parser.add_argument("target", help="file to write (.bin)")
+    args = parser.parse_args(argv)
+    source = read_catalog(args.source)
+    pack_catalog(args.target, source.entries.values())
+    print(f"{source.name}: {len(source)} codes packed in {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 Custom errors definition.
 """
+from typing import Optional
 
 
 class UnsupportedCFDIError(Exception):
@@ -19,3 +20,26 @@ class ComplementoNotFoundError(Exception):
     """Raised when a CFDI doesn't have a Complemento of a specific type."""
 
     pass
+
+
+class CatalogNotAvailableError(Exception):
+    """Raised when a catalog that is not shipped with cfdibills is used but its file can't be found."""
+
+    pass
+
+
+class SATServiceError(ValueError):
+    """Raised when SAT's web service answers with an error or with a response in an unknown format"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        #: HTTP status of the response, or None when it was not in a known format
+        self.status_code = status_code
+        #: Seconds SAT asked to wait before calling again (its Retry-After header), if any
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(SATServiceError):
+    """Raised without calling SAT's web service while it is considered down (see cfdibills.resilience)"""
+
+    pass
@@ -0,0 +1,352 @@
+"""
+Export of CFDIs to Apache Arrow and Parquet.
+
+The CFDIs are flattened into a table per level, each one with a fixed schema (see ``COLUMNS``), regardless of the
+version of the CFDIs (the columns of the other versions are null):
+
+* ``comprobante``: a row per CFDI, with its emisor, receptor and totals.
+* ``concepto``: a row per concepto, with its position in the CFDI.
+* ``impuesto``: a row per traslado or retención of a concepto.
+* ``timbre``: a row per CFDI with a Timbre Fiscal Digital.
+
+The rows of every level are linked by the ``uuid`` of the Timbre Fiscal Digital (null if the CFDI has none).
+
+Requires ``pyarrow`` (``pip install cfdibills[arrow]``).
+"""
+
+import os
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from uuid import UUID
+
+from cfdibills.io import XMLSource, read_xml
+from cfdibills.schemas.cfdi33 import CFDI33
+from cfdibills.schemas.cfdi40 import CFDI40
+from cfdibills.schemas.complementos import TimbreFiscalDigital
+
+if TYPE_CHECKING:
+    import pyarrow
+
+CFDI = Union[CFDI33, CFDI40]
+
+#: Default number of CFDIs in every batch
+DEFAULT_BATCH_SIZE = 1024
+#: Precision and scale of the amounts. SAT allows up to 6 decimals
+DECIMAL_PRECISION = 28
+DECIMAL_SCALE = 6
+_SCALE = Decimal(1).scaleb(-DECIMAL_SCALE)
+
+#: Columns of every level, with the kind of their values: "string", "decimal", "timestamp" or "int32"
+COLUMNS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "comprobante": (
+        ("uuid", "string"),
+        ("version", "string"),
+        ("serie", "string"),
+        ("folio", "string"),
+        ("fecha", "timestamp"),
+        ("tipo_de_comprobante", "string"),
+        ("forma_pago", "string"),
+        ("metodo_pago", "string"),
+        ("moneda", "string"),
+        ("tipo_cambio", "decimal"),
+        ("sub_total", "decimal"),
+        ("descuento", "decimal"),
+        ("total", "decimal"),
+        ("total_impuestos_trasladados", "decimal"),
+        ("total_impuestos_retenidos", "decimal"),
+        ("lugar_expedicion", "string"),
+        ("exportacion", "string"),
+        ("emisor_rfc", "string"),
+        ("emisor_nombre", "string"),
+        ("emisor_regimen_fiscal", "string"),
+        ("receptor_rfc", "string"),
+        ("receptor_nombre", "string"),
+        ("receptor_uso_cfdi", "string"),
+        ("receptor_domicilio_fiscal", "string"),
+        ("receptor_regimen_fiscal", "string"),
+    ),
+    "concepto": (
+        ("uuid", "string"),
+        ("concepto", "int32"),
+        ("clave_prod_serv", "string"),
+        ("no_identificacion", "string"),
+        ("cantidad", "decimal"),
+        ("clave_unidad", "string"),
+        ("unidad", "string"),
+        ("descripcion", "string"),
+        ("valor_unitario", "decimal"),
+        ("importe", "decimal"),
+        ("descuento", "decimal"),
+        ("objeto_imp", "string"),
+    ),
+    "impuesto": (
+        ("uuid", "string"),
+        ("concepto", "int32"),
+        ("tipo", "string"),
+        ("impuesto", "string"),
+        ("tipo_factor", "string"),
+        ("tasa_o_cuota", "decimal"),
+        ("base", "decimal"),
+        ("importe", "decimal"),
+    ),
+    "timbre": (
+        ("uuid", "string"),
+        ("version", "string"),
+        ("fecha_timbrado", "timestamp"),
+        ("rfc_prov_certif", "string"),
+        ("no_certificado_sat", "string"),
+    ),
+}
+
+#: Levels of the export
+LEVELS = tuple(COLUMNS)
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required to export CFDIs. Run: pip install cfdibills[arrow]") from None
+    return pyarrow
+
+
+def schema(level: str) -> "pyarrow.Schema":
+    """
+    Arrow schema of a level of the export.
+
+    Parameters
+    ----------
+    level: str
+        One of ``LEVELS``
+
+    Returns
+    -------
+    pyarrow.Schema
+        Schema of the level
+    """
+    pa = _import_pyarrow()
+    types = {
+        "string": pa.string(),
+        "decimal": pa.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE),
+        "timestamp": pa.timestamp("ms"),
+        "int32": pa.int32(),
+    }
+    return pa.schema([pa.field(name, types[kind]) for name, kind in COLUMNS[level]])
+
+
+def _value(value: Any) -> Any:
+    """
+    Converts a value of a CFDI to the type of its column.
+    """
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal) and value.as_tuple().exponent < -DECIMAL_SCALE:  # type: ignore
+        return value.quantize(_SCALE)
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0)
+    return value
+
+
+def _timbre(cfdi: CFDI) -> Optional[TimbreFiscalDigital]:
+    return next((complemento for complemento in cfdi.complemento if isinstance(complemento, TimbreFiscalDigital)), None)
+
+
+def _add_rows(rows: Dict[str, List[tuple]], cfdi: CFDI):
+    """
+    Adds the rows of every level of ``cfdi`` to ``rows``.
+    """
+    timbre = _timbre(cfdi)
+    uuid = timbre.uuid if timbre is not None else None
+    impuestos, emisor, receptor = cfdi.impuestos, cfdi.emisor, cfdi.receptor
+    comprobante = (
+        uuid,
+        cfdi.version,
+        cfdi.serie,
+        cfdi.folio,
+        cfdi.fecha,
+        cfdi.tipo_de_comprobante,
+        cfdi.forma_pago,
+        cfdi.metodo_pago,
+        cfdi.moneda,
+        cfdi.tipo_cambio,
+        cfdi.sub_total,
+        cfdi.descuento,
+        cfdi.total,
+        impuestos.total_impuestos_trasladados if impuestos is not None else None,
+        impuestos.total_impuestos_retenidos if impuestos is not None else None,
+        cfdi.lugar_expedicion,
+        getattr(cfdi, "exportacion", None),
+        emisor.rfc,
+        emisor.nombre,
+        emisor.regimen_fiscal,
+        receptor.rfc,
+        receptor.nombre,
+        receptor.uso_cfdi,
+        getattr(receptor, "domicilio_fiscal_receptor", None),
+        getattr(receptor, "regimen_fiscal_receptor", None),
+    )
+    rows["comprobante"].append(comprobante)
+    # conceptos of either version
+    conceptos: List[Any] = cfdi.conceptos
+    for i, concepto in enumerate(conceptos):
+        rows["concepto"].append(
+            (
+                uuid,
+                i,
+                concepto.clave_prod_serv,
+                concepto.no_identificacion,
+                concepto.cantidad,
+                concepto.clave_unidad,
+                concepto.unidad,
+                concepto.descripcion,
+                concepto.valor_unitario,
+                concepto.importe,
+                concepto.descuento,
+                getattr(concepto, "objeto_imp", None),
+            )
+        )
+        if concepto.impuestos is None:
+            continue
+        for tipo, taxes in (("traslado", concepto.impuestos.traslados), ("retencion", concepto.impuestos.retenciones)):
+            for tax in taxes:
+                rows["impuesto"].append(
+                    (uuid, i, tipo, tax.impuesto, tax.tipo_factor, tax.tasa_o_cuota, tax.base, tax.importe)
+                )
+    if timbre is not None:
+        rows["timbre"].append(
+            (uuid, timbre.version, timbre.fecha_timbrado, timbre.rfc_prov_certif, timbre.no_certificado_sat)
+        )
+
+
+def _record_batch(level: str, rows: List[tuple]) -> "pyarrow.RecordBatch":
+    pa = _import_pyarrow()
+    level_schema = schema(level)
+    columns = zip(*rows) if rows else ([] for _ in level_schema)
+    arrays = [
+        pa.array([_value(value) for value in column], type=field.type) for column, field in zip(columns, level_schema)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=level_schema)
+
+
+def iter_batches(
+    cfdis: Iterable[Union[CFDI, XMLSource]], batch_size: int = DEFAULT_BATCH_SIZE, validate: bool = True
+) -> Iterator[Dict[str, "pyarrow.RecordBatch"]]:
+    """
+    Flattens CFDIs into Arrow record batches, ``batch_size`` CFDIs at a time.
+
+    Parameters
+    ----------
+    cfdis: Iterable[Union[CFDI33, CFDI40, XMLSource]]
+        CFDIs or their XMLs (paths, contents or file-like objects), which are read with ``read_xml`` as they are needed
+    batch_size: int
+        Max number of CFDIs in every batch
+    validate: bool
+        Whether to validate the CFDIs read from XMLs (see ``read_xml``)
+
+    Yields
+    ------
+    Dict[str, pyarrow.RecordBatch]
+        Batch of every level (see ``LEVELS``) with the rows of the same CFDIs. Batches may be empty.
+
+    Raises
+    ------
+    ValueError
+        When ``batch_size`` is not positive
+    """
+    if batch_size < 1:
+        raise ValueError("'batch_size' must be greater than 0")
+    _import_pyarrow()
+    rows: Dict[str, List[tuple]] = {level: [] for level in LEVELS}
+    pending = 0
+    for cfdi in cfdis:
+        if not isinstance(cfdi, (CFDI33, CFDI40)):
+            cfdi = read_xml(cfdi, validate=validate)
+        _add_rows(rows, cfdi)
+        pending += 1
+        if pending == batch_size:
+            yield {level: _record_batch(level, level_rows) for level, level_rows in rows.items()}
+            rows = {level: [] for level in LEVELS}
+            pending = 0
+    if pending:
+        yield {level: _record_batch(level, level_rows) for level, level_rows in rows.items()}
+
+
+def to_tables(
+    cfdis: Iterable[Union[CFDI, XMLSource]], batch_size: int = DEFAULT_BATCH_SIZE, validate: bool = True
+) -> Dict[str, "pyarrow.Table"]:
+    """
+    Flattens CFDIs into an Arrow table per level, which can be turned into a DataFrame with ``to_pandas()``.
+
+    See ``iter_batches`` for the parameters.
+
+    Returns
+    -------
+    Dict[str, pyarrow.Table]
+        Table of every level (see ``LEVELS``)
+    """
+    pa = _import_pyarrow()
+    batches: Dict[str, list] = {level: [] for level in LEVELS}
+    for batch in iter_batches(cfdis, batch_size, validate):
+        for level, record_batch in batch.items():
+            batches[level].append(record_batch)
+    return {level: pa.Table.from_batches(level_batches, schema(level)) for level, level_batches in batches.items()}
+
+
+def to_parquet(
+    cfdis: Iterable[Union[CFDI, XMLSource]],
+    directory: Union[str, os.PathLike],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    validate: bool = True,
+    **options: Any,
+) -> Dict[str, str]:
+    """
+    Writes CFDIs to a Parquet file per level (``<directory>/<level>.parquet``), ``batch_size`` CFDIs at a time, so
+    only a batch is kept in memory.
+
+    Parameters
+    ----------
+    cfdis: Iterable[Union[CFDI33, CFDI40, XMLSource]]
+        CFDIs or their XMLs (paths, contents or file-like objects), which are read with ``read_xml`` as they are needed
+    directory: str or os.PathLike
+        Directory of the files, created if it doesn't exist
+    batch_size: int
+        Max number of CFDIs in every batch (and row group)
+    validate: bool
+        Whether to validate the CFDIs read from XMLs (see ``read_xml``)
+    **options
+        Options of ``pyarrow.parquet.ParquetWriter`` (like ``compression``)
+
+    Returns
+    -------
+    Dict[str, str]
+        Path of the file of every level
+    """
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {level: os.path.join(directory, f"{level}.parquet") for level in LEVELS}
+    writers = {level: pq.ParquetWriter(path, schema(level), **options) for level, path in paths.items()}
+    try:
+        for batch in iter_batches(cfdis, batch_size, validate):
+            for level, record_batch in batch.items():
+                if record_batch.num_rows:
+                    writers[level].write_batch(record_batch)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return paths
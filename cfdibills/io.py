@@ -4,19 +4,105 @@ Module to read CFDIs.
 
 from __future__ import annotations
 
-import re
+import collections
+import glob
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Callable, Type, Union
-
-import pydantic
-import xmltodict
+from functools import lru_cache
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_type_hints,
+)
+from xml.parsers import expat
 
 from cfdibills.errors import InvalidCFDIError, UnsupportedCFDIError
 from cfdibills.schemas.cfdi33 import CFDI33
+from cfdibills.schemas.cfdi33 import Concepto as Concepto33
 from cfdibills.schemas.cfdi40 import CFDI40
+from cfdibills.schemas.cfdi40 import Concepto as Concepto40
+from cfdibills.schemas.compat import (
+    BaseModel,
+    ValidationError,
+    field_names,
+    parse_model,
+)
+from cfdibills.schemas.construct import build_model
+from cfdibills.schemas.lazy import LazyCFDI33, LazyCFDI40
+from cfdibills.schemas.naming import camel_to_snake
+from cfdibills.tracing import Tracer, get_tracer
+
+#: Max number of unknown keys (i.e. keys of addendas or unsupported complementos) to remember
+_UNKNOWN_KEYS_CACHE_SIZE = 4096
+#: Words up to this length are considered acronyms (like "RFC" or "CFDI") when building the keys index
+_MAX_ACRONYM_LENGTH = 4
+#: Number of files sent to a worker at once by ``read_many``
+_DEFAULT_CHUNKSIZE = 16
+#: Chunks of XMLs read ahead by ``read_many`` for every worker
+_READ_AHEAD_PER_WORKER = 2
+#: Number of bytes of the XML read at once by ``iter_conceptos`` and ``read_header``
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+#: Versions of CFDI that can be read
+SUPPORTED_VERSIONS = ("3.3", "4.0")
+
+#: Where a XML can be read from: the path of a file, its content (parsed straight from the buffer, without copying it)
+#: or a binary file-like object (like an HTTP response, an object of a store or a member of a ZIP file)
+XMLSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+class VerificationKey(NamedTuple):
+    """
+    Details of a CFDI required to verify it with the SAT, as read by ``read_verification_key``.
+
+    It can be given to ``cfdibills.verify`` in place of a parsed CFDI.
+    """
+
+    #: UUID of the TimbreFiscalDigital
+    uuid: str
+    #: RFC of the Emisor
+    rfc_emisor: str
+    #: RFC of the Receptor
+    rfc_receptor: str
+    #: Total of the Comprobante
+    total: Decimal
+    #: Version of the Comprobante
+    version: str
+
 
-_name_pattern = re.compile(r"(.)([A-Z][a-z]+)")
-_snake_pattern = re.compile(r"([a-z0-9])([A-Z])")
+@dataclass
+class ReadResult:
+    """
+    Result of reading one of the XMLs given to ``read_many``.
+
+    Exactly one of ``cfdi`` and ``error`` is set.
+    """
+
+    #: Path of the XML read, or None when it was given in memory or as a file-like object
+    path: Optional[str]
+    #: CFDI read from the XML
+    cfdi: Optional[Union[CFDI33, CFDI40]] = None
+    #: Error raised when the XML could not be read (like a missing file) or could not be read as a CFDI
+    error: Optional[Union[InvalidCFDIError, UnsupportedCFDIError, OSError]] = None
+    #: Position of the XML in the ones given to ``read_many``
+    index: int = 0
 
 
 def _get_cfdi_with_version(candidate: dict) -> tuple[dict, str]:
@@ -28,41 +114,319 @@ def _get_cfdi_with_version(candidate: dict) -> tuple[dict, str]:
     return cfdi, version
 
 
-def _xml_to_json(path: str, normalize: bool = True) -> dict:
-    with open(path, "rb") as f:
-        raw_xml = xmltodict.parse(f, dict_constructor=dict)
-    return normalize_dict_keys(raw_xml) if normalize else raw_xml
+def _is_buffer(source: object) -> bool:
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def _parse_source(parser: expat.XMLParserType, source: XMLSource) -> None:
+    """
+    Parses the whole XML in ``source`` with ``parser``. Buffers are given to expat as they are, so they are not
+    copied.
+    """
+    if _is_buffer(source):
+        parser.Parse(source, True)  # type: ignore
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            parser.ParseFile(f)
+    else:
+        parser.ParseFile(source)  # type: ignore
+
+
+def _iter_source_chunks(source: XMLSource) -> Iterator[Union[bytes, memoryview]]:
+    """
+    Yields the content of the XML in ``source`` in chunks of up to ``_STREAM_CHUNK_SIZE`` bytes. The chunks of a
+    buffer are views of it.
+    """
+    if _is_buffer(source):
+        view = memoryview(source)  # type: ignore
+        for start in range(0, len(view), _STREAM_CHUNK_SIZE):
+            end = start + _STREAM_CHUNK_SIZE
+            yield view[start:end]
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            while chunk := f.read(_STREAM_CHUNK_SIZE):
+                yield chunk
+    else:
+        while chunk := source.read(_STREAM_CHUNK_SIZE):  # type: ignore
+            yield chunk
 
 
-def _parse_cfdi(cfdi: dict, version: str) -> Union[CFDI33, CFDI40]:
-    mapper = {"3.3": CFDI33, "4.0": CFDI40}
+class _NormalizingHandler:
+    """
+    Expat handler that builds the normalized dict of a XML in a single pass.
+
+    The output is the same as running ``normalize_dict_keys`` over the output of ``xmltodict.parse``, but keys are
+    normalized and namespace attributes are dropped as the events arrive, so no intermediate tree is built.
+    """
+
+    def __init__(self) -> None:
+        self.result: dict = {}
+        # every open element is tracked as [normalized name, item, text chunks]
+        self._stack: List[list] = []
+
+    def start(self, name: str, attrs: dict) -> None:
+        item = None
+        if attrs:
+            item = {}
+            for key, value in attrs.items():
+                # namespaces are not part of cfdi's, so they are omitted
+                if "xmlns" not in key and "xsi" not in key:
+                    item[_normalize_key(key)] = value
+        self._stack.append([_normalize_key(name.split(":")[-1]), item, []])
+
+    def characters(self, data: str) -> None:
+        self._stack[-1][2].append(data)
+
+    def end(self, name: str) -> None:
+        key, item, chunks = self._stack.pop()
+        text = ("".join(chunks).strip() or None) if chunks else None
+        if item is None:
+            item = text
+        elif text is not None:
+            item["#text"] = text
+        if not self._stack:
+            self.result[key] = item
+            return
+        parent = self._stack[-1]
+        if parent[1] is None:
+            parent[1] = {}
+        siblings = parent[1]
+        if key not in siblings:
+            siblings[key] = item
+        elif isinstance(siblings[key], list):
+            siblings[key].append(item)
+        else:
+            siblings[key] = [siblings[key], item]
+
+
+def _parse_normalized(source: XMLSource, details: Optional[dict] = None) -> dict:
+    """
+    Parses the XML in ``source`` straight into a dict with normalized keys.
+
+    Parameters
+    ----------
+    source: XMLSource
+        path, content or binary file-like object of the xml to read
+    details: Optional[dict]
+        When given, the number of bytes and nodes of the xml are stored in it (as "bytes" and "nodes")
+
+    Returns
+    -------
+    dict
+        Dictionary with keys in snake_case format and without namespace definitions
+
+    Raises
+    ------
+    InvalidCFDIError
+        If the xml is not well-formed
+    """
+    handler = _NormalizingHandler()
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.characters
+    if details is not None:
+        # nodes are only counted when asked, as it costs a call per node
+        nodes = itertools.count()
+
+        def start(name: str, attrs: dict) -> None:
+            next(nodes)
+            handler.start(name, attrs)
+
+        parser.StartElementHandler = start
+    try:
+        _parse_source(parser, source)
+    except expat.ExpatError as e:
+        raise InvalidCFDIError(f"The XML given is not well-formed: {e}") from None
+    if details is not None:
+        details["bytes"] = parser.CurrentByteIndex
+        details["nodes"] = next(nodes)
+    return handler.result
+
+
+class _StopParsing(Exception):
+    """Raised by an expat handler to stop reading the rest of the XML"""
+
+
+class _VerificationKeyHandler:
+    """
+    Expat handler that only looks at the attributes needed to verify a CFDI and stops once it has all of them.
+    """
+
+    #: Attribute of interest of every node (by their name without namespace) mapped to the field they fill
+    _ATTRIBUTES = {
+        "Comprobante": {"Version": "version", "Total": "total"},
+        "Emisor": {"Rfc": "rfc_emisor"},
+        "Receptor": {"Rfc": "rfc_receptor"},
+        "TimbreFiscalDigital": {"UUID": "uuid"},
+    }
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+
+    def start(self, name: str, attrs: dict) -> None:
+        attributes = self._ATTRIBUTES.get(name.split(":")[-1])
+        if attributes is None:
+            return
+        for attribute, field in attributes.items():
+            # only the first node counts, as complementos may have nodes with the same name
+            if attribute in attrs and field not in self.values:
+                self.values[field] = attrs[attribute].strip()
+        if len(self.values) == len(VerificationKey._fields):
+            raise _StopParsing()
+
+
+def read_verification_key(source: XMLSource) -> VerificationKey:
+    """
+    Reads only the details needed to verify a CFDI with the SAT (version, total, RFCs and UUID) without validating
+    the rest of the CFDI.
+
+    The xml is streamed and reading stops as soon as all the details are found.
+
+    Parameters
+    ----------
+    source: XMLSource
+        path, content (``bytes``, ``bytearray`` or ``memoryview``) or binary file-like object of the xml to read
+
+    Returns
+    -------
+    VerificationKey
+        Details of the CFDI, ready to be passed to ``cfdibills.verify``
+
+    Raises
+    ------
+    InvalidCFDIError
+        If the xml is not well-formed or a detail is missing
+    UnsupportedCFDIError
+        If the CFDI version of the XML is not supported
+    """
+    handler = _VerificationKeyHandler()
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = handler.start
+    try:
+        _parse_source(parser, source)
+    except _StopParsing:
+        pass
+    except expat.ExpatError as e:
+        raise InvalidCFDIError(f"The XML given is not well-formed: {e}") from None
+    values = handler.values
+    if "version" in values and values["version"] not in SUPPORTED_VERSIONS:
+        raise UnsupportedCFDIError(
+            f"Version '{values['version']}' is not supported. It must be one of {SUPPORTED_VERSIONS}."
+        )
+    if missing := [field for field in VerificationKey._fields if field not in values]:
+        raise InvalidCFDIError(f"The XML given does not contain {missing}.")
+    try:
+        total = Decimal(values["total"])
+    except ArithmeticError:
+        raise InvalidCFDIError(f"The total '{values['total']}' is not a valid number.") from None
+    return VerificationKey(values["uuid"], values["rfc_emisor"], values["rfc_receptor"], total, values["version"])
+
+
+def _xml_to_json(source: XMLSource, normalize: bool = True) -> dict:
+    if normalize:
+        return _parse_normalized(source)
+    # only the raw tree (as xmltodict builds it, to be normalized with normalize_dict_keys) needs xmltodict
+    import xmltodict
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return xmltodict.parse(f, dict_constructor=dict)
+    return xmltodict.parse(source, dict_constructor=dict)
+
+
+def _parse_cfdi(cfdi: dict, version: str, lazy: bool = False, validate: bool = True) -> Union[CFDI33, CFDI40]:
+    mapper = {"3.3": LazyCFDI33, "4.0": LazyCFDI40} if lazy and validate else {"3.3": CFDI33, "4.0": CFDI40}
     if (parser := mapper.get(version, None)) is None:
         raise UnsupportedCFDIError(f"Version '{version}' is not supported. It must be one of {mapper.keys()}.")
+    if not validate:
+        try:
+            return build_model(parser, cfdi)  # type: ignore
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise InvalidCFDIError(str(e)) from None
     try:
         # Mypy doesn't know that the parser is also of type BaseModel, so we have to tell it to ignore this line
-        parsed = parser.parse_obj(cfdi)  # type: ignore
-    except pydantic.ValidationError as e:
+        parsed = parser.parse_lazy(cfdi) if lazy else parse_model(parser, cfdi)  # type: ignore
+    except ValidationError as e:
         raise InvalidCFDIError(str(e)) from None
     return parsed
 
 
-def _camel_to_snake(camelcase: str) -> str:
+def _iter_schema_models(model: Type[BaseModel], seen: Set[type]) -> Iterator[Type[BaseModel]]:
+    """
+    Yields ``model`` and every model nested in its fields (DFS), skipping the ones already in ``seen``.
+    """
+    if model in seen:
+        return
+    seen.add(model)
+    yield model
+    hints = get_type_hints(model)
+    pending = [hints[name] for name in field_names(model) if name in hints]
+    while pending:
+        annotation = pending.pop()
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            yield from _iter_schema_models(annotation, seen)
+        else:
+            pending.extend(get_args(annotation))
+
+
+def _camel_case_candidates(snake_case: str) -> Iterator[str]:
+    """
+    Yields the ways in which ``snake_case`` may be written in SAT's xsd, i.e. every word capitalized and short words
+    (acronyms) also in uppercase ("uso_cfdi" -> "UsoCfdi", "UsoCFDI", "USOCfdi", "USOCFDI").
+    """
+    words = [
+        (word.capitalize(), word.upper()) if len(word) <= _MAX_ACRONYM_LENGTH else (word.capitalize(),)
+        for word in snake_case.split("_")
+    ]
+    for combination in itertools.product(*words):
+        yield "".join(combination)
+
+
+@lru_cache(maxsize=None)
+def _get_key_index() -> Dict[str, str]:
+    """
+    Builds the table to translate the keys defined by SAT's xsd to the names used by the schemas.
+
+    The table is generated from the fields (and names) of the CFDI models and their complementos, keeping only the
+    camelCase candidates that ``camel_to_snake`` maps back to the field, so a lookup is equivalent to the conversion.
+
+    Returns
+    -------
+    dict
+        Map of camelCase keys to snake_case keys
+    """
+    index = {}
+    seen: Set[type] = set()
+    for model in itertools.chain(_iter_schema_models(CFDI33, seen), _iter_schema_models(CFDI40, seen)):
+        for name in itertools.chain(field_names(model), [camel_to_snake(model.__name__)]):
+            for candidate in _camel_case_candidates(name):
+                if camel_to_snake(candidate) == name:
+                    index[candidate] = name
+    return index
+
+
+_normalize_unknown_key = lru_cache(maxsize=_UNKNOWN_KEYS_CACHE_SIZE)(camel_to_snake)
+
+
+def _normalize_key(key: str) -> str:
     """
-    Converts a camelCase string to a snake_case string
-    Source: https://stackoverflow.com/questions/1175208/elegant-python-function-to-convert-camelcase-to-snake-case
+    Converts a camelCase key to snake_case by looking it up in the keys index, falling back to ``camel_to_snake``
+    (with an LRU cache) for keys not defined by the schemas.
 
     Parameters
     ----------
-    camelcase: str
-        string to convert
+    key: str
+        camelCase key to convert
 
     Returns
     -------
     str
-        snake_cased string
+        snake_cased key
     """
-    camelcase = _name_pattern.sub(r"\1_\2", camelcase)
-    return _snake_pattern.sub(r"\1_\2", camelcase).lower()
+    normalized = _get_key_index().get(key)
+    return normalized if normalized is not None else _normalize_unknown_key(key)
 
 
 def normalize_dict_keys(ugly_dict: dict) -> dict:
@@ -80,7 +444,6 @@ def normalize_dict_keys(ugly_dict: dict) -> dict:
 
     Some special cases:
 
-    * if the item is a Decimal, map it to a float python number
     * if the item is a dictionary, normalize its children
     * if it is an array, normalize every item in it
 
@@ -95,29 +458,41 @@ def normalize_dict_keys(ugly_dict: dict) -> dict:
         Dictionary with keys in camel_case format
     """
     result = dict()
-    normalization: dict[Type[Union[list, dict, Decimal]], Callable] = {
-        list: lambda x: [normalize_dict_keys(y) for y in x],
-        dict: lambda x: normalize_dict_keys(x),
-        Decimal: lambda x: float(x),
-    }
     # normalize key by key in a DFS way
     for key, value in ugly_dict.items():
         # namespaces are not part of cfdi's, so they are omitted
         if "xmlns" not in key and "xsi" not in key:
             # get the normalized version of this key removing unwanted chars
-            new_key = _camel_to_snake(key[1:] if "@" in key else key.split(":")[-1])
+            new_key = _normalize_key(key[1:] if "@" in key else key.split(":")[-1])
             # normalize the item
-            result[new_key] = normalization[type(value)](value) if type(value) in normalization else value
+            result[new_key] = _normalize_value(value)
     return result
 
 
-def read_xml(path: str) -> Union[CFDI33, CFDI40]:
+def _normalize_value(value):
+    if isinstance(value, dict):
+        return normalize_dict_keys(value)
+    if isinstance(value, list):
+        return [_normalize_value(item) for item in value]
+    # any other value (strings or Decimals) is kept as is, so amounts never go through float
+    return value
+
+
+def read_xml(source: XMLSource, lazy: bool = False, validate: bool = True) -> Union[CFDI33, CFDI40]:
     """
     Reads a CFDI in a .xml and maps it to a pydantic object.
 
     Parameters
     ----------
-    path: path to the xml file to read
+    source: path to the xml file to read, its content (``bytes``, ``bytearray`` or ``memoryview``, which are parsed
+        without copying them) or a binary file-like object (like an HTTP response or a member of a ZIP file), which
+        is read until its end but not closed.
+    lazy: when True, ``conceptos``, ``complemento`` and ``addenda`` are validated the first time they are accessed
+        (see ``cfdibills.schemas.lazy``), so reading only the header of the CFDI is faster. In this case, an invalid
+        node raises ``InvalidCFDIError`` when it is accessed instead of when the xml is read.
+    validate: when False, the CFDI is built without validating it (see ``cfdibills.schemas.construct``), which is
+        several times faster than validating it with the pydantic v1 backend. Use it only for CFDIs already known to
+        be valid, like the ones validated when they were received. ``lazy`` has no effect in this case.
 
     Returns
     -------
@@ -131,6 +506,268 @@ def read_xml(path: str) -> Union[CFDI33, CFDI40]:
     UnsupportedCFDIError
         If the CFDI version of the XML is not supported
     """
-    normalized_xml = _xml_to_json(path)
+    if (tracer := get_tracer()) is not None:
+        return _read_xml_traced(tracer, source, lazy, validate)
+    normalized_xml = _xml_to_json(source)
     cfdi, version = _get_cfdi_with_version(normalized_xml)
-    return _parse_cfdi(cfdi, version)
+    return _parse_cfdi(cfdi, version, lazy, validate)
+
+
+def _read_xml_traced(tracer: Tracer, source: XMLSource, lazy: bool, validate: bool) -> Union[CFDI33, CFDI40]:
+    """
+    ``read_xml`` recording the span of every stage in ``tracer`` (see ``cfdibills.tracing``).
+    """
+    details: dict = {}
+    start = time.perf_counter()
+    normalized_xml = _parse_normalized(source, details)
+    parsed = time.perf_counter()
+    tracer.record("read_xml.parse", start, parsed, **details)
+    cfdi, version = _get_cfdi_with_version(normalized_xml)
+    result = _parse_cfdi(cfdi, version, lazy, validate)
+    tracer.record("read_xml.validate", parsed, time.perf_counter(), version=version, validate=validate, lazy=lazy)
+    return result
+
+
+class _ConceptosHandler(_NormalizingHandler):
+    """
+    Expat handler that builds the normalized dict of a CFDI like ``_NormalizingHandler``, except for its conceptos:
+    every concepto is handed to ``on_concepto`` as soon as it is complete instead of being added to the CFDI.
+    """
+
+    def __init__(self, on_concepto: Callable[[dict], None]) -> None:
+        super().__init__()
+        self._on_concepto = on_concepto
+        #: Version of the CFDI, known once its root element is read
+        self.version: Optional[str] = None
+
+    def start(self, name: str, attrs: dict) -> None:
+        if not self._stack:
+            self.version = attrs.get("Version")
+        super().start(name, attrs)
+
+    def end(self, name: str) -> None:
+        super().end(name)
+        if len(self._stack) == 2 and self._stack[-1][0] == "conceptos":
+            # the element just closed is the only child of conceptos, as the previous ones were already taken
+            key, item = self._stack[-1][1].popitem()
+            if key == "concepto":
+                self._on_concepto(item)
+
+
+def _stream_conceptos(source: XMLSource, handler: _ConceptosHandler, pending: List[dict]) -> Iterator[dict]:
+    """
+    Parses the XML in ``source`` in chunks with ``handler``, yielding the conceptos it puts in ``pending`` after every
+    chunk.
+    """
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.characters
+    try:
+        for chunk in _iter_source_chunks(source):
+            parser.Parse(chunk, False)  # type: ignore
+            yield from pending
+            pending.clear()
+        parser.Parse(b"", True)
+    except expat.ExpatError as e:
+        raise InvalidCFDIError(f"The XML given is not well-formed: {e}") from None
+    yield from pending
+
+
+def iter_conceptos(source: XMLSource, validate: bool = True) -> Iterator[Union[Concepto33, Concepto40]]:
+    """
+    Reads the conceptos of a CFDI one by one, as the xml is streamed.
+
+    Only a chunk of the xml and the conceptos in it are in memory at once, so CFDIs with thousands of conceptos can be
+    read with bounded memory. The rest of the CFDI can be read with ``read_header``.
+
+    Parameters
+    ----------
+    source: XMLSource
+        path, content or binary file-like object of the xml to read (see ``read_xml``)
+    validate: bool
+        Whether to validate the conceptos (see ``read_xml``)
+
+    Yields
+    ------
+    Union[cfdi33.Concepto, cfdi40.Concepto]
+        Every concepto of the CFDI, of the model of its version, in the order of the xml
+
+    Raises
+    ------
+    InvalidCFDIError
+        If the xml is not well-formed or a concepto is not valid, when it is reached
+    UnsupportedCFDIError
+        If the CFDI version of the XML is not supported
+    """
+    pending: List[dict] = []
+    handler = _ConceptosHandler(pending.append)
+    models = {"3.3": Concepto33, "4.0": Concepto40}
+    for i, concepto in enumerate(_stream_conceptos(source, handler, pending)):
+        if (model := models.get(handler.version)) is None:  # type: ignore
+            raise UnsupportedCFDIError(
+                f"Version '{handler.version}' is not supported. It must be one of {SUPPORTED_VERSIONS}."
+            )
+        try:
+            yield parse_model(model, concepto) if validate else build_model(model, concepto)  # type: ignore
+        except (ValidationError, ArithmeticError, TypeError, ValueError) as e:
+            raise InvalidCFDIError(f"Concepto {i} is not valid: {e}") from None
+
+
+def read_header(source: XMLSource, validate: bool = True) -> Union[CFDI33, CFDI40]:
+    """
+    Reads all of a CFDI but its conceptos, which are discarded as the xml is streamed (see ``iter_conceptos``).
+
+    Parameters
+    ----------
+    source: XMLSource
+        path, content or binary file-like object of the xml to read (see ``read_xml``)
+    validate: bool
+        Whether to validate the CFDI (see ``read_xml``)
+
+    Returns
+    -------
+    Union[CFDI33, CFDI40]
+        Pydantic object of the CFDI, with no conceptos
+
+    Raises
+    ------
+    InvalidCFDIError
+        If the xml is not in a valid format
+    UnsupportedCFDIError
+        If the CFDI version of the XML is not supported
+    """
+    handler = _ConceptosHandler(lambda concepto: None)
+    for _ in _stream_conceptos(source, handler, []):
+        pass
+    cfdi, version = _get_cfdi_with_version(handler.result)
+    return _parse_cfdi(cfdi, version, validate=validate)
+
+
+def _resolve_sources(paths_or_glob: Union[str, os.PathLike, Iterable[XMLSource]]) -> Iterable[XMLSource]:
+    if isinstance(paths_or_glob, (str, os.PathLike)):
+        pattern = os.fspath(paths_or_glob)
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.xml")
+        return sorted(glob.glob(pattern, recursive=True))
+    if _is_buffer(paths_or_glob) or hasattr(paths_or_glob, "read"):
+        raise TypeError("A single XML was given. Give an iterable of XMLs instead, like a list with it.")
+    # lazily, so the sources are only taken from the iterable as they are read
+    return (os.fspath(source) if isinstance(source, (str, os.PathLike)) else source for source in paths_or_glob)
+
+
+def _chunks(sources: Iterable[XMLSource], chunksize: int) -> Iterator[Tuple[int, List[XMLSource]]]:
+    """
+    Splits ``sources`` in lists of ``chunksize`` sources, along with the index of their first source.
+    """
+    iterator = iter(sources)
+    start = 0
+    while chunk := list(itertools.islice(iterator, chunksize)):
+        yield start, chunk
+        start += len(chunk)
+
+
+def _picklable(source: XMLSource) -> Union[str, bytes, OSError]:
+    """
+    ``source`` as it can be sent to another process: the content of buffers and file-like objects is copied to bytes.
+    A file-like object that can't be read is replaced by its error, to be reported in its ``ReadResult``.
+    """
+    if isinstance(source, (str, bytes)):
+        return source
+    if _is_buffer(source):
+        return bytes(source)  # type: ignore
+    try:
+        return source.read()  # type: ignore
+    except OSError as e:
+        return e
+
+
+def _read_chunk(
+    sources: Sequence[Union[XMLSource, OSError]], validate: bool = True, start: int = 0
+) -> List[ReadResult]:
+    results = []
+    for index, source in enumerate(sources, start):
+        path = source if isinstance(source, str) else None
+        try:
+            if isinstance(source, OSError):
+                raise source
+            results.append(ReadResult(path, cfdi=read_xml(source, validate=validate), index=index))
+        except (InvalidCFDIError, UnsupportedCFDIError, OSError) as e:
+            results.append(ReadResult(path, error=e, index=index))
+    return results
+
+
+def read_many(
+    paths_or_glob: Union[str, os.PathLike, Iterable[XMLSource]],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    chunksize: int = _DEFAULT_CHUNKSIZE,
+    validate: bool = True,
+) -> Iterator[ReadResult]:
+    """
+    Reads many CFDIs in parallel using a pool of processes.
+
+    XMLs that can't be read, or read as a CFDI, don't abort the batch: their error is returned in their
+    ``ReadResult``. Only a bounded window of XMLs (twice the number of workers, in chunks) is read ahead of the results
+    consumed, so memory doesn't grow with the number of XMLs.
+
+    Parameters
+    ----------
+    paths_or_glob: Union[str, os.PathLike, Iterable[XMLSource]]
+        XMLs to read, given as any source accepted by ``read_xml``: paths, contents (``bytes``, ``bytearray`` or
+        ``memoryview``) or binary file-like objects, which may be mixed. Can also be a directory (all of its .xml files
+        are read) or a glob pattern like ``"invoices/**/*.xml"``. Contents and file-like objects are copied to the
+        workers, so when they are many and small, ``workers=1`` may be faster.
+    workers: Optional[int]
+        Number of processes to use. Defaults to the number of CPUs. When 1, the XMLs are read in this process.
+    ordered: bool
+        Whether to yield the results in the same order as the XMLs (see ``ReadResult.index``) or as soon as they are
+        ready.
+    chunksize: int
+        Number of XMLs sent to a worker at once.
+    validate: bool
+        Whether to validate the CFDIs. See ``read_xml``.
+
+    Returns
+    -------
+    Iterator[ReadResult]
+        Result of reading every XML
+
+    Raises
+    ------
+    ValueError
+        If ``workers`` or ``chunksize`` are not positive
+    TypeError
+        If a single XML is given instead of an iterable of them
+    """
+    if (workers is not None and workers < 1) or chunksize < 1:
+        raise ValueError("Both 'workers' and 'chunksize' must be greater than 0")
+    chunks = _chunks(_resolve_sources(paths_or_glob), chunksize)
+    if workers == 1:
+        for start, sources in chunks:
+            yield from _read_chunk(sources, validate, start)
+        return
+    window = _READ_AHEAD_PER_WORKER * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        def submit(chunk: Tuple[int, List[XMLSource]]) -> Future:
+            start, sources = chunk
+            return executor.submit(_read_chunk, [_picklable(source) for source in sources], validate, start)
+
+        # the chunks in flight, done or not, are bounded by the window: a new one is submitted as one is consumed
+        pending = collections.deque(submit(chunk) for chunk in itertools.islice(chunks, window))
+        try:
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    future = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+                    pending.remove(future)
+                results = future.result()
+                pending.extend(submit(chunk) for chunk in itertools.islice(chunks, 1))
+                yield from results
+        finally:
+            # if the consumer stops early, do not wait for the chunks that are still pending
+            for future in pending:
+                future.cancel()
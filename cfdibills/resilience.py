@@ -0,0 +1,383 @@
+"""
+Protection of SAT's web service, and of the jobs that call it, when the service is overloaded or down.
+
+``Resilience`` wraps the calls to SAT with:
+
+* retries with exponential backoff and full jitter (``RetryPolicy``) of the errors that are likely transient: HTTP 429
+  and 5xx, responses in an unknown format and network errors
+* a token bucket (``TokenBucket``) that limits the rate of the calls, so big batches don't hammer SAT
+* a circuit breaker (``CircuitBreaker``) that fails fast with ``CircuitOpenError``, without calling SAT, after many
+  consecutive failures and until a cool-down has passed
+
+and counts what happened in its ``metrics``. A single ``Resilience`` is meant to be shared by all the calls of a
+process, from any thread or asyncio task::
+
+    resilience = Resilience(rate=10)
+    cfdibills.verify(cfdi, resilience=resilience)
+    print(resilience.metrics)
+"""
+
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from cfdibills.errors import CircuitOpenError, SATServiceError
+
+T = TypeVar("T")
+
+#: HTTP statuses with which SAT throttles the calls
+THROTTLE_STATUS_CODES = (429, 503)
+#: Exceptions of the HTTP clients raised when SAT could not be reached, by the module that defines them
+_NETWORK_ERRORS = {
+    "requests": ("ConnectionError", "Timeout"),
+    "httpx": ("TimeoutException", "NetworkError", "RemoteProtocolError"),
+}
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether ``error`` (raised when calling SAT) is likely to go away by calling again: HTTP 429 and 5xx responses,
+    responses in an unknown format and network errors.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, SATServiceError):
+        return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    for module_name, names in _NETWORK_ERRORS.items():
+        # if the client was never imported, it can't have raised the error
+        module = sys.modules.get(module_name)
+        if module is not None and isinstance(error, tuple(getattr(module, name) for name in names)):
+            return True
+    return False
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Decides which failed calls are retried and how long to wait before every retry.
+
+    The n-th retry waits a random time between 0 and ``base_delay * multiplier ** (n - 1)`` seconds (at most
+    ``max_delay``), so the clients that failed at the same time don't retry at the same time. When SAT says how long
+    to wait (with a Retry-After header), it waits at least that long.
+    """
+
+    #: Max number of calls, including the first one. 1 disables the retries.
+    attempts: int = 4
+    #: Seconds of the backoff of the first retry
+    base_delay: float = 0.5
+    #: Max seconds of a backoff
+    max_delay: float = 30.0
+    #: Factor by which the backoff grows with every retry
+    multiplier: float = 2.0
+    #: Whether to wait a random time up to the backoff (full jitter) instead of the whole backoff
+    jitter: bool = True
+    #: Decides whether a failed call is retried
+    retry_on: Callable[[BaseException], bool] = is_transient
+
+    def __post_init__(self) -> None:
+        if self.attempts < 1:
+            raise ValueError("'attempts' must be greater than 0")
+
+    def backoff(self, retry: int, error: Optional[BaseException] = None, rng: Any = random) -> float:
+        """
+        Seconds to wait before the ``retry``-th retry (starting at 1) of a call that failed with ``error``.
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        if self.jitter:
+            delay = rng.uniform(0, delay)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class TokenBucket:
+    """
+    Rate limiter that lets ``rate`` calls per second through, with bursts of up to ``capacity`` calls. It is safe to
+    use from many threads and tasks.
+
+    Parameters
+    ----------
+    rate: float
+        Calls per second
+    capacity: Optional[float]
+        Max number of calls let through at once after being idle. Defaults to the calls of one second.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("'rate' must be greater than 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token for a call, returning the seconds the call must wait before using it (0 if it can go now).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # the tokens go negative to queue the calls in the order they arrived
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Stops calling SAT after ``failure_threshold`` consecutive failures (it "opens").
+
+    While open, the calls fail with ``CircuitOpenError`` without calling SAT. After ``reset_timeout`` seconds it lets a
+    single call through ("half-open"): if it succeeds it closes again, and if it fails it opens for another
+    ``reset_timeout``. It is safe to use from many threads and tasks.
+
+    Parameters
+    ----------
+    failure_threshold: int
+        Consecutive failures that open the breaker
+    reset_timeout: float
+        Seconds the breaker stays open before trying to call SAT again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        if failure_threshold < 1:
+            raise ValueError("'failure_threshold' must be greater than 0")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        #: Times the breaker has opened
+        self.opened = 0
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        Current state: ``CLOSED``, ``OPEN`` or ``HALF_OPEN`` (when the next call will be let through to try SAT).
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """
+        Raises ``CircuitOpenError`` if the call must not be sent to SAT.
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"SAT is considered down. It will be called again in {remaining:.1f}s.")
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError("SAT is considered down. It is being called again to check it.")
+                self._probing = True
+
+    def record_success(self) -> None:
+        """
+        Records that SAT answered a call.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """
+        Records that a call failed because of SAT, opening the breaker if there were too many in a row.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.opened += 1
+            self._probing = False
+
+    def _release(self) -> None:
+        # the call was interrupted (like a cancelled task) or failed for another reason, so it tells nothing about SAT
+        with self._lock:
+            self._probing = False
+
+
+@dataclass
+class ResilienceMetrics:
+    """
+    What happened to the calls made through a ``Resilience``.
+    """
+
+    #: Calls sent to SAT, including the retries
+    attempts: int = 0
+    #: Calls retried after a transient error
+    retries: int = 0
+    #: Responses of SAT throttling the calls (HTTP 429 or 503)
+    throttles: int = 0
+    #: Calls that waited for the rate limiter
+    rate_limited: int = 0
+    #: Seconds waited for the rate limiter, in total
+    rate_limited_seconds: float = 0.0
+    #: Calls that failed after all their attempts or with an error that is not retried
+    failures: int = 0
+    #: Calls rejected without calling SAT because the circuit breaker was open
+    rejected: int = 0
+    #: Times the circuit breaker opened
+    breaker_opened: int = 0
+    #: State of the circuit breaker: "closed", "open" or "half-open"
+    breaker_state: str = CircuitBreaker.CLOSED
+
+
+class Resilience:
+    """
+    Calls SAT's web service with retries, rate limiting and a circuit breaker. See the module's docs.
+
+    Parameters
+    ----------
+    retry: Optional[RetryPolicy]
+        Which calls are retried and how long to wait between them. Defaults to ``RetryPolicy()``.
+    rate: Optional[float]
+        Max calls per second to SAT (retries included). Not limited by default.
+    burst: Optional[float]
+        Max calls let through at once when limiting the ``rate``. Defaults to the calls of one second.
+    breaker: Optional[CircuitBreaker]
+        Circuit breaker of the calls. Defaults to ``CircuitBreaker()``.
+    seed: Optional[int]
+        Seed of the jitter of the backoffs
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.limiter = TokenBucket(rate, burst) if rate is not None else None
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._metrics = ResilienceMetrics()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    @property
+    def metrics(self) -> ResilienceMetrics:
+        """
+        Snapshot of the metrics of the calls made so far.
+        """
+        with self._lock:
+            return replace(self._metrics, breaker_opened=self.breaker.opened, breaker_state=self.breaker.state)
+
+    def _count(self, **increments: float) -> None:
+        with self._lock:
+            for name, increment in increments.items():
+                setattr(self._metrics, name, getattr(self._metrics, name) + increment)
+
+    def _before_attempt(self) -> float:
+        """
+        Checks the breaker and takes a token, returning the seconds to wait before calling SAT.
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count(rejected=1, failures=1)
+            raise
+        wait = self.limiter.reserve() if self.limiter is not None else 0.0
+        if wait > 0:
+            self._count(rate_limited=1, rate_limited_seconds=wait)
+        return wait
+
+    def _after_failure(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Records a failed call, returning the seconds to wait before retrying it or None if it must not be retried.
+        """
+        if isinstance(error, SATServiceError) and error.status_code in THROTTLE_STATUS_CODES:
+            self._count(throttles=1)
+        if not self.retry.retry_on(error):
+            # calling again can't help, but it doesn't tell whether SAT is up either
+            self.breaker._release()
+            self._count(failures=1)
+            return None
+        self.breaker.record_failure()
+        if attempt >= self.retry.attempts:
+            self._count(failures=1)
+            return None
+        self._count(retries=1)
+        with self._lock:
+            return self.retry.backoff(attempt, error, self._random)
+
+    def call(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Calls ``function(*args, **kwargs)`` (like ``consulta_cfdi_service``), retrying it while it fails with a
+        transient error.
+
+        Raises
+        ------
+        CircuitOpenError
+            When the circuit breaker is open.
+        Exception
+            The error of the last attempt, when it is not retried or there are no attempts left.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            wait = self._before_attempt()
+            try:
+                if wait > 0:
+                    time.sleep(wait)
+                self._count(attempts=1)
+                result = function(*args, **kwargs)
+            except Exception as error:
+                backoff = self._after_failure(error, attempt)
+                if backoff is None:
+                    raise
+                time.sleep(backoff)
+                continue
+            except BaseException:
+                self.breaker._release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, function: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Same as ``call`` for coroutine functions (like ``consulta_cfdi_service_async``), without blocking the event
+        loop while waiting.
+        """
+        import asyncio
+
+        attempt = 0
+        while True:
+            attempt += 1
+            wait = self._before_attempt()
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._count(attempts=1)
+                result = await function(*args, **kwargs)
+            except Exception as error:
+                backoff = self._after_failure(error, attempt)
+                if backoff is None:
+                    raise
+                await asyncio.sleep(backoff)
+                continue
+            except BaseException:
+                self.breaker._release()
+                raise
+            self.breaker.record_success()
+            return result
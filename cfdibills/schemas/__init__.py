@@ -1,6 +1,49 @@
 """
 CFDIs definition.
+
+The schemas, catalogs and complementos are imported the first time they are used (e.g. ``cfdibills.schemas.UsoCFDI``).
 """
-from . import cfdi33, cfdi40
-from .catalogs import *
-from .complementos import *
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from . import cfdi33, cfdi40
+    from .catalogs import *
+    from .complementos import *
+
+#: Schemas exported as modules
+_SCHEMAS = ("cfdi33", "cfdi40")
+#: Modules whose public names are exported by the package
+_EXPORTING_MODULES = ("catalogs", "complementos")
+
+
+def _exported_names() -> List[str]:
+    names = list(_SCHEMAS)
+    for module_name in _EXPORTING_MODULES:
+        module = importlib.import_module(f".{module_name}", __name__)
+        names += [name for name in vars(module) if not name.startswith("_")]
+    return names
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__all__":
+        # requested by "from cfdibills.schemas import *", which needs everything
+        value: Any = _exported_names()
+    elif name in _SCHEMAS:
+        value = importlib.import_module(f".{name}", __name__)
+    elif name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    else:
+        for module_name in _EXPORTING_MODULES:
+            module = importlib.import_module(f".{module_name}", __name__)
+            if name in vars(module):
+                value = vars(module)[name]
+                break
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_exported_names()})
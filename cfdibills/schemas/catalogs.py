@@ -1,70 +1,86 @@
 """
 Catalogs required to define CFDIs.
+
+Lookups by code in these and in the bigger catalogs of SAT are in ``cfdibills.catalogs``.
 """
 
 from enum import Enum
+from typing import Optional, Type, TypeVar
+
+Catalog = TypeVar("Catalog", bound="CatalogEnum")
 
 
-class UsoCFDI(str, Enum):
+class CatalogEnum(str, Enum):
+    """
+    Base of the catalogs. The value of every member is its code, which can be followed by its description::
+
+        G01 = "G01", "Adquisición de mercancías"
+    """
+
+    #: Description of the code in the catalog of SAT
+    description: Optional[str]
+
+    def __new__(cls, code: str, description: Optional[str] = None):
+        member = str.__new__(cls, code)
+        member._value_ = code
+        member.description = description
+        return member
+
+    @classmethod
+    def get(cls: Type[Catalog], code: str) -> Optional[Catalog]:
+        """
+        Member of the catalog with the given code.
+
+        Unlike calling the enum, an unknown code is not an error.
+
+        Parameters
+        ----------
+        code: str
+            Code to look up
+
+        Returns
+        -------
+        Optional[CatalogEnum]
+            The member with the code, or None if the catalog doesn't have it
+        """
+        return cls._value2member_map_.get(code)  # type: ignore
+
+
+class UsoCFDI(CatalogEnum):
     """
     Catalog of "Uso CFDI".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    #: Adquisición de mercancías
-    G01 = "G01"
-    #: Devoluciones, descuentos o bonificaciones
-    G02 = "G02"
-    #: Gastos en general
-    G03 = "G03"
-    #: Construcciones
-    I01 = "I01"
-    #: Mobiliario y equipo de oficina por inversiones
-    I02 = "I02"
-    #: Equipo de transporte
-    I03 = "I03"
-    #: Equipo de cómputo y accesorios
-    I04 = "I04"
-    #: Dados, troqueles, moldes, matrices y herramental
-    I05 = "I05"
-    #: Comunicaciones telefónicas
-    I06 = "I06"
-    #: Comunicaciones satelitales
-    I07 = "I07"
-    #: Otra maquinaria y equipo
-    I08 = "I08"
-    #: Honorarios médicos, dentales y gastos hospitalarios.
-    D01 = "D01"
-    #: Gastos médicos por incapacidad o discapacidad
-    D02 = "D02"
-    #: Gastos funerales.
-    D03 = "D03"
-    #: Donativos.
-    D04 = "D04"
-    #: Intereses reales efectivamente pagados por créditos hipotecarios (casa habitación).
-    D05 = "D05"
-    #: Aportaciones voluntarias al SAR.
-    D06 = "D06"
-    #: Primas por seguros de gastos médicos.
-    D07 = "D07"
-    #: Gastos de transportación escolar obligatoria.
-    D08 = "D08"
-    #: Depósitos en cuentas para el ahorro, primas que tengan como base planes de pensiones.
-    D09 = "D09"
-    #: Pagos por servicios educativos (colegiaturas)
-    D10 = "D10"
-    #: Por definir
-    P01 = "P01"
-    #: Sin efectos fiscales
-    S01 = "S01"
-    #: Pagos
-    CP01 = "CP01"
-    #: Nómina
-    CN01 = "CN01"
-
-
-class Pais(str, Enum):
+    G01 = "G01", "Adquisición de mercancías"
+    G02 = "G02", "Devoluciones, descuentos o bonificaciones"
+    G03 = "G03", "Gastos en general"
+    I01 = "I01", "Construcciones"
+    I02 = "I02", "Mobiliario y equipo de oficina por inversiones"
+    I03 = "I03", "Equipo de transporte"
+    I04 = "I04", "Equipo de cómputo y accesorios"
+    I05 = "I05", "Dados, troqueles, moldes, matrices y herramental"
+    I06 = "I06", "Comunicaciones telefónicas"
+    I07 = "I07", "Comunicaciones satelitales"
+    I08 = "I08", "Otra maquinaria y equipo"
+    D01 = "D01", "Honorarios médicos, dentales y gastos hospitalarios."
+    D02 = "D02", "Gastos médicos por incapacidad o discapacidad"
+    D03 = "D03", "Gastos funerales."
+    D04 = "D04", "Donativos."
+    D05 = "D05", "Intereses reales efectivamente pagados por créditos hipotecarios (casa habitación)."
+    D06 = "D06", "Aportaciones voluntarias al SAR."
+    D07 = "D07", "Primas por seguros de gastos médicos."
+    D08 = "D08", "Gastos de transportación escolar obligatoria."
+    D09 = "D09", "Depósitos en cuentas para el ahorro, primas que tengan como base planes de pensiones."
+    D10 = "D10", "Pagos por servicios educativos (colegiaturas)"
+    P01 = "P01", "Por definir"
+    S01 = "S01", "Sin efectos fiscales"
+    CP01 = "CP01", "Pagos"
+    CN01 = "CN01", "Nómina"
+
+
+class Pais(CatalogEnum):
     """
     Catalog of "Pais".
 
@@ -323,122 +339,87 @@ class Pais(str, Enum):
     ZZZ = "ZZZ"
 
 
-class Impuesto(str, Enum):
+class Impuesto(CatalogEnum):
     """
     Catalog of "Impuesto".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    #: Impuesto Sobre la Renta (ISR)
-    isr = "001"
-    #: Impuesto al Valor Agregado (IVA)
-    iva = "002"
-    #: Impuesto Especial Sobre Producción y Servicios (IEPS)
-    ieps = "003"
+    isr = "001", "Impuesto Sobre la Renta (ISR)"
+    iva = "002", "Impuesto al Valor Agregado (IVA)"
+    ieps = "003", "Impuesto Especial Sobre Producción y Servicios (IEPS)"
 
 
-class TipoFactor(str, Enum):
+class TipoFactor(CatalogEnum):
     """
     Catalog of "Tipo Factor".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    #: Tasa
-    tasa = "Tasa"
-    #: Cuota
-    cuota = "Cuota"
-    #: Exento
-    exento = "Exento"
+    tasa = "Tasa", "Tasa"
+    cuota = "Cuota", "Cuota"
+    exento = "Exento", "Exento"
 
 
-class TipoDeComprobante(str, Enum):
+class TipoDeComprobante(CatalogEnum):
     """
     Catalog of "Tipo De Comprobante".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    #: Ingreso
-    ingreso = "I"
-    #: Egreso
-    egreso = "E"
-    #: Traslado
-    traslado = "T"
-    #: Nomina
-    nomina = "N"
-    #: Pago
-    pago = "P"
+    ingreso = "I", "Ingreso"
+    egreso = "E", "Egreso"
+    traslado = "T", "Traslado"
+    nomina = "N", "Nomina"
+    pago = "P", "Pago"
 
 
-class MetodoDePago(str, Enum):
+class MetodoDePago(CatalogEnum):
     """
     Catalog of "Metodo De Pago".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    #: Pago en una sola exhibición
-    pue = "PUE"
-    #: Pago en parcialidades o diferido
-    ppd = "PPD"
+    pue = "PUE", "Pago en una sola exhibición"
+    ppd = "PPD", "Pago en parcialidades o diferido"
 
 
-class FormaPago(str, Enum):
+class FormaPago(CatalogEnum):
     """
     Catalog of "Forma Pago".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    #: Efectivo
-    efectivo = "01"
-    #: Cheque nominativo
-    cheque_nominativo = "02"
-    #: Transferencia electrónica de fondos
-    transferencia = "03"
-    #: Tarjeta de crédito
-    tarjeta_de_credito = "04"
-    #: Monedero electrónico
-    monedero_electronico = "05"
-    #: Dinero electrónico
-    dinero_electronico = "06"
-    #: Vales de despensa
-    vales_de_despensa = "08"
-    #: Dación en pago
-    dacion_en_pago = "12"
-    #: Pago por subrogación
-    pago_subrogacion = "13"
-    #: Pago por consignación
-    pago_consignacion = "14"
-    #: Condonación
-    condonacion = "15"
-    #: Compensación
-    compensacion = "17"
-    #: Novación
-    novacion = "23"
-    #: Confusión
-    confusion = "24"
-    #: Remisión de deuda
-    remision = "25"
-    #: Prescripción o caducidad
-    prescripcion = "26"
-    #: A satisfacción del acreedor
-    a_satisfaccion = "27"
-    #: Tarjeta de débito
-    tarjeta_de_debito = "28"
-    #: Tarjeta de servicios
-    tarjeta_de_servicios = "29"
-    #: Aplicación de anticipos
-    aplicacion_de_anticipos = "30"
-    #: Intermediario pagos
-    intermediario_pagos = "31"
-    #: Por definir
-    por_definir = "99"
-
-
-class Moneda(str, Enum):
+    efectivo = "01", "Efectivo"
+    cheque_nominativo = "02", "Cheque nominativo"
+    transferencia = "03", "Transferencia electrónica de fondos"
+    tarjeta_de_credito = "04", "Tarjeta de crédito"
+    monedero_electronico = "05", "Monedero electrónico"
+    dinero_electronico = "06", "Dinero electrónico"
+    vales_de_despensa = "08", "Vales de despensa"
+    dacion_en_pago = "12", "Dación en pago"
+    pago_subrogacion = "13", "Pago por subrogación"
+    pago_consignacion = "14", "Pago por consignación"
+    condonacion = "15", "Condonación"
+    compensacion = "17", "Compensación"
+    novacion = "23", "Novación"
+    confusion = "24", "Confusión"
+    remision = "25", "Remisión de deuda"
+    prescripcion = "26", "Prescripción o caducidad"
+    a_satisfaccion = "27", "A satisfacción del acreedor"
+    tarjeta_de_debito = "28", "Tarjeta de débito"
+    tarjeta_de_servicios = "29", "Tarjeta de servicios"
+    aplicacion_de_anticipos = "30", "Aplicación de anticipos"
+    intermediario_pagos = "31", "Intermediario pagos"
+    por_definir = "99", "Por definir"
+
+
+class Moneda(CatalogEnum):
     """
     Catalog of "Moneda".
 
@@ -625,126 +606,117 @@ class Moneda(str, Enum):
     ZWL = "ZWL"
 
 
-class TipoRelacion(str, Enum):
+class TipoRelacion(CatalogEnum):
     """
     Catalog of "Tipo Relacion".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    #: Nota de crédito de los documentos relacionados
-    nota_credito = "01"
-    #: Nota de débito de los documentos relacionados
-    nota_debito = "02"
-    #: Devolución de mercancía sobre facturas o traslados previos
-    devolucion = "03"
-    #: Sustitución de los CFDI previos
-    sustitucion = "04"
-    #: Traslados de mercancias facturados previamente
-    traslados = "05"
-    #: Factura generada por los traslados previos
-    factura_traslados = "06"
-    #: CFDI por aplicación de anticipo
-    aplicacion_de_anticipo = "07"
-    #: Facturas Generadas por Pagos en Parcialidades
-    pagos_en_parcialidades = "08"
-    #: Factura Generada por Pagos Diferidos
-    pagos_diferidos = "09"
-
-
-class RegimenFiscal(str, Enum):
+    nota_credito = "01", "Nota de crédito de los documentos relacionados"
+    nota_debito = "02", "Nota de débito de los documentos relacionados"
+    devolucion = "03", "Devolución de mercancía sobre facturas o traslados previos"
+    sustitucion = "04", "Sustitución de los CFDI previos"
+    traslados = "05", "Traslados de mercancias facturados previamente"
+    factura_traslados = "06", "Factura generada por los traslados previos"
+    aplicacion_de_anticipo = "07", "CFDI por aplicación de anticipo"
+    pagos_en_parcialidades = "08", "Facturas Generadas por Pagos en Parcialidades"
+    pagos_diferidos = "09", "Factura Generada por Pagos Diferidos"
+
+
+class RegimenFiscal(CatalogEnum):
     """
     Catalog of "Regimen Fiscal".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    r601 = "601"
-    r603 = "603"
-    r605 = "605"
-    r606 = "606"
-    r607 = "607"
-    r608 = "608"
-    r609 = "609"
-    r610 = "610"
-    r611 = "611"
-    r612 = "612"
-    r614 = "614"
-    r615 = "615"
-    r616 = "616"
-    r620 = "620"
-    r621 = "621"
-    r622 = "622"
-    r623 = "623"
-    r624 = "624"
-    r625 = "625"
-    r626 = "626"
-    r628 = "628"
-    r629 = "629"
-    r630 = "630"
-
-
-class ObjetoImp(str, Enum):
+    r601 = "601", "General de Ley Personas Morales"
+    r603 = "603", "Personas Morales con Fines no Lucrativos"
+    r605 = "605", "Sueldos y Salarios e Ingresos Asimilados a Salarios"
+    r606 = "606", "Arrendamiento"
+    r607 = "607", "Régimen de Enajenación o Adquisición de Bienes"
+    r608 = "608", "Demás ingresos"
+    r609 = "609", "Consolidación"
+    r610 = "610", "Residentes en el Extranjero sin Establecimiento Permanente en México"
+    r611 = "611", "Ingresos por Dividendos (socios y accionistas)"
+    r612 = "612", "Personas Físicas con Actividades Empresariales y Profesionales"
+    r614 = "614", "Ingresos por intereses"
+    r615 = "615", "Régimen de los ingresos por obtención de premios"
+    r616 = "616", "Sin obligaciones fiscales"
+    r620 = "620", "Sociedades Cooperativas de Producción que optan por diferir sus ingresos"
+    r621 = "621", "Incorporación Fiscal"
+    r622 = "622", "Actividades Agrícolas, Ganaderas, Silvícolas y Pesqueras"
+    r623 = "623", "Opcional para Grupos de Sociedades"
+    r624 = "624", "Coordinados"
+    r625 = "625", "Régimen de las Actividades Empresariales con ingresos a través de Plataformas Tecnológicas"
+    r626 = "626", "Régimen Simplificado de Confianza"
+    r628 = "628", "Hidrocarburos"
+    r629 = "629", "De los Regímenes Fiscales Preferentes y de las Empresas Multinacionales"
+    r630 = "630", "Enajenación de acciones en bolsa de valores"
+
+
+class ObjetoImp(CatalogEnum):
     """
     Catalog of "Objecto Imp".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    o01 = "01"
-    o02 = "02"
-    o03 = "03"
+    o01 = "01", "No objeto de impuesto."
+    o02 = "02", "Sí objeto de impuesto."
+    o03 = "03", "Sí objeto del impuesto y no obligado al desglose."
 
 
-class Periodicidad(str, Enum):
+class Periodicidad(CatalogEnum):
     """
     Catalog of "Periodicidad".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    p01 = "01"
-    p02 = "02"
-    p03 = "03"
-    p04 = "04"
-    p05 = "05"
+    p01 = "01", "Diario"
+    p02 = "02", "Semanal"
+    p03 = "03", "Quincenal"
+    p04 = "04", "Mensual"
+    p05 = "05", "Bimestral"
 
 
-class Meses(str, Enum):
+class Meses(CatalogEnum):
     """
     Catalog of "Meses".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    m01 = "01"
-    m02 = "02"
-    m03 = "03"
-    m04 = "04"
-    m05 = "05"
-    m06 = "06"
-    m07 = "07"
-    m08 = "08"
-    m09 = "09"
-    m10 = "10"
-    m11 = "11"
-    m12 = "12"
-    m13 = "13"
-    m14 = "14"
-    m15 = "15"
-    m16 = "16"
-    m17 = "17"
-    m18 = "18"
-
-
-class Exportacion(str, Enum):
+    m01 = "01", "Enero"
+    m02 = "02", "Febrero"
+    m03 = "03", "Marzo"
+    m04 = "04", "Abril"
+    m05 = "05", "Mayo"
+    m06 = "06", "Junio"
+    m07 = "07", "Julio"
+    m08 = "08", "Agosto"
+    m09 = "09", "Septiembre"
+    m10 = "10", "Octubre"
+    m11 = "11", "Noviembre"
+    m12 = "12", "Diciembre"
+    m13 = "13", "Enero-Febrero"
+    m14 = "14", "Marzo-Abril"
+    m15 = "15", "Mayo-Junio"
+    m16 = "16", "Julio-Agosto"
+    m17 = "17", "Septiembre-Octubre"
+    m18 = "18", "Noviembre-Diciembre"
+
+
+class Exportacion(CatalogEnum):
     """
     Catalog of "Exportacion".
 
     http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd
     """
 
-    e01 = "01"
-    e02 = "02"
-    e03 = "03"
-    e04 = "04"
+    e01 = "01", "No aplica"
+    e02 = "02", "Definitiva con clave A1"
+    e03 = "03", "Temporal"
+    e04 = "04", "Definitiva con clave distinta a A1 o cuando no existe enajenación en términos del CFF"
@@ -3,10 +3,9 @@ Schemas of CFDI v4.0.
 """
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, NonNegativeFloat
 from typing_extensions import Annotated
 
 from cfdibills.schemas.catalogs import (
@@ -25,12 +24,31 @@ from cfdibills.schemas.catalogs import (
     TipoRelacion,
     UsoCFDI,
 )
-from cfdibills.schemas.complementos import ComplementoType
-from cfdibills.schemas.fields import RFC, NonNegativeSixDecimals, PositiveSixDecimals
+from cfdibills.schemas.compat import BaseModel, Field
+from cfdibills.schemas.complementos import parse_complementos
+from cfdibills.schemas.fields import (
+    RFC,
+    Alphanumeric5,
+    Digits5,
+    Digits10,
+    Digits20,
+    Digits150,
+    NonNegativeDecimal,
+    NonNegativeSixDecimals,
+    NumeroPedimento,
+    PositiveSixDecimals,
+    Text20,
+    Text25,
+    Text40,
+    Text100,
+    Text300,
+    Text1000,
+)
 from cfdibills.schemas.mixins import CFDIMixin
 from cfdibills.schemas.validators import (
     dict2list,
     dict2list_flatten,
+    in_catalog,
     reusable_validator,
 )
 
@@ -47,13 +65,13 @@ class Emisor(BaseModel):
     rfc: RFC
     #: Atributo requerido para registrar el nombre, denominación o razón social del contribuyente inscrito en el RFC,
     #: del emisor del comprobante.
-    nombre: Annotated[str, Field(min_length=1, max_length=300, regex=r"[^|]{1,300}")]
+    nombre: Text300
     #: Atributo requerido para incorporar la clave del régimen del contribuyente emisor al que aplicará el efecto
     #: fiscal de este comprobante.
     regimen_fiscal: RegimenFiscal
     #: Atributo condicional para expresar el número de operación proporcionado por el SAT cuando se trate de un
     #: comprobante a través de un PCECFDI o un PCGCFDISP.
-    fac_atr_adquirente: Optional[Annotated[str, Field(min_length=10, max_length=10, regex=r"[0-9]{10}")]]
+    fac_atr_adquirente: Optional[Digits10] = None
 
 
 class Receptor(BaseModel):
@@ -68,22 +86,24 @@ class Receptor(BaseModel):
     rfc: RFC
     #: Atributo requerido para registrar el nombre(s), primer apellido, segundo apellido, según corresponda,
     #: denominación o razón social del contribuyente, inscrito en el RFC, del receptor del comprobante.
-    nombre: Annotated[str, Field(min_length=1, max_length=300, regex=r"[^|]{1,300}")]
+    nombre: Text300
     #: Atributo requerido para registrar el código postal del domicilio fiscal del receptor del comprobante.
-    domicilio_fiscal_receptor: Annotated[str, Field(min_length=5, max_length=5, regex=r"[0-9]{5}")]
+    domicilio_fiscal_receptor: Digits5
     #: Atributo condicional para registrar la clave del país de residencia para efectos fiscales del receptor del
     #: comprobante, cuando se trate de un extranjero, y que es conforme con la especificación ISO 3166-1 alpha-3.
     #: Es requerido cuando se incluya el complemento de comercio exterior o se registre el atributo NumRegIdTrib.
-    residencia_fiscal: Optional[Pais]
+    residencia_fiscal: Optional[Pais] = None
     #: Atributo condicional para expresar el número de registro de identidad fiscal del receptor cuando sea residente
     #: en el extranjero. Es requerido cuando se incluya el complemento de comercio exterior.
-    num_reg_id_trib: Optional[Annotated[str, Field(min_length=1, max_length=40)]]
+    num_reg_id_trib: Optional[Annotated[str, Field(min_length=1, max_length=40)]] = None
     #: Atributo requerido para incorporar la clave del régimen del contribuyente receptor al que aplicará el efecto
     #: fiscal de este comprobante.
     regimen_fiscal_receptor: RegimenFiscal
     #: Atributo requerido para expresar la clave del uso que dará a esta factura el receptor del CFDI.
     uso_cfdi: UsoCFDI
 
+    _in_codigo_postal = reusable_validator("domicilio_fiscal_receptor")(in_catalog("CodigoPostal"))
+
 
 class Traslado(BaseModel):
     """
@@ -101,10 +121,10 @@ class Traslado(BaseModel):
     tipo_factor: TipoFactor
     #: Atributo condicional para señalar el valor de la tasa o cuota del impuesto que se traslada para el presente
     #: concepto. Es requerido cuando el atributo TipoFactor tenga una clave que corresponda a Tasa o Cuota.
-    tasa_o_cuota: Optional[NonNegativeSixDecimals]
+    tasa_o_cuota: Optional[NonNegativeSixDecimals] = None
     #: Atributo condicional para señalar el importe del impuesto trasladado que aplica al concepto. No se permiten
     #: valores negativos. Es requerido cuando TipoFactor sea Tasa o Cuota
-    importe: Optional[NonNegativeSixDecimals]
+    importe: Optional[NonNegativeSixDecimals] = None
 
 
 class Retencion(BaseModel):
@@ -157,9 +177,7 @@ class InformacionAduanera(BaseModel):
     #: corresponde al último dígito del año en curso, salvo que se trate de un pedimento consolidado iniciado en el año
     #: inmediato anterior o del pedimento original de una rectificación, seguido de 6 dígitos de la numeración
     #: progresiva por aduana.
-    numero_pedimento: Annotated[
-        str, Field(min_length=21, max_length=21, regex=r"[0-9]{2}  [0-9]{2}  [0-9]{4}  [0-9]{7}")
-    ]
+    numero_pedimento: NumeroPedimento
 
 
 class CuentaPredial(BaseModel):
@@ -172,7 +190,7 @@ class CuentaPredial(BaseModel):
     #: Atributo requerido para precisar el número de la cuenta predial del inmueble cubierto por el presente concepto,
     #: o bien para incorporar los datos de identificación del certificado de participación inmobiliaria no amortizable,
     #: tratándose de arrendamiento.
-    numero: Annotated[str, Field(min_length=1, max_length=150, regex=r"[0-9]{1,150}")]
+    numero: Digits150
 
 
 class Parte(BaseModel):
@@ -191,24 +209,25 @@ class Parte(BaseModel):
     clave_prod_serv: str
     #: Atributo opcional para expresar el número de serie, número de parte del bien o identificador del producto o del
     #: servicio amparado por la presente parte. Opcionalmente se puede utilizar claves del estándar GTIN
-    no_identificacion: Optional[Annotated[str, Field(min_length=1, max_length=100, regex=r"[^|]{1,100}")]]
+    no_identificacion: Optional[Text100] = None
     #: Atributo requerido para precisar la cantidad de bienes o servicios del tipo particular definido por la presente
     #: parte.
     cantidad: PositiveSixDecimals
     #: Atributo opcional para precisar la unidad de medida propia de la operación del emisor, aplicable para la
     #: cantidad expresada en la parte. La unidad debe corresponder con la descripción de la parte.
-    unidad: Optional[Annotated[str, Field(min_length=1, max_length=20, regex=r"[^|]{1,20}")]]
+    unidad: Optional[Text20] = None
     #: Atributo requerido para precisar la descripción del bien o servicio cubierto por la presente parte.
-    descripcion: Annotated[str, Field(min_length=1, max_length=1000, regex=r"[^|]{1,1000}")]
+    descripcion: Text1000
     #: Atributo opcional para precisar el valor o precio unitario del bien o servicio cubierto por la presente parte.
     #: No se permiten valores negativos
-    valor_unitario: Optional[NonNegativeFloat]
+    valor_unitario: Optional[NonNegativeDecimal] = None
     #: Atributo opcional para precisar el importe total de los bienes o servicios de la presente parte. Debe ser
     #: equivalente al resultado de multiplicar la cantidad por el valor unitario expresado en la parte.
     #: No se permiten valores negativos.
-    importe: Optional[NonNegativeSixDecimals]
+    importe: Optional[NonNegativeSixDecimals] = None
 
     _to_array = reusable_validator("informacion_aduanera", pre=True)(dict2list)
+    _in_clave_prod_serv = reusable_validator("clave_prod_serv")(in_catalog("ClaveProdServ"))
 
 
 class ACuentaTerceros(BaseModel):
@@ -223,13 +242,13 @@ class ACuentaTerceros(BaseModel):
     rfc_a_cuenta_terceros: RFC
     #: Atributo requerido para registrar el nombre, denominación o razón social del contribuyente Tercero
     #: correspondiente con el Rfc, a cuenta del que se realiza la operación.
-    nombre_a_cuenta_terceros: Annotated[str, Field(min_length=1, max_length=300, regex=r"[^|]{1,300}")]
+    nombre_a_cuenta_terceros: Text300
     #: Atributo requerido para incorporar la clave del régimen del contribuyente Tercero, a cuenta del que se realiza
     #: la operación.
     regimen_fiscal_a_cuenta_terceros: RegimenFiscal
     #: Atributo requerido para incorporar el código postal del domicilio fiscal del Tercero, a cuenta del que se
     #: realiza la operación.
-    domicilio_fiscal_a_cuenta_terceros: Annotated[str, Field(min_length=5, max_length=5, regex=r"[0-9]{5}")]
+    domicilio_fiscal_a_cuenta_terceros: Digits5
 
 
 class Concepto(BaseModel):
@@ -241,7 +260,7 @@ class Concepto(BaseModel):
 
     #: Nodo opcional para capturar los impuestos aplicables al presente concepto. Cuando un concepto no registra un
     #: impuesto, implica que no es objeto del mismo.
-    impuestos: Optional[ImpuestosConcepto]
+    impuestos: Optional[ImpuestosConcepto] = None
     #: Nodo opcional para introducir la información aduanera aplicable cuando se trate de ventas de primera mano de
     #: mercancías importadas o se trate de operaciones de comercio exterior con bienes o servicios.
     informacion_aduanera: List[InformacionAduanera] = []
@@ -263,7 +282,7 @@ class Concepto(BaseModel):
     #: Atributo opcional para expresar el número de parte, identificador del producto o del servicio, la clave de
     #: producto o servicio, SKU o equivalente, propia de la operación del emisor, amparado por el presente concepto.
     #: Opcionalmente se puede utilizar claves del estándar GTIN.
-    no_identificacion: Optional[Annotated[str, Field(min_length=1, max_length=100, regex=r"[^|]{1,100}")]]
+    no_identificacion: Optional[Text100] = None
     #: Atributo requerido para precisar la cantidad de bienes o servicios del tipo particular definido por el presente
     #: concepto.
     cantidad: PositiveSixDecimals
@@ -272,11 +291,11 @@ class Concepto(BaseModel):
     clave_unidad: str
     #: Atributo opcional para precisar la unidad de medida propia de la operación del emisor, aplicable para la
     #: cantidad expresada en el concepto. La unidad debe corresponder con la descripción del concepto.
-    unidad: Optional[Annotated[str, Field(min_length=1, max_length=20, regex=r"[^|]{1,20}")]]
+    unidad: Optional[Text20] = None
     #: Atributo requerido para precisar la descripción del bien o servicio cubierto por el presente concepto.
-    descripcion: Annotated[str, Field(min_length=1, max_length=1000, regex=r"[^|]{1,1000}")]
+    descripcion: Text1000
     #: Atributo requerido para precisar el valor o precio unitario del bien o servicio cubierto por el presente concepto
-    valor_unitario: float
+    valor_unitario: Decimal
     #: Atributo requerido para precisar el importe total de los bienes o servicios del presente concepto. Debe ser
     #: equivalente al resultado de multiplicar la cantidad por el valor unitario expresado en el concepto.
     #: No se permiten valores negativos.
@@ -292,6 +311,7 @@ class Concepto(BaseModel):
     _to_array = reusable_validator(
         "complemento_concepto", "cuenta_predial", "informacion_aduanera", "a_cuenta_terceros", "parte", pre=True
     )(dict2list)
+    _in_clave_prod_serv = reusable_validator("clave_prod_serv")(in_catalog("ClaveProdServ"))
 
 
 class RetencionCFDI(BaseModel):
@@ -416,10 +436,10 @@ class CFDI40(BaseModel, CFDIMixin):
     version: Literal["4.0"]
     #: Atributo opcional para precisar la serie para control interno del contribuyente. Este atributo acepta
     #: una cadena de caracteres
-    serie: Optional[Annotated[str, Field(min_length=1, max_length=25, regex=r"[^|]{1,25}")]]
+    serie: Optional[Text25] = None
     #: Atributo opcional para control interno del contribuyente que expresa el folio del comprobante, acepta una
     #: cadena de caracteres.
-    folio: Optional[Annotated[str, Field(min_length=1, max_length=40, regex=r"[^|]{1,40}")]]
+    folio: Optional[Text40] = None
     #: Atributo requerido para la expresión de la fecha y hora de expedición del Comprobante Fiscal Digital por
     #: Internet. Se expresa en la forma AAAA-MM-DDThh:mm:ss y debe corresponder con la hora local donde se expide el
     #: comprobante.
@@ -429,16 +449,16 @@ class CFDI40(BaseModel, CFDIMixin):
     sello: str
     #: Atributo condicional para expresar la clave de la forma de pago de los bienes o servicios amparados por el
     #: comprobante. Si no se conoce la forma de pago este atributo se debe omitir.
-    forma_pago: Optional[FormaPago]
+    forma_pago: Optional[FormaPago] = None
     #: Atributo requerido para expresar el número de serie del certificado de sello digital que ampara al comprobante,
     #: de acuerdo con el acuse correspondiente a 20 posiciones otorgado por el sistema del SAT.
-    no_certificado: Annotated[str, Field(min_length=1, max_length=20, regex=r"[0-9]{20}")]
+    no_certificado: Digits20
     #: Atributo requerido que sirve para incorporar el certificado de sello digital que ampara al comprobante, como
     #: texto en formato base 64.
     certificado: str
     #: Atributo condicional para expresar las condiciones comerciales aplicables para el pago del comprobante fiscal
     #: digital por Internet. Este atributo puede ser condicionado mediante atributos o complementos.
-    condiciones_de_pago: Optional[Annotated[str, Field(min_length=1, max_length=1000, regex=r"[^|]{1,1000}")]]
+    condiciones_de_pago: Optional[Text1000] = None
     #: Atributo requerido para representar la suma de los importes de los conceptos antes de descuentos e impuesto.
     #: No se permiten valores negativos.
     sub_total: NonNegativeSixDecimals
@@ -454,7 +474,7 @@ class CFDI40(BaseModel, CFDIMixin):
     #: moneda tomado del catálogo c_Moneda, el emisor debe obtener del PAC que vaya a timbrar el CFDI, de manera no
     #: automática, una clave de confirmación para ratificar que el valor es correcto e integrar dicha clave en el
     #: atributo Confirmacion.
-    tipo_cambio: Optional[PositiveSixDecimals]
+    tipo_cambio: Optional[PositiveSixDecimals] = None
     #: Atributo requerido para representar la suma del subtotal, menos los descuentos aplicables, más las contribuciones
     #: recibidas (impuestos trasladados - federales o locales, derechos, productos, aprovechamientos, aportaciones de
     #: seguridad social, contribuciones de mejoras) menos los impuestos retenidos. Si el valor es superior al límite que
@@ -466,16 +486,16 @@ class CFDI40(BaseModel, CFDIMixin):
     tipo_de_comprobante: TipoDeComprobante
     #: Atributo condicional para precisar la clave del método de pago que aplica para este comprobante fiscal digital
     #: por Internet, conforme al Artículo 29-A fracción VII incisos a y b del CFF
-    metodo_pago: Optional[MetodoDePago]
+    metodo_pago: Optional[MetodoDePago] = None
     #: Atributo requerido para incorporar el código postal del lugar de expedición del comprobante (domicilio de la
     #: matriz o de la sucursal).
     lugar_expedicion: str
     #: Atributo condicional para registrar la clave de confirmación que entregue el PAC para expedir el comprobante con
     #: importes grandes, con un tipo de cambio fuera del rango establecido o con ambos casos. Es requerido cuando se
     #: registra un tipo de cambio o un total fuera del rango establecido.
-    confirmacion: Optional[Annotated[str, Field(min_length=5, max_length=5, regex=r"[0-9a-zA-Z]{5}")]]
+    confirmacion: Optional[Alphanumeric5] = None
     #: Nodo opcional para precisar la información de los comprobantes relacionados.
-    cfdi_relacionados: Optional[CfdiRelacionados]
+    cfdi_relacionados: Optional[CfdiRelacionados] = None
     #: Nodo requerido para expresar la información del contribuyente emisor del comprobante.
     emisor: Emisor
     #: Nodo requerido para precisar la información del contribuyente receptor del comprobante
@@ -483,18 +503,22 @@ class CFDI40(BaseModel, CFDIMixin):
     #: Nodo requerido para listar los conceptos cubiertos por el comprobante.
     conceptos: List[Concepto]
     #: Nodo condicional para expresar el resumen de los impuestos aplicables.
-    impuestos: Optional[ImpuestosCFDI]
+    impuestos: Optional[ImpuestosCFDI] = None
     #: Nodo opcional donde se incluye el complemento Timbre Fiscal Digital de manera obligatoria y los nodos
     #: complementarios determinados por el SAT, de acuerdo con las disposiciones particulares para un sector o
     #: actividad específica.
-    complemento: List[ComplementoType] = []
+    #: They are built by ``parse_complementos`` (unknown ones are kept as dicts), so they are not validated again
+    #: against every type of ``ComplementoType``.
+    complemento: List[Any] = []
     #: Nodo opcional para recibir las extensiones al presente formato que sean de utilidad al contribuyente.
     #: Para las reglas de uso del mismo, referirse al formato origen.
-    addenda: Optional[Dict]
+    addenda: Optional[Dict] = None
     #: Nodo condicional para precisar la información relacionada con el comprobante global.
     informacion_global: List[InformacionGlobal] = []
     #: Atributo requerido para expresar si el comprobante ampara una operación de exportación.
     exportacion: Exportacion
 
     _info_global_to_array = reusable_validator("informacion_global", pre=True)(dict2list)
-    _to_array = reusable_validator("complemento", "conceptos", pre=True)(dict2list_flatten)
+    _to_array = reusable_validator("conceptos", pre=True)(dict2list_flatten)
+    _complementos = reusable_validator("complemento", pre=True)(parse_complementos)
+    _in_codigo_postal = reusable_validator("lugar_expedicion")(in_catalog("CodigoPostal"))
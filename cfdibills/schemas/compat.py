@@ -0,0 +1,262 @@
+"""
+Compatibility layer to define and run the schemas with pydantic v1 or v2.
+
+The backend is detected from the installed version of pydantic. When pydantic v2 is installed, the v1 backend (shipped
+by pydantic v2 as ``pydantic.v1``) can still be selected by setting the environment variable ``CFDIBILLS_PYDANTIC=1``
+before importing ``cfdibills``.
+
+Models registered by third parties (like complementos) must inherit from the ``BaseModel`` exported here.
+"""
+
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Set, Type, TypeVar
+
+import pydantic
+
+from cfdibills.schemas.patterns import anchor, compile_pattern
+
+#: Name of the environment variable used to select the major version of pydantic used as backend
+BACKEND_ENV_VAR = "CFDIBILLS_PYDANTIC"
+
+#: Whether the installed pydantic is v2
+_INSTALLED_V2 = pydantic.VERSION.startswith("2.")
+
+#: Whether the schemas are validated by pydantic v2 (pydantic-core)
+PYDANTIC_V2 = _INSTALLED_V2 and os.environ.get(BACKEND_ENV_VAR, "2") != "1"
+
+if PYDANTIC_V2:
+    from pydantic import (  # noqa: F401
+        BaseModel,
+        PrivateAttr,
+        ValidationError,
+        condecimal,
+    )
+    from pydantic import constr as _constr
+    from pydantic import field_validator as _field_validator  # type: ignore
+    from pydantic.fields import Field as _Field
+elif _INSTALLED_V2:
+    from pydantic.v1 import (  # type: ignore # noqa: F401
+        BaseModel,
+        PrivateAttr,
+        ValidationError,
+        condecimal,
+    )
+    from pydantic.v1 import constr as _constr  # type: ignore
+    from pydantic.v1 import validator as _validator  # type: ignore
+    from pydantic.v1.errors import StrRegexError  # type: ignore
+    from pydantic.v1.fields import Field as _Field  # type: ignore
+    from pydantic.v1.types import ConstrainedStr  # type: ignore
+else:
+    from pydantic import (  # type: ignore # noqa: F401
+        BaseModel,
+        PrivateAttr,
+        ValidationError,
+        condecimal,
+    )
+    from pydantic import constr as _constr  # type: ignore
+    from pydantic import validator as _validator  # type: ignore
+    from pydantic.errors import StrRegexError  # type: ignore
+    from pydantic.fields import Field as _Field  # type: ignore
+    from pydantic.types import ConstrainedStr  # type: ignore
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def Field(*args, pattern: str = None, **kwargs) -> Any:
+    """
+    ``pydantic.Field`` taking the regular expression as ``pattern`` in both backends.
+    """
+    if pattern is not None:
+        kwargs["pattern" if PYDANTIC_V2 else "regex"] = pattern
+    return _Field(*args, **kwargs)
+
+
+def constr(*, pattern: str = None, **kwargs) -> Any:
+    """
+    ``pydantic.constr`` taking the regular expression as ``pattern`` in both backends.
+    """
+    if pattern is not None:
+        kwargs["pattern" if PYDANTIC_V2 else "regex"] = pattern
+    return _constr(**kwargs)
+
+
+def pattern_str(pattern: str, *, min_length: int = None, max_length: int = None, strip_whitespace: bool = False) -> Any:
+    """
+    Type of a string that must match ``pattern`` as a whole (see ``cfdibills.schemas.patterns``).
+
+    With pydantic v2 the anchored pattern is matched by pydantic-core. With pydantic v1, the pattern is checked by the
+    function built by ``compile_pattern``, avoiding the regex when possible.
+
+    Parameters
+    ----------
+    pattern: str
+        Regular expression the string must match
+    min_length: int
+        Min length of the string
+    max_length: int
+        Max length of the string
+    strip_whitespace: bool
+        Whether to strip the whitespace around the string before validating it
+    """
+    if PYDANTIC_V2:
+        return _constr(  # type: ignore
+            pattern=anchor(pattern), min_length=min_length, max_length=max_length, strip_whitespace=strip_whitespace
+        )
+    matches = compile_pattern(pattern)
+
+    def validate(cls, value: str) -> str:
+        if not matches(value):
+            raise StrRegexError(pattern=pattern)
+        return value
+
+    namespace = {
+        "min_length": min_length,
+        "max_length": max_length,
+        "strip_whitespace": strip_whitespace,
+        # only used by the json schema, as validate is replaced
+        "regex": re.compile(anchor(pattern)),
+        "pattern": pattern,
+        "validate": classmethod(validate),
+    }
+    return type("PatternStr", (ConstrainedStr,), namespace)
+
+
+def validator(*fields: str, pre: bool = False) -> Callable[[Callable], Any]:
+    """
+    Decorator of a validator of ``fields`` that can be reused by several models.
+
+    Parameters
+    ----------
+    *fields: str
+        Names of the fields to validate
+    pre: bool
+        Whether the validator runs before the validation of the field's type
+
+    Returns
+    -------
+    Callable
+        Decorator of the validator
+    """
+    if PYDANTIC_V2:
+        return _field_validator(*fields, mode="before" if pre else "after")
+    return _validator(*fields, pre=pre, allow_reuse=True)
+
+
+def parse_model(model: Type[Model], obj: Any) -> Model:
+    """
+    Validates ``obj`` as an instance of ``model``.
+
+    Raises
+    ------
+    ValidationError
+        If ``obj`` is not valid
+    """
+    if PYDANTIC_V2:
+        return model.model_validate(obj)  # type: ignore
+    return model.parse_obj(obj)  # type: ignore
+
+
+def dump_model(instance: BaseModel) -> Dict[str, Any]:
+    """
+    Converts ``instance`` (and its nested models) to a dict.
+    """
+    if PYDANTIC_V2:
+        return instance.model_dump()  # type: ignore
+    return instance.dict()  # type: ignore
+
+
+def field_names(model: Type[BaseModel]) -> Iterable[str]:
+    """
+    Names of the fields of ``model``.
+    """
+    if PYDANTIC_V2:
+        return model.model_fields.keys()  # type: ignore
+    return model.__fields__.keys()  # type: ignore
+
+
+def validate_field(instance: BaseModel, name: str, value: Any) -> Any:
+    """
+    Validates ``value`` as the field ``name`` of ``instance`` and stores it in the instance, without validating the
+    rest of its fields.
+
+    Returns
+    -------
+    Any
+        The validated value
+
+    Raises
+    ------
+    ValidationError
+        If ``value`` is not valid
+    """
+    model = type(instance)
+    if PYDANTIC_V2:
+        model.__pydantic_validator__.validate_assignment(instance, name, value)  # type: ignore
+        return instance.__dict__[name]
+    field = model.__fields__[name]  # type: ignore
+    validated, errors = field.validate(value, instance.__dict__, loc=name, cls=model)
+    if errors:
+        raise ValidationError([errors], model)  # type: ignore
+    instance.__dict__[name] = validated
+    return validated
+
+
+def construct_model(model: Type[Model], values: Dict[str, Any], fields_set: Set[str]) -> Model:
+    """
+    Creates an instance of ``model`` from the values of all of its fields (already of the right types) without
+    validating them, like ``construct`` does but without filling the defaults.
+
+    Parameters
+    ----------
+    model: Type[BaseModel]
+        Model to instantiate
+    values: Dict[str, Any]
+        Value of every field of the model, including the ones that take their default
+    fields_set: Set[str]
+        Names of the fields that were explicitly set
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    if PYDANTIC_V2:
+        object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        if model.__pydantic_post_init__:  # type: ignore
+            instance.model_post_init(None)  # type: ignore
+    else:
+        object.__setattr__(instance, "__fields_set__", fields_set)
+        instance._init_private_attributes()  # type: ignore
+    return instance
+
+
+def field_defaults(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Default values of the fields of ``model`` that are not required.
+    """
+    if PYDANTIC_V2:
+        fields = model.model_fields.items()  # type: ignore
+        return {name: field.get_default(call_default_factory=True) for name, field in fields if not field.is_required()}
+    return {name: field.get_default() for name, field in model.__fields__.items() if not field.required}  # type: ignore
+
+
+def pre_validators(model: Type[BaseModel]) -> Dict[str, List[Callable[[Any], Any]]]:
+    """
+    Functions of the validators of ``model`` that run before the validation of the type of their fields. All the
+    validators of the schemas take the value as their only argument.
+
+    Returns
+    -------
+    Dict[str, List[Callable[[Any], Any]]]
+        Validators by the name of the field they validate, in order of execution
+    """
+    validators: Dict[str, List[Callable[[Any], Any]]] = {}
+    if PYDANTIC_V2:
+        for decorator in model.__pydantic_decorators__.field_validators.values():  # type: ignore
+            if decorator.info.mode == "before":
+                for name in decorator.info.fields:
+                    validators.setdefault(name, []).append(decorator.func)
+    else:
+        for name, field_validators in model.__validators__.items():  # type: ignore
+            validators[name] = [decorator.func for decorator in field_validators if decorator.pre]  # type: ignore
+    return validators
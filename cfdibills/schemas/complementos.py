@@ -3,11 +3,12 @@ Complementos available to appear in a CFDI.
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional, TypeVar, Union
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Type, TypeVar, Union
 from uuid import UUID
 
-from pydantic import BaseModel
-
+from cfdibills.schemas.compat import BaseModel, ValidationError, parse_model
+from cfdibills.schemas.naming import camel_to_snake
 from cfdibills.schemas.validators import (
     dict2list,
     dict2list_flatten,
@@ -35,7 +36,7 @@ class TimbreFiscalDigital(BaseModel):
     #: genera el timbre fiscal digital.
     rfc_prov_certif: str
     #: Atributo opcional para registrar información que el SAT comunique a los usuarios del CFDI.
-    leyenda: Optional[str]
+    leyenda: Optional[str] = None
     #: Atributo requerido para contener el sello digital del comprobante fiscal o del comprobante de retenciones,
     #: que se ha timbrado. El sello debe ser expresado como una cadena de texto en formato Base 64.
     sello_cfd: str
@@ -68,10 +69,10 @@ class Aerolineas(BaseModel):
             #: Atributo requerido para indicar el código del cargo según el catálogo de la IATA.
             codigo_cargo: str
             #: Atributo requerido para representar el importe del cargo.
-            importe: float
+            importe: Decimal
 
         #: Atributo requerido para expresar el total de los cargos adicionales que se están aplicando.
-        total_cargos: float
+        total_cargos: Decimal
         cargo: List[Cargo]
 
         _to_array = reusable_validator("cargo", pre=True)(dict2list)
@@ -79,11 +80,11 @@ class Aerolineas(BaseModel):
     #: Atributo requerido para la expresión de la versión del complemento
     version: str
     #: Atributo requerido para indicar el importe del TUA aplicable al boleto.
-    tua: float
+    tua: Decimal
     #: Tipo definido para expresar importes numéricos con fracción hasta seis decimales
-    importe: float
+    importe: Decimal
     #: Nodo opcional para expresar otros cargos aplicables
-    otros_cargos: Optional[OtrosCargos]
+    otros_cargos: Optional[OtrosCargos] = None
 
 
 class CertificadoDeDestruccion(BaseModel):
@@ -102,19 +103,19 @@ class CertificadoDeDestruccion(BaseModel):
         #: Atributo requerido para la expresión del año del vehículo.
         año: int
         #: Atributo opcional para expresar el modelo del vehículo que se destruyó.
-        modelo: Optional[str]
+        modelo: Optional[str] = None
         #: Atributo opcional para expresar el número de identificación vehicular del vehículo (Cuando exista el NIV
         #: deberá incluirse este invariablemente).
-        niv: Optional[str]
+        niv: Optional[str] = None
         #: Atributo opcional para expresar el número de serie de la carrocería del vehículo (en caso de contar con
         #: dicho número se deberá ingresar)
-        num_serie: Optional[str]
+        num_serie: Optional[str] = None
         #: Atributo requerido para expresar el número de placas metálicas de identificación del servicio público
         #: federal o, en su caso, del servicio público de autotransporte de pasajero urbano o suburbano.
         num_placas: str
         #: Atributo opcional para expresar el número de motor del vehículo (en caso de contar con dicho número se
         #: deberá ingresar).
-        num_motor: Optional[str]
+        num_motor: Optional[str] = None
         #: Atributo requerido para expresar el número de folio de la tarjeta de circulación.
         num_fol_tarj_cir: str
 
@@ -140,17 +141,17 @@ class CertificadoDeDestruccion(BaseModel):
     vehiculo_destruido: VehiculoDestruido
     #: Nodo opcional para expresar la información aduanera aplicable cuando se trate de un vehículo importado que
     #: se destruyó.
-    informacion_aduanera: Optional[InformacionAduanera]
+    informacion_aduanera: Optional[InformacionAduanera] = None
 
 
 class ComercioExteriorDomicilio(BaseModel):
     calle: str
-    numero_exterior: Optional[str]
-    numerio_interior: Optional[str]
-    colonia: Optional[str]
-    localidad: Optional[str]
-    referencia: Optional[str]
-    municipio: Optional[str]
+    numero_exterior: Optional[str] = None
+    numerio_interior: Optional[str] = None
+    colonia: Optional[str] = None
+    localidad: Optional[str] = None
+    referencia: Optional[str] = None
+    municipio: Optional[str] = None
     estado: str
     pais: str
     codigo_postal: str
@@ -165,13 +166,13 @@ class ComercioExterior(BaseModel):
 
     class Emisor(BaseModel):
 
-        domicilio: Optional[ComercioExteriorDomicilio]
+        domicilio: Optional[ComercioExteriorDomicilio] = None
         #: Atributo condicional para expresar la CURP del emisor del CFDI cuando es una persona física.
-        curp: Optional[str]
+        curp: Optional[str] = None
 
     class Receptor(BaseModel):
-        domicilio: Optional[ComercioExteriorDomicilio]
-        num_reg_id_trib: Optional[str]
+        domicilio: Optional[ComercioExteriorDomicilio] = None
+        num_reg_id_trib: Optional[str] = None
 
     class Propietario(BaseModel):
         #: Atributo requerido para incorporar el número de identificación o registro fiscal del país de residencia para
@@ -187,21 +188,21 @@ class ComercioExterior(BaseModel):
         domicilio: List[ComercioExteriorDomicilio]
         #: Atributo opcional para incorporar el número de identificación o registro fiscal del país de residencia para
         #: efectos fiscales del destinatario de la mercancía exportada.
-        num_reg_id_trib: Optional[str]
+        num_reg_id_trib: Optional[str] = None
         #: Atributo opcional para expresar el nombre completo, denominación o razón social del destinatario de la
         #: mercancía exportada.
-        nombre: Optional[str]
+        nombre: Optional[str] = None
 
     class Mercancia(BaseModel):
         class DescripcionEspecifica(BaseModel):
             #: Atributo requerido que indica la marca de la mercancía.
             marca: str
             #: Atributo opcional que indica el modelo de la mercancía.
-            modelo: Optional[str]
+            modelo: Optional[str] = None
             #: Atributo opcional que indica el submodelo de la mercancía.
-            sub_modelo: Optional[str]
+            sub_modelo: Optional[str] = None
             #: Atributo opcional que indica el número de serie de la mercancía.
-            numero_serie: Optional[str]
+            numero_serie: Optional[str] = None
 
         #: Atributo requerido que sirve para expresar el número de parte, la clave de identificación que asigna la
         #: empresa o el número de serie de la mercancía exportada.
@@ -210,34 +211,34 @@ class ComercioExterior(BaseModel):
         #: descripción de la mercancía exportada, este dato se vuelve requerido cuando se cuente con él o se esté
         #: obligado legalmente a contar con él.Debe ser conforme con el catálogo c_FraccionArancelaria publicado en el
         #: portal del SAT en internet.
-        fraccion_arancelaria: Optional[str]
+        fraccion_arancelaria: Optional[str] = None
         #: Atributo opcional para precisar la cantidad de bienes en la aduana conforme a la UnidadAduana cuando en el
         #: nodo Comprobante:Conceptos:Concepto se hubiera registrado información comercial.
-        cantidad_aduana: Optional[float]
+        cantidad_aduana: Optional[Decimal] = None
         #: Atributo condicional para precisar la clave de la unidad de medida aplicable para la cantidad expresada en
         #: la mercancía en la aduana, conforme con el catálogo c_UnidadAduana publicado en el portal del SAT en
         #: internet.
-        unidad_aduana: Optional[str]
+        unidad_aduana: Optional[str] = None
         #: Atributo condicional para precisar el valor o precio unitario del bien en la aduana. Se expresa en dólares
         #: de Estados Unidos (USD), el cual puede estar registrado hasta centésimas.
-        valor_unitario_aduana: Optional[float]
+        valor_unitario_aduana: Optional[Decimal] = None
         #: Atributo requerido que indica el valor total en dólares de Estados Unidos (USD).
-        valor_dolares: float
+        valor_dolares: Decimal
         #: Nodo opcional que indica la lista de descripciones específicas de la mercancía.
         #: Una mercancía puede tener más de una descripción específica.
         descripciones_especificas: List[DescripcionEspecifica] = []
 
         _to_array = reusable_validator("descripciones_especificas", pre=True)(dict2list)
 
-    emisor: Optional[Emisor]
+    emisor: Optional[Emisor] = None
     #: Nodo condicional para capturar los datos del o los propietarios de la mercancía que se traslada y ésta no sea
     #: objeto de enajenación o siéndolo sea a título gratuito, cuando el emisor del CFDI es un tercero.
     propietario: List[Propietario] = []
     #: Nodo condicional para capturar los datos complementarios del receptor del CFDI.
-    receptor: Optional[Receptor]
+    receptor: Optional[Receptor] = None
     #: Nodo opcional para capturar los datos del destinatario de la mercancía cuando éste sea distinto del receptor
     #: del CFDI.
-    destinatario: Optional[Destinatario]
+    destinatario: Optional[Destinatario] = None
     #: Nodo condicional para capturar la información de la declaración de las mercancías exportadas.
     mercancias: List[Mercancia] = []
     #: Atributo requerido que indica la versión del complemento.
@@ -246,40 +247,144 @@ class ComercioExterior(BaseModel):
     #: clave de pedimento A1, éstas no son objeto de enajenación o siéndolo sean a título gratuito, desde el domicilio
     #: del emisor hacia el domicilio del receptor o del destinatario. La clave del motivo es conforme con el catálogo
     #: c_MotivoTraslado publicado en el portal del SAT en internet.
-    motivo_traslado: Optional[str]
+    motivo_traslado: Optional[str] = None
     #: Atributo requerido que indica la clave del tipo de operación de Comercio Exterior que se realiza, conforme con
     #: el catálogo c_TipoOperacion publicado en el portal del SAT en internet.
     tipo_operacion: str
     #: Atributo condicional que indica la clave de pedimento que se haya declarado conforme con el catálogo c
     #: ClavePedimento publicado en el portal del SAT en internet.
-    clave_de_pedimento: Optional[str]
+    clave_de_pedimento: Optional[str] = None
     #: Atributo condicional derivado de la excepción de certificados de Origen de los Tratados de Libre Comercio que ha
     #: celebrado México con diversos países. 0 = No Funge como certificado de origen 1 = Funge como certificado de
     #: origen.
-    certificado_origen: Optional[int]
+    certificado_origen: Optional[int] = None
     #: Atributo condicional para expresar el folio del certificado de origen o el folio fiscal del CFDI con el que se
     #: pagó la expedición del certificado de origen.
-    num_certificado_origen: Optional[str]
+    num_certificado_origen: Optional[str] = None
     #: Atributo condicional que indica el número de exportador confiable, conforme al artículo 22 del Anexo 1 del
     #: Tratado de Libre Comercio con la Asociación Europea y a la Decisión de la Comunidad Europea.
-    num_exportador_confiable: Optional[str]
+    num_exportador_confiable: Optional[str] = None
     #: Atributo condicional que indica la clave del INCOTERM aplicable a la factura, conforme con el catálogo
     #: c_INCOTERM publicado en el portal del SAT en internet.
-    incoterm: Optional[str]
+    incoterm: Optional[str] = None
     #: Atributo condicional que indica si la factura tiene o no subdivisión. Valores posibles: 0 - no tiene
     #: subdivisión,1 - si tiene subdivisión.
-    subdivision: Optional[int]
+    subdivision: Optional[int] = None
     #: Atributo opcional en caso de ingresar alguna información adicional, como alguna leyenda que debe incluir en
     #: el CFDI.
-    observaciones: Optional[str]
+    observaciones: Optional[str] = None
     #: Atributo condicional que indica el número de pesos mexicanos que equivalen a un dólar de Estados Unidos, de
     #: acuerdo al artículo 20 del Código Fiscal de la Federación.
-    tipo_cambio_usd: Optional[str]
+    tipo_cambio_usd: Optional[str] = None
     #: Atributo condicional que indica el importe total del comprobante en dólares de Estados Unidos.
-    total_usd: Optional[float]
+    total_usd: Optional[Decimal] = None
 
     _to_array = reusable_validator("mercancias", pre=True)(dict2list_flatten)
 
 
 ComplementoType = Union[TimbreFiscalDigital, Aerolineas, CertificadoDeDestruccion, ComercioExterior, Dict]
-AnyComplementoType = TypeVar("AnyComplementoType", bound=ComplementoType)
+# BaseModel stands for the complementos registered by third parties
+AnyComplementoType = TypeVar("AnyComplementoType", bound=Union[ComplementoType, BaseModel])
+
+#: Models of the complementos, by the normalized name of their node
+_complementos: Dict[str, Type[BaseModel]] = {}
+
+
+def register_complemento(node_name: str, model: Type[BaseModel]) -> None:
+    """
+    Registers the model used to parse a complemento, so it can be read from a CFDI and retrieved with
+    ``get_complemento``.
+
+    Parameters
+    ----------
+    node_name: str
+        Name of the node of the complemento as written in the XML, like ``"tfd:TimbreFiscalDigital"``. The namespace
+        prefix is optional and ignored, as it is chosen by whoever writes the XML.
+    model: Type[BaseModel]
+        Model of the complemento. Replaces any model previously registered for ``node_name``.
+    """
+    _complementos[camel_to_snake(node_name.split(":")[-1])] = model
+
+
+def get_complemento_model(node_name: str) -> Optional[Type[BaseModel]]:
+    """
+    Gets the model registered for a complemento.
+
+    Parameters
+    ----------
+    node_name: str
+        Name of the node of the complemento, either as written in the XML or normalized (``"timbre_fiscal_digital"``).
+
+    Returns
+    -------
+    Optional[Type[BaseModel]]
+        Model of the complemento or None if it is unknown
+    """
+    return _complementos.get(camel_to_snake(node_name.split(":")[-1]))
+
+
+def _parse_unnamed_complemento(complemento: dict) -> Union[BaseModel, dict]:
+    # without the name of its node, every model is tried until one matches
+    for model in _complementos.values():
+        try:
+            return parse_model(model, complemento)
+        except ValidationError:
+            pass
+    return complemento
+
+
+def parse_complementos(original: Union[dict, list, None]) -> list:
+    """
+    Parses the children of a "Complemento" node, going straight to the model registered for every node and keeping
+    the unknown ones as dicts.
+
+    Parameters
+    ----------
+    original: Union[dict, list, None]
+        Normalized "Complemento" node (a dict of complementos by node name) or a list of complementos
+
+    Returns
+    -------
+    list
+        Parsed complementos
+    """
+    return build_complementos(original, parse_model)
+
+
+def build_complementos(original: Union[dict, list, None], build: Callable[[Type[BaseModel], dict], BaseModel]) -> list:
+    """
+    Same as ``parse_complementos``, but building the model of every complemento with ``build``.
+
+    Parameters
+    ----------
+    original: Union[dict, list, None]
+        Normalized "Complemento" node (a dict of complementos by node name) or a list of complementos
+    build: Callable[[Type[BaseModel], dict], BaseModel]
+        Function that builds an instance of a model from a dict, like ``parse_model``
+
+    Returns
+    -------
+    list
+        Parsed complementos
+    """
+    if original is None:
+        return []
+    if isinstance(original, dict):
+        result: list = []
+        for name, value in original.items():
+            model = _complementos.get(name)
+            for complemento in value if isinstance(value, list) else [value]:
+                result.append(build(model, complemento) if model is not None else complemento)
+        return result
+    if isinstance(original, list):
+        return [
+            _parse_unnamed_complemento(complemento) if isinstance(complemento, dict) else complemento
+            for complemento in original
+        ]
+    raise ValueError("Unsupported type. Must be 'list' or 'dict'")
+
+
+register_complemento("tfd:TimbreFiscalDigital", TimbreFiscalDigital)
+register_complemento("aerolineas:Aerolineas", Aerolineas)
+register_complemento("destruccion:certificadodedestruccion", CertificadoDeDestruccion)
+register_complemento("cce11:ComercioExterior", ComercioExterior)
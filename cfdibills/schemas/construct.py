@@ -0,0 +1,189 @@
+"""
+Construction of models from trusted data (i.e. CFDIs already validated before), skipping their validation.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from uuid import UUID
+
+from typing_extensions import Annotated, get_args, get_origin, get_type_hints
+
+from cfdibills.schemas.compat import (
+    BaseModel,
+    Model,
+    construct_model,
+    field_defaults,
+    field_names,
+    pre_validators,
+)
+from cfdibills.schemas.complementos import build_complementos, parse_complementos
+
+Converter = Callable[[Any], Any]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_datetime(value: Any) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _coercion(cls: type) -> Converter:
+    return lambda value: value if isinstance(value, cls) else cls(value)
+
+
+def _enum_coercion(cls: Type[Enum]) -> Converter:
+    # looking up the members is faster than calling the enum
+    members = {member.value: member for member in cls}
+    return lambda value: members[value] if value in members else cls(value)
+
+
+def _strip(converter: Converter) -> Converter:
+    return lambda value: converter(value.strip() if isinstance(value, str) else value)
+
+
+#: Types that are coerced from the strings of the XML. Enum goes first, as the catalogs are also subclasses of str.
+_COERCIONS: List[Tuple[type, Callable[[type], Converter]]] = [
+    (Enum, _enum_coercion),
+    (datetime, lambda cls: _to_datetime),
+    (UUID, _coercion),
+    (Decimal, lambda cls: _coercion(Decimal)),
+    (float, lambda cls: _coercion(float)),
+    (int, lambda cls: _coercion(int)),
+]
+
+
+def _converter(annotation: Any) -> Converter:
+    """
+    Builds the function that converts a value of the normalized XML to the type ``annotation`` of a field.
+    """
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        base, *metadata = get_args(annotation)
+        converter = _converter(base)
+        return _strip(converter) if any(getattr(meta, "strip_whitespace", False) for meta in metadata) else converter
+    if origin is Union:
+        members = [member for member in get_args(annotation) if member is not type(None)]
+        # the values of the other unions (i.e. complementos) are already built by the validators of the field
+        return _converter(members[0]) if len(members) == 1 else _identity
+    if origin is list:
+        item_converter = _converter(get_args(annotation)[0])
+        return lambda value: [item_converter(item) for item in value]
+    if not isinstance(annotation, type):
+        return _identity
+    if issubclass(annotation, BaseModel):
+        return lambda value: build_model(annotation, value) if isinstance(value, dict) else value
+    if getattr(annotation, "strip_whitespace", False):
+        # constrained strings of pydantic v1
+        return _strip(_identity)
+    for cls, coercion in _COERCIONS:
+        if issubclass(annotation, cls):
+            return coercion(annotation)
+    return _identity
+
+
+def _build_complementos(original: Union[dict, list, None]) -> list:
+    return build_complementos(original, build_model)
+
+
+#: Validators of the schemas replaced by an equivalent that doesn't validate
+_TRUSTED_VALIDATORS: Dict[Callable, Callable] = {parse_complementos: _build_complementos}
+
+
+#: Marks the fields without a default value
+_REQUIRED = object()
+
+
+class _Plan(NamedTuple):
+    """
+    How to build the fields of a model.
+    """
+
+    #: Validators and converter (None if the value is kept as is) of every field by name
+    fields: Dict[str, Tuple[Tuple[Converter, ...], Optional[Converter]]]
+    #: Values of an instance with all of its fields missing, in the order of the fields. Required fields are _REQUIRED
+    #: and the fields with a mutable default (like empty lists) are replaced by a copy of it.
+    template: Dict[str, Any]
+    #: Names of the fields with a mutable default with a function that creates a copy of it
+    factories: List[Tuple[str, Callable[[], Any]]]
+    #: Names of the required fields
+    required: FrozenSet[str]
+
+
+@lru_cache(maxsize=None)
+def _get_plan(model: Type[BaseModel]) -> _Plan:
+    hints = get_type_hints(model, include_extras=True)
+    validators = pre_validators(model)
+    defaults = field_defaults(model)
+    plan = _Plan({}, {}, [], frozenset(name for name in field_names(model) if name not in defaults))
+    for name in field_names(model):
+        converter = _converter(hints[name])
+        plan.fields[name] = (
+            tuple(_TRUSTED_VALIDATORS.get(validator, validator) for validator in validators.get(name, [])),
+            None if converter is _identity else converter,
+        )
+        default = defaults.get(name, _REQUIRED)
+        plan.template[name] = default
+        if isinstance(default, (list, dict, set)):
+            plan.factories.append((name, default.copy))
+    return plan
+
+
+def build_model(model: Type[Model], data: dict) -> Model:
+    """
+    Builds an instance of ``model`` from a normalized dict without validating it.
+
+    The pre-validators of the fields (like the ones that turn nodes into lists) still run and the values are coerced
+    to the types the fields rely on (models, lists, Decimal, float, int, UUID, datetime and the catalogs), but their
+    constraints are not checked. Use only with data known to be valid.
+
+    Parameters
+    ----------
+    model: Type[BaseModel]
+        Model to build
+    data: dict
+        Normalized dict with the fields of the model. Keys that are not fields are ignored.
+
+    Returns
+    -------
+    BaseModel
+        Instance of ``model``
+
+    Raises
+    ------
+    ValueError
+        If a value can't be coerced to the type of its field or a required field is missing
+    """
+    plan = _get_plan(model)
+    if not plan.required <= data.keys():
+        raise ValueError(f"Missing required fields of {model.__name__}: {sorted(plan.required - data.keys())}")
+    # values are assigned over a copy of the template so they keep the order of the fields
+    values = plan.template.copy()
+    fields_set = set()
+    for name, value in data.items():
+        if (field := plan.fields.get(name)) is None:
+            continue
+        validators, converter = field
+        for validator in validators:
+            value = validator(value)
+        values[name] = value if converter is None or value is None else converter(value)
+        fields_set.add(name)
+    for name, factory in plan.factories:
+        if name not in fields_set:
+            values[name] = factory()
+    return construct_model(model, values, fields_set)
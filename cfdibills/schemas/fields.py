@@ -3,15 +3,79 @@ Helper fields to be used by CFDIs.
 """
 
 from decimal import Decimal
+from typing import TYPE_CHECKING
 
-from pydantic import condecimal, constr
+from cfdibills.schemas.compat import condecimal, pattern_str
 
-RFC = constr(
-    regex=r"[A-Z&Ñ]{3,4}[0-9]{2}(0[1-9]|1[012])(0[1-9]|[12][0-9]|3[01])[A-Z0-9]{2}[0-9A]", strip_whitespace=True
-)
 
-CURP = constr(regex=r"[A-Z&Ñ]{4}[0-9]{2}(0[1-9]|1[012])(0[1-9]|[12][0-9]|3[01])[A-Z0-9]{2}[0-9A]")
+def text(max_length: int) -> type:
+    """
+    Type of a text of 1 to ``max_length`` characters without pipes ("|"), the most common type of string in SAT's xsd.
+    """
+    return pattern_str(rf"[^|]{{1,{max_length}}}")
+
+
+def digits(min_length: int, max_length: int = None) -> type:
+    """
+    Type of a string of ``min_length`` to ``max_length`` (or exactly ``min_length``) digits.
+    """
+    quantifier = min_length if max_length is None else f"{min_length},{max_length}"
+    return pattern_str(rf"[0-9]{{{quantifier}}}")
+
+
+if TYPE_CHECKING:
+    # the types of the strings are created at runtime, so mypy sees them as what they are: strings
+    RFC = str
+    CURP = str
+    Text20 = str
+    Text25 = str
+    Text40 = str
+    Text100 = str
+    Text254 = str
+    Text300 = str
+    Text1000 = str
+    Digits5 = str
+    Digits10 = str
+    Digits20 = str
+    Digits150 = str
+    Alphanumeric5 = str
+    NumeroPedimento = str
+else:
+    RFC = pattern_str(
+        r"[A-Z&Ñ]{3,4}[0-9]{2}(0[1-9]|1[012])(0[1-9]|[12][0-9]|3[01])[A-Z0-9]{2}[0-9A]",
+        min_length=12,
+        max_length=13,
+        strip_whitespace=True,
+    )
+
+    CURP = pattern_str(
+        r"[A-Z][AEIOUX][A-Z]{2}[0-9]{2}(0[1-9]|1[012])(0[1-9]|[12][0-9]|3[01])[MH]([ABCMTZ]S|[BCJMOT]C|[CNPST]L|[GNQ]T|"
+        r"[GQS]R|C[MH]|[MY]N|[DH]G|NE|VZ|DF|SP)[BCDFGHJ-NP-TV-Z]{3}[0-9A-Z][0-9]",
+        min_length=18,
+        max_length=18,
+    )
+
+    Text20 = text(20)
+    Text25 = text(25)
+    Text40 = text(40)
+    Text100 = text(100)
+    Text254 = text(254)
+    Text300 = text(300)
+    Text1000 = text(1000)
+
+    Digits5 = digits(5)
+    Digits10 = digits(10)
+    Digits20 = digits(20)
+    Digits150 = digits(1, 150)
+
+    #: Código de confirmación
+    Alphanumeric5 = pattern_str(r"[0-9a-zA-Z]{5}")
+
+    #: Número del pedimento
+    NumeroPedimento = pattern_str(r"[0-9]{2}  [0-9]{2}  [0-9]{4}  [0-9]{7}")
 
 NonNegativeSixDecimals = condecimal(ge=Decimal(0), decimal_places=6)
 
-PositiveSixDecimals = condecimal(ge=Decimal(0.000001), decimal_places=6)
+PositiveSixDecimals = condecimal(ge=Decimal("0.000001"), decimal_places=6)
+
+NonNegativeDecimal = condecimal(ge=Decimal(0))
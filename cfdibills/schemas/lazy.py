@@ -0,0 +1,174 @@
+"""
+CFDIs whose heavy nodes are validated on first access.
+"""
+
+import functools
+from typing import Any, Callable, Dict, Type, TypeVar
+
+from cfdibills.errors import InvalidCFDIError
+from cfdibills.schemas.cfdi33 import CFDI33
+from cfdibills.schemas.cfdi40 import CFDI40
+from cfdibills.schemas.compat import (
+    BaseModel,
+    PrivateAttr,
+    ValidationError,
+    dump_model,
+    parse_model,
+    validate_field,
+)
+
+#: Nodes that are not validated until they are accessed
+LAZY_FIELDS = ("conceptos", "complemento", "addenda")
+
+#: Methods of the models (of any pydantic backend) that read every field, so the pending nodes are validated first
+_MATERIALIZING_METHODS = (
+    "_iter",
+    "__iter__",
+    "__repr_args__",
+    "__copy__",
+    "__deepcopy__",
+    "__getstate__",
+    "model_dump",
+    "model_dump_json",
+)
+
+LazyCFDI = TypeVar("LazyCFDI", bound="LazyCFDIMixin")
+
+
+class LazyCFDIMixin:
+    """
+    Behavior of a CFDI that defers the validation of the nodes in ``LAZY_FIELDS`` until they are accessed.
+
+    The raw value of a deferred node is kept aside and validated (and removed) the first time it is read, so reading
+    ``emisor``, ``receptor`` or ``total`` never validates ``conceptos``. Serializing or comparing the CFDI validates
+    every pending node first.
+
+    Subclasses must be decorated with ``lazy_fields`` so reading a deferred node goes through its validation.
+    """
+
+    #: Type stub of the raw values of the nodes not validated yet
+    _pending: Dict[str, Any]
+
+    @classmethod
+    def parse_lazy(cls: Type[LazyCFDI], obj: dict) -> LazyCFDI:
+        """
+        Parses ``obj`` validating all of its nodes but the ones in ``LAZY_FIELDS``.
+
+        Parameters
+        ----------
+        obj: dict
+            Normalized dict of the CFDI
+
+        Returns
+        -------
+        LazyCFDIMixin
+            CFDI with its heavy nodes pending
+
+        Raises
+        ------
+        ValidationError
+            If a node that is not deferred is invalid
+        """
+        obj = dict(obj)
+        pending = {name: obj.pop(name) for name in LAZY_FIELDS if name in obj}
+        if "conceptos" in pending:
+            # conceptos is required, so an empty placeholder is validated instead
+            obj["conceptos"] = []
+        instance = parse_model(cls, obj)  # type: ignore
+        for name in pending:
+            instance.__dict__.pop(name, None)
+        instance._pending = pending
+        return instance
+
+    def _get_lazy_field(self, name: str) -> Any:
+        if name in self.__dict__:
+            self._pending.pop(name, None)
+            return self.__dict__[name]
+        try:
+            value = validate_field(self, name, self._pending[name])  # type: ignore
+        except ValidationError as e:
+            raise InvalidCFDIError(str(e)) from None
+        del self._pending[name]
+        return value
+
+    def _set_lazy_field(self, name: str, value: Any) -> None:
+        self._pending.pop(name, None)
+        self.__dict__[name] = value
+
+    def materialize(self: LazyCFDI) -> LazyCFDI:
+        """
+        Validates every node still pending.
+
+        Returns
+        -------
+        LazyCFDIMixin
+            This same CFDI, fully validated
+
+        Raises
+        ------
+        InvalidCFDIError
+            If a pending node is invalid
+        """
+        for name in list(self._pending):
+            self._get_lazy_field(name)
+        return self
+
+    def __eq__(self, other: Any) -> bool:
+        # Compared by value (like pydantic v1 does) so a lazy CFDI equals the eager one with the same content
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        self.materialize()
+        if isinstance(other, LazyCFDIMixin):
+            other.materialize()
+        return dump_model(self) == dump_model(other)  # type: ignore
+
+
+def _lazy_property(name: str) -> property:
+    return property(
+        lambda self: self._get_lazy_field(name),
+        lambda self, value: self._set_lazy_field(name, value),
+        doc=f"``{name}``, validated on first access",
+    )
+
+
+def _materializing(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.materialize()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def lazy_fields(cls: Type[LazyCFDI]) -> Type[LazyCFDI]:
+    """
+    Decorator that makes every node in ``LAZY_FIELDS`` of a ``LazyCFDIMixin`` be validated on first access.
+
+    Properties are used because, unlike ``__getattr__``, they take precedence over the instance's attributes and the
+    defaults defined in the mixins of the CFDI. The methods of the model that read every field are wrapped to validate
+    the pending nodes first.
+    """
+    for name in LAZY_FIELDS:
+        setattr(cls, name, _lazy_property(name))
+    for name in _MATERIALIZING_METHODS:
+        if hasattr(cls, name):
+            setattr(cls, name, _materializing(getattr(cls, name)))
+    return cls
+
+
+@lazy_fields
+class LazyCFDI33(LazyCFDIMixin, CFDI33):
+    """
+    ``CFDI33`` whose ``conceptos``, ``complemento`` and ``addenda`` are validated on first access.
+    """
+
+    _pending: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+
+@lazy_fields
+class LazyCFDI40(LazyCFDIMixin, CFDI40):
+    """
+    ``CFDI40`` whose ``conceptos``, ``complemento`` and ``addenda`` are validated on first access.
+    """
+
+    _pending: Dict[str, Any] = PrivateAttr(default_factory=dict)
@@ -2,17 +2,17 @@
 Mixins to be used with CFDIs.
 """
 
-from typing import List, Optional, Protocol, Type
+from decimal import Decimal
+from typing import Iterable, List, Optional, Protocol, Type
 
 from cfdibills.errors import ComplementoNotFoundError
 from cfdibills.schemas.catalogs import Impuesto
 from cfdibills.schemas.complementos import AnyComplementoType, ComplementoType
-from cfdibills.schemas.fields import NonNegativeSixDecimals
 
 
 class _SingleTaxProto(Protocol):
     impuesto: Impuesto
-    importe: NonNegativeSixDecimals
+    importe: Optional[Decimal]
 
 
 class _ImpuestosProto(Protocol):
@@ -20,6 +20,11 @@ class _ImpuestosProto(Protocol):
     retenciones: List[_SingleTaxProto]
 
 
+def _sum_taxes(taxes: Iterable[_SingleTaxProto], tax_type: Impuesto) -> Decimal:
+    # summed as Decimal so the amounts keep their exact value. Exempt taxes don't have an importe.
+    return sum((tax.importe for tax in taxes if tax.impuesto == tax_type and tax.importe is not None), Decimal(0))
+
+
 class CFDIMixin:
     """
     Behavior to be extended by a CFDI. This mixin is meant to be used with any version of CFDI.
@@ -30,9 +35,9 @@ class CFDIMixin:
     #: Type stub of CFDIx.impuestos
     impuestos: Optional[_ImpuestosProto]
     #: Type stub of CFDIx.complemento
-    complemento: List[ComplementoType] = []
+    complemento: List[ComplementoType]
 
-    def get_total_transferred_tax(self, tax_type: Impuesto) -> float:
+    def get_total_transferred_tax(self, tax_type: Impuesto) -> Decimal:
         """
         Computes the total tax transferred (from ``impuestos.traslados``) of type ``tax_type``.
 
@@ -43,13 +48,12 @@ class CFDIMixin:
 
         Returns
         -------
-        float
+        Decimal
             Sum of all the transferred taxes of type ``tax_type``.
         """
-        taxes = self.impuestos.traslados if self.impuestos else []
-        return sum([tax.importe for tax in taxes if tax.impuesto == tax_type])
+        return _sum_taxes(self.impuestos.traslados if self.impuestos else [], tax_type)
 
-    def get_total_withheld_tax(self, tax_type: Impuesto) -> float:
+    def get_total_withheld_tax(self, tax_type: Impuesto) -> Decimal:
         """
         Computes the total tax get_total_withheld_tax (from ``impuestos.retenciones``) of type ``tax_type``.
 
@@ -60,11 +64,10 @@ class CFDIMixin:
 
         Returns
         -------
-        float
+        Decimal
             Sum of all the withheld taxes of type ``tax_type``.
         """
-        taxes = self.impuestos.retenciones if self.impuestos else []
-        return sum([tax.importe for tax in taxes if tax.impuesto == tax_type])
+        return _sum_taxes(self.impuestos.retenciones if self.impuestos else [], tax_type)
 
     def get_complemento(self, complemento_type: Type[AnyComplementoType]) -> AnyComplementoType:
         """
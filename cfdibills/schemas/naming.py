@@ -0,0 +1,27 @@
+"""
+Helpers to map the names used by SAT's xsd to the names used by the schemas.
+"""
+
+import re
+
+_name_pattern = re.compile(r"(.)([A-Z][a-z]+)")
+_snake_pattern = re.compile(r"([a-z0-9])([A-Z])")
+
+
+def camel_to_snake(camelcase: str) -> str:
+    """
+    Converts a camelCase string to a snake_case string
+    Source: https://stackoverflow.com/questions/1175208/elegant-python-function-to-convert-camelcase-to-snake-case
+
+    Parameters
+    ----------
+    camelcase: str
+        string to convert
+
+    Returns
+    -------
+    str
+        snake_cased string
+    """
+    camelcase = _name_pattern.sub(r"\1_\2", camelcase)
+    return _snake_pattern.sub(r"\1_\2", camelcase).lower()
@@ -0,0 +1,51 @@
+"""
+Matching of strings against the patterns of SAT's xsd.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict
+
+#: Patterns made of a single character class repeated a number of times, like "[^|]{1,100}" or "[0-9]{5}"
+_REPEATED_CLASS = re.compile(r"(\[[^\]]+\])\{(\d+)(?:,(\d+))?\}")
+
+#: Checks equivalent to some character classes, applied to the whole string
+_CLASS_CHECKS: Dict[str, Callable[[str], bool]] = {
+    "[^|]": lambda value: "|" not in value,
+    "[0-9]": lambda value: value.isascii() and value.isdigit(),
+    "[0-9a-zA-Z]": lambda value: value.isascii() and value.isalnum(),
+}
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern: str) -> Callable[[str], bool]:
+    """
+    Builds the function that tells whether a whole string matches ``pattern`` (as the patterns of an xsd do).
+
+    Every distinct pattern is compiled once. The patterns that are just a common character class repeated, like
+    ``"[^|]{1,100}"``, are checked with the length of the string and string methods instead of a regex.
+
+    Parameters
+    ----------
+    pattern: str
+        Regular expression
+
+    Returns
+    -------
+    Callable[[str], bool]
+        Function that returns True if its argument matches ``pattern``
+    """
+    repeated = _REPEATED_CLASS.fullmatch(pattern)
+    if repeated is not None and (check := _CLASS_CHECKS.get(repeated.group(1))) is not None:
+        min_length = int(repeated.group(2))
+        max_length = int(repeated.group(3) or min_length)
+        return lambda value: min_length <= len(value) <= max_length and check(value)
+    regex = re.compile(pattern)
+    return lambda value: regex.fullmatch(value) is not None
+
+
+def anchor(pattern: str) -> str:
+    """
+    Anchors ``pattern`` so it has to match the whole string (in both Python's and Rust's regex engines).
+    """
+    return f"^(?:{pattern})$"
@@ -2,9 +2,10 @@
 Validators used to parse CFDIs.
 """
 
-from typing import Union
+from typing import Callable, Optional, Union
 
-from pydantic import validator
+from cfdibills import catalogs
+from cfdibills.schemas.compat import validator
 
 
 def dict2list(original: Union[dict, list]) -> list:
@@ -31,5 +32,20 @@ def dict2list_flatten(original: Union[dict, list]) -> list:
     return result
 
 
-def reusable_validator(*args, **kwargs):
-    return validator(*args, **kwargs, allow_reuse=True)
+def in_catalog(name: str) -> Callable[[Optional[str]], Optional[str]]:
+    """
+    Builds a validator that checks a code is in the catalog ``name`` of ``cfdibills.catalogs`` (like
+    ``ClaveProdServ``). Codes are only checked if the file of the catalog is available.
+    """
+
+    def validate(code: Optional[str]) -> Optional[str]:
+        catalog = getattr(catalogs, name)
+        if code is not None and catalog.available and code not in catalog:
+            raise ValueError(f"'{code}' is not in the catalog {catalog.name}")
+        return code
+
+    return validate
+
+
+def reusable_validator(*fields: str, pre: bool = False):
+    return validator(*fields, pre=pre)
@@ -0,0 +1,210 @@
+"""
+Local stand-in of SAT's ConsultaCFDIService, to test and load-test the verification of CFDIs without calling SAT.
+
+``SATStandIn`` is an asyncio HTTP server that answers the SOAP requests sent by ``cfdibills.api`` with the status
+configured for every UUID, after the configured latency and failing at the configured rate::
+
+    with SATStandIn(statuses={uuid: "Cancelado"}, latency=0.05, error_rate=0.01) as sat:
+        cfdibills.verify(cfdi, url=sat.url)
+
+It runs its event loop in a thread of its own, so it can be called by synchronous, threaded and asynchronous clients
+alike. Setting ``CFDIBILLS_SAT_URL`` to its ``url`` sends every call of ``cfdibills`` to it.
+"""
+
+import asyncio
+import random
+import re
+import threading
+from http import HTTPStatus
+from typing import Dict, Mapping, Optional, Set, Tuple, Union
+
+#: Status of a CFDI that can be answered, mapped to its (CodigoEstatus, EsCancelable, EstatusCancelacion)
+ESTADOS: Dict[str, Tuple[str, str, str]] = {
+    "Vigente": ("S - Comprobante obtenido satisfactoriamente.", "Cancelable con aceptación", ""),
+    "Cancelado": (
+        "S - Comprobante obtenido satisfactoriamente.",
+        "Cancelable sin aceptación",
+        "Cancelado sin aceptación",
+    ),
+    "No Encontrado": ("N - 602: Comprobante no encontrado.", "", ""),
+}
+_UUID = re.compile(rb"id=([0-9a-fA-F-]+)")
+_MAX_HEADERS_SIZE = 64 * 1024
+
+
+def consulta_response(estado: str = "Vigente") -> bytes:
+    """
+    Builds the body of a response of the ConsultaCFDIService with ``estado``, one of ``ESTADOS``.
+    """
+    codigo_estatus, es_cancelable, estatus_cancelacion = ESTADOS[estado]
+    return (
+        '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+        '<ConsultaResponse xmlns="http://tempuri.org/"><ConsultaResult '
+        'xmlns:a="http://schemas.datacontract.org/2004/07/Sat.Cfdi.Negocio.ConsultaCfdi.Servicio" '
+        'xmlns:i="http://www.w3.org/2001/XMLSchema-instance">'
+        f"<a:CodigoEstatus>{codigo_estatus}</a:CodigoEstatus><a:EsCancelable>{es_cancelable}</a:EsCancelable>"
+        f"<a:Estado>{estado}</a:Estado><a:EstatusCancelacion>{estatus_cancelacion}</a:EstatusCancelacion>"
+        "<a:ValidacionEFOS>200</a:ValidacionEFOS></ConsultaResult></ConsultaResponse></s:Body></s:Envelope>"
+    ).encode()
+
+
+def _http_response(status: int, reason: str, body: bytes, content_type: str = "text/xml; charset=utf-8") -> bytes:
+    headers = f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+    return headers.encode() + body
+
+
+class SATStandIn:
+    """
+    Local HTTP server that answers like SAT's ConsultaCFDIService.
+
+    Parameters
+    ----------
+    statuses: Mapping[str, str]
+        Status (one of ``ESTADOS``) of the CFDIs, by their UUID (case insensitive)
+    default: str
+        Status of the CFDIs not in ``statuses``
+    latency: Union[float, Tuple[float, float]]
+        Seconds to wait before answering every request, or the range of a uniformly distributed wait
+    error_rate: float
+        Fraction of the requests (chosen at random) answered with an error
+    error_status: int
+        HTTP status of the errors, like 500, or 429 and 503 to throttle the clients
+    seed: Optional[int]
+        Seed of the random latencies and errors, to reproduce a run
+    host: str
+        Host to listen on
+    port: int
+        Port to listen on. By default, a free port is chosen.
+    """
+
+    def __init__(
+        self,
+        statuses: Optional[Mapping[str, str]] = None,
+        default: str = "Vigente",
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        for estado in [default, *(statuses or {}).values()]:
+            if estado not in ESTADOS:
+                raise ValueError(f"Unknown status '{estado}'. It must be one of {list(ESTADOS)}.")
+        if not 0 <= error_rate <= 1:
+            raise ValueError("'error_rate' must be between 0 and 1")
+        self.statuses = {uuid.lower(): estado for uuid, estado in (statuses or {}).items()}
+        self.default = default
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.host = host
+        self.port = port
+        #: Number of requests received
+        self.requests = 0
+        #: Number of requests answered with an error
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def url(self) -> str:
+        """
+        URL of the stand-in, to be given as the ``url`` of the verifications or set in ``CFDIBILLS_SAT_URL``.
+        """
+        return f"http://{self.host}:{self.port}/ConsultaCFDIService.svc"
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            return self._random.uniform(*self.latency)
+        return self.latency
+
+    def _answer(self, body: bytes) -> bytes:
+        self.requests += 1
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            reason = HTTPStatus(self.error_status).phrase
+            return _http_response(self.error_status, reason, f"<html>{reason}</html>".encode(), "text/html")
+        match = _UUID.search(body)
+        if match is None:
+            self.errors += 1
+            return _http_response(400, "Bad Request", b"<html>Bad Request</html>", "text/html")
+        estado = self.statuses.get(match.group(1).decode().lower(), self.default)
+        return _http_response(200, "OK", consulta_response(estado))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            # connections are kept alive, so every one may carry many requests
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                length = 0
+                for line in head.split(b"\r\n")[1:]:
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                body = await reader.readexactly(length)
+                if (delay := self._delay()) > 0:
+                    await asyncio.sleep(delay)
+                writer.write(self._answer(body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def start(self) -> "SATStandIn":
+        """
+        Starts listening in a thread of its own.
+
+        Returns
+        -------
+        SATStandIn
+            The stand-in, whose ``url`` can be called once this returns
+        """
+        if self._thread is not None:
+            raise RuntimeError("The stand-in is already running")
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port, limit=_MAX_HEADERS_SIZE)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._thread = threading.Thread(target=self._loop.run_forever, name="sat-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops listening and closes the open connections.
+        """
+        if self._thread is None:
+            return
+        loop, server = self._loop, self._server
+
+        async def close() -> None:
+            server.close()  # type: ignore
+            # the connections kept alive are waiting for another request, which ends them when closed
+            for writer in list(self._writers):
+                writer.close()
+            current = asyncio.current_task()
+            await asyncio.gather(*(task for task in asyncio.all_tasks() if task is not current))
+            await server.wait_closed()  # type: ignore
+
+        asyncio.run_coroutine_threadsafe(close(), loop).result()  # type: ignore
+        loop.call_soon_threadsafe(loop.stop)  # type: ignore
+        self._thread.join()
+        loop.close()  # type: ignore
+        self._loop = self._server = self._thread = None
+
+    def __enter__(self) -> "SATStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,146 @@
+"""
+Instrumentation of the stages of reading and verifying CFDIs.
+
+While a ``Tracer`` is active (see ``tracing``), ``read_xml`` and the calls to SAT's web service record a ``Span`` for
+every one of their stages, with its duration and details like the bytes and nodes of the XML:
+
+* ``read_xml.parse``: parsing the XML into a dict with normalized keys, which are normalized in the same pass
+* ``read_xml.validate``: building the CFDI from the dict (see ``read_xml``'s ``validate``)
+* ``sat.build``, ``sat.network`` and ``sat.parse``: the phases of a call to SAT's web service (see ``SATTimings``)
+
+The tracer is stored in a ``ContextVar``, so it is only active in the thread or asyncio task that activated it (and
+the tasks created from it). While no tracer is active, the only cost is looking up the ``ContextVar``, so the
+instrumentation can stay in production code.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    """
+    Stage of reading or verifying a CFDI.
+    """
+
+    #: Name of the stage, like "read_xml.parse"
+    name: str
+    #: When the stage started, in nanoseconds since the epoch
+    start_ns: int
+    #: Seconds the stage took
+    duration: float
+    #: Details of the stage, like "bytes" or "nodes"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """
+    Collects the spans of the stages run while it is active and hands them to its hooks.
+
+    Parameters
+    ----------
+    hooks: Iterable[Callable[[Span], None]]
+        Functions called with every span as soon as its stage ends (like ``OpenTelemetryHook``)
+    keep: bool
+        Whether to keep the spans in ``spans``. Disable it for long-lived tracers that only feed their hooks.
+    """
+
+    def __init__(self, hooks: Iterable[Callable[[Span], None]] = (), keep: bool = True) -> None:
+        self.hooks = list(hooks)
+        self.keep = keep
+        #: Spans recorded, in the order their stages ended
+        self.spans: List[Span] = []
+
+    def record(self, name: str, start: float, end: float, **attributes: Any) -> Span:
+        """
+        Records a stage that ran between ``start`` and ``end`` (as given by ``time.perf_counter``).
+
+        Returns
+        -------
+        Span
+            Span of the stage
+        """
+        # perf_counter has no epoch, so the start is placed relative to now
+        start_ns = time.time_ns() - int((time.perf_counter() - start) * 1e9)
+        span = Span(name, start_ns, end - start, attributes)
+        if self.keep:
+            self.spans.append(span)
+        for hook in self.hooks:
+            hook(span)
+        return span
+
+    def durations(self) -> Dict[str, float]:
+        """
+        Total seconds spent in every stage kept in ``spans``.
+        """
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+
+_current: ContextVar[Optional[Tracer]] = ContextVar("cfdibills_tracer", default=None)
+
+
+def get_tracer() -> Optional[Tracer]:
+    """
+    Tracer active in the current context, or None if tracing is disabled.
+    """
+    return _current.get()
+
+
+@contextmanager
+def tracing(tracer: Optional[Tracer] = None) -> Iterator[Tracer]:
+    """
+    Activates ``tracer`` (or a new ``Tracer``) within a ``with`` block::
+
+        with tracing() as tracer:
+            read_xml("bill.xml")
+        print(tracer.durations())
+
+    Parameters
+    ----------
+    tracer: Optional[Tracer]
+        Tracer to activate. A new one is created when not given.
+
+    Yields
+    ------
+    Tracer
+        Active tracer
+    """
+    tracer = tracer if tracer is not None else Tracer()
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+
+
+class OpenTelemetryHook:
+    """
+    Hook of a ``Tracer`` that emits every span to OpenTelemetry, as a child of the span active when its stage ended.
+
+    Requires ``opentelemetry-api`` (``pip install cfdibills[otel]``) and an SDK configured by the application.
+
+    Parameters
+    ----------
+    tracer: Optional[opentelemetry.trace.Tracer]
+        OpenTelemetry tracer used to emit the spans. Defaults to the tracer "cfdibills" of the global provider.
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError(
+                "opentelemetry-api is required to emit OpenTelemetry spans. Run: pip install cfdibills[otel]"
+            ) from None
+        self.tracer = tracer if tracer is not None else trace.get_tracer("cfdibills")
+
+    def __call__(self, span: Span) -> None:
+        attributes = {f"cfdibills.{key}": value for key, value in span.attributes.items() if value is not None}
+        otel_span = self.tracer.start_span(span.name, start_time=span.start_ns, attributes=attributes)
+        otel_span.end(end_time=span.start_ns + int(span.duration * 1e9))
@@ -1,20 +1,51 @@
 """
 Module to verify a CFDI with the SAT.
 """
-from typing import Union
+from __future__ import annotations
 
-from cfdibills.api import SATConsultaResponse, consulta_cfdi_service
-from cfdibills.schemas.cfdi33 import CFDI33
-from cfdibills.schemas.cfdi40 import CFDI40
-from cfdibills.schemas.complementos import TimbreFiscalDigital
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
+
+from cfdibills.api import (
+    DEFAULT_TIMEOUT,
+    SATConsultaResponse,
+    consulta_cfdi_service,
+    consulta_cfdi_service_async,
+    create_async_client,
+)
+
+# caches are exposed here too, as they are meant to be used with the functions of this module
+from cfdibills.cache import (  # noqa: F401
+    MemoryCache,
+    SQLiteCache,
+    TTLPolicy,
+    VerificationCache,
+    make_key,
+)
+from cfdibills.resilience import (  # noqa: F401
+    CircuitBreaker,
+    Resilience,
+    ResilienceMetrics,
+    RetryPolicy,
+)
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+    from cfdibills.io import VerificationKey
+    from cfdibills.schemas.cfdi33 import CFDI33
+    from cfdibills.schemas.cfdi40 import CFDI40
 
 
 def verify(
-    cfdi: Union[CFDI33, CFDI40] = None,
+    cfdi: Union[CFDI33, CFDI40, VerificationKey] = None,
     uuid: str = None,
     rfc_emisor: str = None,
     rfc_receptor: str = None,
     total_facturado: float = None,
+    cache: Optional[VerificationCache] = None,
+    url: Optional[str] = None,
+    resilience: Optional[Resilience] = None,
 ) -> SATConsultaResponse:
     """
     Verifies a bill's status with the SAT. The bill can be given as a ``CFDI33`` or as its details (uuid, rfc_emisor,
@@ -25,8 +56,8 @@ def verify(
 
     Parameters
     ----------
-    cfdi: CFDI33
-        CFDI v3.3 object to check. Details are overriden by this argument when passed.
+    cfdi: Union[CFDI33, CFDI40, VerificationKey]
+        CFDI object (or its ``VerificationKey``) to check. Details are overriden by this argument when passed.
     uuid: str
         UUID of the CFDI to check (if details are given).
     rfc_emisor: str
@@ -35,6 +66,15 @@ def verify(
         RFC of the recipient of the CFDI to check (if details are given).
     total_facturado: str
         Total amount of money billed in the CFDI to check (if details are given).
+    cache: Optional[VerificationCache]
+        Cache of previous responses of SAT (like ``MemoryCache`` or ``SQLiteCache``). SAT is only called when the
+        CFDI is not in the cache or its entry has expired.
+    url: Optional[str]
+        URL of the web service to call. Defaults to the one in ``CFDIBILLS_SAT_URL`` or SAT's (see
+        ``cfdibills.api.sat_url``).
+    resilience: Optional[Resilience]
+        Retries, rate limit and circuit breaker of the calls to SAT (see ``cfdibills.resilience``). By default, a
+        call that fails is not retried.
 
     Returns
     -------
@@ -45,17 +85,27 @@ def verify(
     ------
     ValueError
         When no CFDI is provided or there are missing details.
+    SATServiceError
+        When SAT answers with an error or with a response in an unknown format (it is a ``ValueError`` too).
     """
     return (
-        _verify_cfdi(cfdi)
+        _verify_cfdi(cfdi, cache, url, resilience)
         if cfdi
         # this is validated in _verify_cfdi_by_values
-        else _verify_cfdi_by_values(uuid, rfc_emisor, rfc_receptor, total_facturado)  # type: ignore
+        else _verify_cfdi_by_values(
+            uuid, rfc_emisor, rfc_receptor, total_facturado, cache, url, resilience  # type: ignore
+        )
     )
 
 
-def _verify_cfdi(cfdi: Union[CFDI33, CFDI40]) -> SATConsultaResponse:
-    return _verify_cfdi_by_values(
+def _cfdi_values(cfdi: Union[CFDI33, CFDI40, VerificationKey]) -> Tuple[str, str, str, float]:
+    # imported here so verifying by values doesn't import the schemas
+    from cfdibills.io import VerificationKey
+    from cfdibills.schemas.complementos import TimbreFiscalDigital
+
+    if isinstance(cfdi, VerificationKey):
+        return cfdi.uuid, cfdi.rfc_emisor, cfdi.rfc_receptor, cfdi.total  # type: ignore
+    return (
         str(cfdi.get_complemento(TimbreFiscalDigital).uuid),
         cfdi.emisor.rfc,
         cfdi.receptor.rfc,
@@ -63,9 +113,210 @@ def _verify_cfdi(cfdi: Union[CFDI33, CFDI40]) -> SATConsultaResponse:
     )
 
 
+def _verify_cfdi(
+    cfdi: Union[CFDI33, CFDI40, VerificationKey],
+    cache: Optional[VerificationCache] = None,
+    url: Optional[str] = None,
+    resilience: Optional[Resilience] = None,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> SATConsultaResponse:
+    return _verify_cfdi_by_values(
+        *_cfdi_values(cfdi), cache=cache, url=url, resilience=resilience, session=session, timeout=timeout
+    )
+
+
 def _verify_cfdi_by_values(
-    uuid: str, rfc_emisor: str, rfc_receptor: str, total_facturado: float
+    uuid: str,
+    rfc_emisor: str,
+    rfc_receptor: str,
+    total_facturado: float,
+    cache: Optional[VerificationCache] = None,
+    url: Optional[str] = None,
+    resilience: Optional[Resilience] = None,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
 ) -> SATConsultaResponse:
     if uuid is None or rfc_emisor is None or rfc_receptor is None or total_facturado is None:
         raise ValueError("All args [uuid, rfc_emisor, rfc_receptor, total_facturado] must be not None")
-    return consulta_cfdi_service(uuid, rfc_emisor, rfc_receptor, total_facturado)
+    values = (uuid, rfc_emisor, rfc_receptor, total_facturado)
+    if cache is None:
+        return _consulta(values, url, resilience, session, timeout)
+    key = make_key(*values)
+    if (response := cache.get(key)) is None:
+        response = _consulta(values, url, resilience, session, timeout)
+        cache.set(key, response)
+    return response
+
+
+def _consulta(
+    values: Tuple[str, str, str, float],
+    url: Optional[str],
+    resilience: Optional[Resilience],
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> SATConsultaResponse:
+    if resilience is None:
+        return consulta_cfdi_service(*values, url=url, session=session, timeout=timeout)
+    return resilience.call(consulta_cfdi_service, *values, url=url, session=session, timeout=timeout)
+
+
+def verify_many(
+    items: Iterable[Union[CFDI33, CFDI40, VerificationKey, Tuple[str, str, str, float]]],
+    max_workers: int = 10,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: Optional[VerificationCache] = None,
+    url: Optional[str] = None,
+    resilience: Optional[Resilience] = None,
+) -> List[Union[SATConsultaResponse, Exception]]:
+    """
+    Verifies many bills' status with the SAT in a pool of threads, for the callers that can't use
+    ``verify_many_async``. Every thread reuses its connections to SAT's web service.
+
+    A bill that can't be verified doesn't stop the others: the exception raised when verifying it is returned in its
+    place.
+
+    Parameters
+    ----------
+    items: Iterable[Union[CFDI33, CFDI40, VerificationKey, Tuple[str, str, str, float]]]
+        CFDIs (or their ``VerificationKey``) to check, or their details as tuples of (uuid, rfc_emisor, rfc_receptor,
+        total_facturado).
+    max_workers: int
+        Number of threads, which is the max number of requests sent to SAT at the same time.
+    timeout: float
+        Seconds to wait for SAT's web service in every request, so a stalled connection doesn't block its thread.
+        The bills whose request times out get a ``requests.Timeout`` in their place.
+    cache: Optional[VerificationCache]
+        Cache of previous responses of SAT. Only the CFDIs not in the cache (or expired) are sent to SAT.
+    url: Optional[str]
+        URL of the web service to call. Defaults to the one in ``CFDIBILLS_SAT_URL`` or SAT's (see
+        ``cfdibills.api.sat_url``).
+    resilience: Optional[Resilience]
+        Retries, rate limit and circuit breaker of the calls to SAT (see ``cfdibills.resilience``). By default, a
+        call that fails is not retried.
+
+    Returns
+    -------
+    List[Union[SATConsultaResponse, Exception]]
+        Status of every CFDI as verified by SAT, or the exception raised when verifying it, in the same order as
+        ``items``.
+
+    Raises
+    ------
+    ValueError
+        When ``max_workers`` is not positive.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    if max_workers < 1:
+        raise ValueError("'max_workers' must be greater than 0")
+    # a session per thread, as sessions are not thread-safe
+    local = threading.local()
+    sessions: List[requests.Session] = []
+
+    def verify_one(
+        item: Union[CFDI33, CFDI40, VerificationKey, Tuple[str, str, str, float]]
+    ) -> Union[SATConsultaResponse, Exception]:
+        if (session := getattr(local, "session", None)) is None:
+            session = local.session = requests.Session()
+            sessions.append(session)
+        try:
+            # VerificationKey is a tuple too, but of 5 items
+            if isinstance(item, tuple) and len(item) == 4:
+                return _verify_cfdi_by_values(
+                    *item, cache=cache, url=url, resilience=resilience, session=session, timeout=timeout
+                )
+            return _verify_cfdi(item, cache, url, resilience, session, timeout)  # type: ignore
+        except Exception as error:
+            return error
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cfdibills-verify") as pool:
+            return list(pool.map(verify_one, items))
+    finally:
+        for session in sessions:
+            session.close()
+
+
+async def verify_many_async(
+    cfdis: Iterable[Union[CFDI33, CFDI40, VerificationKey]],
+    concurrency: int = 10,
+    client: Optional["httpx.AsyncClient"] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    return_exceptions: bool = False,
+    cache: Optional[VerificationCache] = None,
+    url: Optional[str] = None,
+    resilience: Optional[Resilience] = None,
+) -> List[Union[SATConsultaResponse, BaseException]]:
+    """
+    Verifies many bills' status with the SAT concurrently, reusing the connections to SAT's web service.
+
+    Requires ``httpx`` (``pip install cfdibills[async]``).
+
+    Parameters
+    ----------
+    cfdis: Iterable[Union[CFDI33, CFDI40, VerificationKey]]
+        CFDIs (or their ``VerificationKey``) to check.
+    concurrency: int
+        Max number of requests sent to SAT at the same time.
+    client: Optional[httpx.AsyncClient]
+        Client created with ``cfdibills.api.create_async_client``. When not given, a client with ``concurrency``
+        connections and ``timeout`` is created for this call only.
+    timeout: float
+        Seconds to wait for SAT's web service when no ``client`` is given.
+    return_exceptions: bool
+        When True, the exception raised when verifying a CFDI is returned in its place instead of being raised.
+    cache: Optional[VerificationCache]
+        Cache of previous responses of SAT. Only the CFDIs not in the cache (or expired) are sent to SAT.
+    url: Optional[str]
+        URL of the web service to call. Defaults to the one in ``CFDIBILLS_SAT_URL`` or SAT's (see
+        ``cfdibills.api.sat_url``).
+    resilience: Optional[Resilience]
+        Retries, rate limit and circuit breaker of the calls to SAT (see ``cfdibills.resilience``). By default, a
+        call that fails is not retried.
+
+    Returns
+    -------
+    List[Union[SATConsultaResponse, BaseException]]
+        Status of every CFDI as verified by SAT, in the same order as ``cfdis``.
+
+    Raises
+    ------
+    ValueError
+        When ``concurrency`` is not positive.
+    """
+    import asyncio
+
+    if concurrency < 1:
+        raise ValueError("'concurrency' must be greater than 0")
+    if client is None:
+        async with create_async_client(timeout=timeout, max_connections=concurrency) as new_client:
+            return await verify_many_async(
+                cfdis, concurrency, new_client, timeout, return_exceptions, cache, url, resilience
+            )
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def verify_one(cfdi: Union[CFDI33, CFDI40, VerificationKey]) -> SATConsultaResponse:
+        values = _cfdi_values(cfdi)
+        if cache is not None and (cached := cache.get(make_key(*values))) is not None:
+            return cached
+        async with semaphore:
+            if resilience is None:
+                response = await consulta_cfdi_service_async(*values, client=client, url=url)
+            else:
+                response = await resilience.call_async(consulta_cfdi_service_async, *values, client=client, url=url)
+        if cache is not None:
+            cache.set(make_key(*values), response)
+        return response
+
+    tasks = [asyncio.ensure_future(verify_one(cfdi)) for cfdi in cfdis]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
@@ -45,6 +45,9 @@ SETUP_ARGS = {
     "extras_require": {
         "dev": requirements_from_pip("requirements_dev.txt"),
         "test": requirements_from_pip("requirements_test.txt"),
+        "async": ["httpx>=0.23"],
+        "arrow": ["pyarrow>=8"],
+        "otel": ["opentelemetry-api>=1.0"],
     },
     "classifiers": [
         "Programming Language :: Python :: 3.8",
@@ -0,0 +1,73 @@
+import types
+
+import pytest
+from pytest import mark
+
+from cfdibills import api
+from cfdibills.api import (
+    SATConsultaResponse,
+    SATTimings,
+    _build_envelope,
+    _parse_consulta_response,
+)
+from cfdibills.errors import SATServiceError
+from tests.utils import sat_response
+
+
+def test_build_envelope():
+    envelope = _build_envelope("ea8152af-b116-4812-817a-3b4f9617c99c", "AAA010101AAA", "XAXX010101000", 150.5)
+    assert b"<![CDATA[?re=AAA010101AAA&rr=XAXX010101000&tt=150.5&id=ea8152af-b116-4812-817a-3b4f9617c99c]]>" in envelope
+
+
+@mark.parametrize(
+    "content, expected",
+    [
+        (
+            sat_response("Cancelado", "Cancelable sin aceptación"),
+            SATConsultaResponse(
+                "S - Comprobante obtenido satisfactoriamente.", "Cancelable sin aceptación", "Cancelado", None, "200"
+            ),
+        ),
+        (
+            sat_response().replace(b"<a:EstatusCancelacion/>", b'<a:EstatusCancelacion i:nil="true"/>'),
+            SATConsultaResponse(
+                "S - Comprobante obtenido satisfactoriamente.", "Cancelable con aceptación", "Vigente", None, "200"
+            ),
+        ),
+    ],
+)
+def test_parse_consulta_response(content, expected):
+    assert _parse_consulta_response(content) == expected
+
+
+@mark.parametrize("content", [b"<html>Service Unavailable</html>", b"<s:Envelope>", sat_response()[:-40]])
+def test_parse_consulta_response_unknown_format(content):
+    with pytest.raises(ValueError):
+        _parse_consulta_response(content)
+
+
+def test_consulta_cfdi_service_timings(monkeypatch):
+    sent = []
+
+    def post(url, data, headers, timeout):
+        sent.append(data)
+        assert timeout == api.DEFAULT_TIMEOUT
+        return types.SimpleNamespace(status_code=200, content=sat_response(), text="")
+
+    monkeypatch.setattr(api.requests, "post", post)
+    response = api.consulta_cfdi_service("uuid", "AAA010101AAA", "XAXX010101000", 10)
+    assert response.estado == "Vigente"
+    assert sent == [_build_envelope("uuid", "AAA010101AAA", "XAXX010101000", 10)]
+    assert isinstance(response.timings, SATTimings)
+    assert min(response.timings.build, response.timings.network, response.timings.parse) >= 0
+
+
+@mark.parametrize("retry_after, expected", [("7", 7.0), ("Wed, 21 Oct 2015 07:28:00 GMT", None), (None, None)])
+def test_consulta_cfdi_service_error(monkeypatch, retry_after, expected):
+    headers = {} if retry_after is None else {"Retry-After": retry_after}
+    response = types.SimpleNamespace(status_code=503, content=b"", text="Service Unavailable", headers=headers)
+    monkeypatch.setattr(api.requests, "post", lambda *args, **kwargs: response)
+    with pytest.raises(SATServiceError) as error:
+        api.consulta_cfdi_service("uuid", "AAA010101AAA", "XAXX010101000", 10)
+    assert (error.value.status_code, error.value.retry_after) == (503, expected)
+    assert isinstance(error.value, ValueError)
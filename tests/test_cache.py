@@ -0,0 +1,116 @@
+import types
+from decimal import Decimal
+
+import pytest
+from pytest import mark
+
+from cfdibills import cache as cache_module
+from cfdibills import verifiers
+from cfdibills.api import SATConsultaResponse, SATTimings
+from cfdibills.cache import DAY, HOUR, MemoryCache, SQLiteCache, TTLPolicy, make_key
+
+
+def _response(estado: str = "Vigente", es_cancelable: str = "Cancelable con aceptación", estatus=None):
+    return SATConsultaResponse("S - Comprobante obtenido satisfactoriamente.", es_cancelable, estado, estatus, "200")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCache()
+    else:
+        with SQLiteCache(str(tmp_path / "cache.sqlite")) as sqlite_cache:
+            yield sqlite_cache
+
+
+def test_make_key():
+    assert make_key("ABC-1", "aaa010101aaa", "xaxx010101000", 1500.0) == make_key(
+        "abc-1", "AAA010101AAA", "XAXX010101000", Decimal("1500.00")
+    )
+
+
+@mark.parametrize(
+    "response, ttl",
+    [
+        (_response("Cancelado", "Cancelable sin aceptación", "Cancelado sin aceptación"), None),
+        (_response(), HOUR),
+        (_response(es_cancelable="No cancelable"), 7 * DAY),
+        (_response(estatus="En proceso"), TTLPolicy().en_proceso),
+        (_response("No Encontrado", "", None), TTLPolicy().no_encontrado),
+    ],
+)
+def test_ttl_policy(response, ttl):
+    assert TTLPolicy()(response) == ttl
+
+
+def test_cache_expiration(cache, clock):
+    vigente, cancelado = make_key("1", "A", "B", 1), make_key("2", "A", "B", 1)
+    cache.set(vigente, _response())
+    cache.set(cancelado, _response("Cancelado"))
+    assert cache.get(vigente) == _response()
+    clock.value += HOUR
+    assert cache.get(vigente) is None
+    clock.value += 365 * DAY
+    assert cache.get(cancelado) == _response("Cancelado")
+
+
+def test_cache_hits_have_no_timings(cache):
+    key, response = make_key("1", "A", "B", 1), _response()
+    response.timings = SATTimings(1, 2, 3)
+    cache.set(key, response)
+    hit = cache.get(key)
+    assert hit == response and hit is not response
+    assert hit.timings is None and response.timings == SATTimings(1, 2, 3)
+
+
+def test_cache_not_cached_when_ttl_is_zero(cache):
+    cache.ttl = TTLPolicy(no_encontrado=0)
+    key = make_key("1", "A", "B", 1)
+    cache.set(key, _response("No Encontrado"))
+    assert cache.get(key) is None
+
+
+def test_memory_cache_lru():
+    cache = MemoryCache(maxsize=2)
+    keys = [make_key(str(i), "A", "B", 1) for i in range(3)]
+    cache.set(keys[0], _response())
+    cache.set(keys[1], _response())
+    cache.get(keys[0])
+    cache.set(keys[2], _response())
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+
+
+def test_sqlite_cache_persists(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    key = make_key("1", "A", "B", 1)
+    with SQLiteCache(path) as cache:
+        cache.set(key, _response("Cancelado"))
+        cache.set(make_key("2", "A", "B", 1), _response())
+    with SQLiteCache(path) as cache:
+        assert cache.get(key) == _response("Cancelado")
+        clock.value += DAY
+        assert cache.purge_expired() == 1
+
+
+def test_verify_with_cache(monkeypatch):
+    calls = []
+
+    def consulta(*args, **kwargs):
+        calls.append(args)
+        return _response()
+
+    monkeypatch.setattr(verifiers, "consulta_cfdi_service", consulta)
+    cache = MemoryCache()
+    for _ in range(3):
+        status = verifiers.verify(uuid="1", rfc_emisor="A", rfc_receptor="B", total_facturado=10.0, cache=cache)
+        assert status == _response()
+    assert len(calls) == 1
@@ -0,0 +1,233 @@
+import os
+import pickle
+from datetime import date
+
+import pytest
+from pytest import mark
+
+from cfdibills import read_xml
+from cfdibills.catalogs import (
+    CATALOGS_DIR_ENV_VAR,
+    CatalogEntry,
+    CatalogStore,
+    ClaveProdServ,
+    CodigoPostal,
+    FileCatalog,
+    index,
+    main,
+    pack_catalog,
+    read_catalog,
+    validate_codes,
+    write_catalog,
+)
+from cfdibills.errors import CatalogNotAvailableError, InvalidCFDIError
+from cfdibills.schemas.catalogs import Impuesto, Pais, RegimenFiscal, UsoCFDI
+from cfdibills.schemas.compat import BaseModel, ValidationError, parse_model
+
+ENTRIES = [
+    CatalogEntry("01010101", "No existe en el catálogo", date(2022, 1, 1)),
+    CatalogEntry("10101500", "Animales vivos de granja", date(2022, 1, 1)),
+    CatalogEntry("10101501", "Gatos vivos", date(2017, 1, 1), date(2021, 12, 31)),
+    CatalogEntry("43211500", None),
+]
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    path = tmp_path / "c_ClaveProdServ.tsv.gz"
+    write_catalog(path, ENTRIES)
+    return path
+
+
+@mark.parametrize(
+    "member, value, description",
+    [
+        (UsoCFDI.G01, "G01", "Adquisición de mercancías"),
+        (Impuesto.iva, "002", "Impuesto al Valor Agregado (IVA)"),
+        (RegimenFiscal.r601, "601", "General de Ley Personas Morales"),
+        (Pais.MEX, "MEX", None),
+    ],
+)
+def test_members_have_code_and_description(member, value, description):
+    assert member.value == member == value
+    assert member.description == description
+    assert type(member)(value) is member
+    assert pickle.loads(pickle.dumps(member)) is member
+
+
+def test_get_unknown_code():
+    assert UsoCFDI.get("G01") is UsoCFDI.G01
+    assert UsoCFDI.get("XXX") is None
+
+
+def test_schemas_validate_catalogs():
+    class Model(BaseModel):
+        uso: UsoCFDI
+
+    assert parse_model(Model, {"uso": "G03"}).uso is UsoCFDI.G03
+    with pytest.raises(ValidationError):
+        parse_model(Model, {"uso": "XXX"})
+
+
+def test_index_of_enum():
+    uso = index(UsoCFDI)
+    assert index(UsoCFDI) is uso
+    assert len(uso) == len(UsoCFDI)
+    assert uso.get("D01") is UsoCFDI.D01
+    assert uso.describe("G02") == "Devoluciones, descuentos o bonificaciones"
+    assert uso.get("XXX") is None and uso.describe("XXX") is None
+    with pytest.raises(TypeError):
+        uso.entries["XXX"] = CatalogEntry("XXX")  # type: ignore
+
+
+def test_validate_codes():
+    codes = ["G01", "XXX", "CN01", "", "g01"]
+    assert validate_codes(UsoCFDI, codes) == [True, False, True, False, False]
+    assert validate_codes(index(UsoCFDI), iter(codes)) == [True, False, True, False, False]
+
+
+def test_file_catalog_round_trip(catalog_file):
+    catalog = read_catalog(catalog_file)
+    assert catalog.name == "c_ClaveProdServ"
+    assert list(catalog.entries.values()) == ENTRIES
+    assert catalog.describe("10101500") == "Animales vivos de granja"
+    assert catalog.describe("43211500") is None
+    assert catalog.is_valid("10101501")
+    assert not catalog.is_valid("10101501", on=date(2022, 6, 1))
+    assert catalog.is_valid("10101500", on=date(2022, 6, 1))
+    assert not catalog.is_valid("99999999")
+
+
+def test_descriptions_are_written_in_one_line(tmp_path):
+    write_catalog(tmp_path / "c.tsv.gz", [CatalogEntry("1", "Con\ttabulador y\nsalto")])
+    assert read_catalog(tmp_path / "c.tsv.gz").describe("1") == "Con tabulador y salto"
+
+
+def test_file_catalog_is_lazy(catalog_file):
+    catalog = FileCatalog("c_ClaveProdServ")
+    catalog.configure(catalog_file)
+    assert not catalog.loaded
+    assert validate_codes(catalog, ["10101500", "1010150"]) == [True, False]
+    assert catalog.loaded
+    assert catalog.get("10101501").valid_until == date(2021, 12, 31)
+    catalog.configure(None)
+    assert not catalog.loaded
+
+
+def test_file_catalog_from_directory(catalog_file, monkeypatch):
+    monkeypatch.setenv(CATALOGS_DIR_ENV_VAR, str(catalog_file.parent))
+    catalog = FileCatalog("c_ClaveProdServ")
+    assert "01010101" in catalog and len(catalog) == len(ENTRIES)
+
+
+def test_file_catalog_not_available(tmp_path, monkeypatch):
+    monkeypatch.delenv(CATALOGS_DIR_ENV_VAR, raising=False)
+    assert not ClaveProdServ.loaded
+    catalog = FileCatalog("c_ClaveUnidad")
+    with pytest.raises(CatalogNotAvailableError):
+        catalog.is_valid("H87")
+    monkeypatch.setenv(CATALOGS_DIR_ENV_VAR, str(tmp_path))
+    with pytest.raises(CatalogNotAvailableError, match="c_ClaveUnidad.tsv.gz"):
+        validate_codes(catalog, ["H87"])
+
+
+def test_file_catalog_availability_is_checked_once_per_configuration(tmp_path, catalog_file, monkeypatch):
+    checked = []
+    isfile = os.path.isfile
+    monkeypatch.setattr(os.path, "isfile", lambda path: checked.append(path) or isfile(path))
+    monkeypatch.setenv(CATALOGS_DIR_ENV_VAR, str(tmp_path / "missing"))
+    catalog = FileCatalog("c_ClaveProdServ")
+    assert not any(catalog.available for _ in range(5))
+    assert len(checked) == 2  # the packed file and the gzipped one
+    monkeypatch.setenv(CATALOGS_DIR_ENV_VAR, str(tmp_path))
+    assert catalog.available and catalog.available and len(checked) == 4
+    catalog.configure(tmp_path / "missing.tsv.gz")
+    assert not catalog.available and not catalog.available and len(checked) == 5
+
+
+@pytest.fixture
+def store_file(tmp_path):
+    path = tmp_path / "c_ClaveProdServ.bin"
+    pack_catalog(path, reversed(ENTRIES))
+    return path
+
+
+def test_store_matches_entries(store_file):
+    store = CatalogStore(store_file)
+    assert store.name == "c_ClaveProdServ"
+    assert len(store) == len(ENTRIES)
+    assert list(store) == [entry.code for entry in ENTRIES]
+    for entry in ENTRIES:
+        assert entry.code in store
+        assert store.get(entry.code) == entry
+        assert store.describe(entry.code) == entry.description
+    assert not store.is_valid("10101501", on=date(2022, 6, 1))
+    store.close()
+
+
+@mark.parametrize(
+    "code", ["", "0", "00000000", "0101010", "010101010", "10101502", "99999999", "1010150ñ", None, 10101500]
+)
+def test_store_unknown_codes(store_file, code):
+    store = CatalogStore(store_file)
+    assert code not in store
+    assert store.get(code) is None and store.describe(code) is None
+    assert not store.is_valid(code)
+
+
+def test_store_of_many_blocks(tmp_path):
+    codes = [f"{i:05d}" for i in range(0, 3000, 3)]
+    pack_catalog(tmp_path / "c.bin", [CatalogEntry(code, f"CP {code}") for code in codes])
+    store = CatalogStore(tmp_path / "c.bin")
+    candidates = [f"{i:05d}" for i in range(-1, 3002)]
+    assert validate_codes(store, candidates) == [code in set(codes) for code in candidates]
+    assert store.describe("02997") == "CP 02997"
+
+
+def test_store_ignores_codes_across_two(tmp_path):
+    pack_catalog(tmp_path / "c.bin", [CatalogEntry("12"), CatalogEntry("34")])
+    assert "23" not in CatalogStore(tmp_path / "c.bin")
+
+
+def test_store_of_other_file(catalog_file):
+    with pytest.raises(ValueError):
+        CatalogStore(catalog_file)
+
+
+def test_pack_from_command_line(catalog_file, tmp_path, capsys):
+    main([str(catalog_file), str(tmp_path / "packed.bin")])
+    assert "4 codes" in capsys.readouterr().out
+    store = CatalogStore(tmp_path / "packed.bin", "c_ClaveProdServ")
+    assert validate_codes(store, ["43211500", "4321150"]) == [True, False]
+
+
+def test_file_catalog_prefers_store(catalog_file, store_file, monkeypatch):
+    write_catalog(catalog_file, ENTRIES[:1])
+    monkeypatch.setenv(CATALOGS_DIR_ENV_VAR, str(store_file.parent))
+    catalog = FileCatalog("c_ClaveProdServ")
+    assert catalog.path == str(store_file)
+    assert isinstance(catalog.index, CatalogStore) and len(catalog) == len(ENTRIES)
+
+
+@pytest.fixture
+def codigos_postales(tmp_path):
+    path = tmp_path / "c_CodigoPostal.bin"
+    pack_catalog(path, [CatalogEntry("06300"), CatalogEntry("99999")])
+    CodigoPostal.configure(path)
+    yield CodigoPostal
+    CodigoPostal.configure(None)
+
+
+@mark.parametrize("path", ["tests/samples/cfdv33-base.xml", "tests/samples/cfdv40-min.xml"])
+def test_schemas_check_configured_catalogs(path, codigos_postales):
+    # 45079 is not in the catalog
+    with pytest.raises(InvalidCFDIError):
+        read_xml(path)
+    assert read_xml(path, validate=False).lugar_expedicion == "45079"
+    codigos_postales.configure(None)
+    assert read_xml(path).lugar_expedicion == "45079"
+
+
+def test_schemas_with_configured_catalogs(codigos_postales):
+    cfdi = read_xml("tests/samples/comercio_exterior.xml")
+    assert codigos_postales.loaded and cfdi.lugar_expedicion in codigos_postales
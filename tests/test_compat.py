@@ -0,0 +1,53 @@
+import os
+
+import pydantic
+import pytest
+from typing_extensions import Annotated
+
+from cfdibills.schemas import compat
+from cfdibills.schemas.compat import (
+    BaseModel,
+    Field,
+    ValidationError,
+    constr,
+    parse_model,
+    validate_field,
+)
+
+ThreeLetters = constr(pattern=r"[A-Z]{3}", strip_whitespace=True)
+
+
+class Model(BaseModel):
+    code: Annotated[str, Field(max_length=5, pattern=r"[0-9]+")]
+    rfc: ThreeLetters  # type: ignore
+
+
+def test_backend():
+    selected_v1 = os.environ.get(compat.BACKEND_ENV_VAR) == "1"
+    assert compat.PYDANTIC_V2 == (pydantic.VERSION.startswith("2.") and not selected_v1)
+    assert issubclass(Model, BaseModel)
+
+
+@pytest.mark.parametrize(
+    "data, valid",
+    [
+        ({"code": "123", "rfc": " ABC "}, True),
+        ({"code": "abc", "rfc": "ABC"}, False),
+        ({"code": "123456", "rfc": "ABC"}, False),
+        ({"code": "123", "rfc": "abc"}, False),
+    ],
+)
+def test_patterns(data, valid):
+    if valid:
+        assert parse_model(Model, data).rfc == "ABC"
+    else:
+        with pytest.raises(ValidationError):
+            parse_model(Model, data)
+
+
+def test_validate_field():
+    model = parse_model(Model, {"code": "123", "rfc": "ABC"})
+    assert validate_field(model, "rfc", " XYZ") == "XYZ" and model.rfc == "XYZ"
+    with pytest.raises(ValidationError):
+        validate_field(model, "code", "x")
+    assert model.code == "123"
@@ -0,0 +1,75 @@
+from typing import Optional
+
+import pytest
+
+from cfdibills.io import _xml_to_json, read_xml
+from cfdibills.schemas import complementos
+from cfdibills.schemas.cfdi40 import CFDI40
+from cfdibills.schemas.compat import BaseModel, dump_model, parse_model
+from cfdibills.schemas.complementos import (
+    TimbreFiscalDigital,
+    get_complemento_model,
+    parse_complementos,
+    register_complemento,
+)
+
+TIMBRE = _xml_to_json("tests/samples/cfdv40-ejemplo-signed-tfd.xml")["comprobante"]["complemento"]
+
+
+class Leyendas(BaseModel):
+    version: str
+    leyenda: Optional[str] = None
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(complementos, "_complementos", dict(complementos._complementos))
+
+
+def test_get_complemento_model():
+    assert get_complemento_model("tfd:TimbreFiscalDigital") is TimbreFiscalDigital
+    assert get_complemento_model("timbre_fiscal_digital") is TimbreFiscalDigital
+    assert get_complemento_model("leyendasFisc:LeyendasFiscales") is None
+
+
+def test_parse_complementos_by_name():
+    parsed = parse_complementos(TIMBRE)
+    assert len(parsed) == 1 and isinstance(parsed[0], TimbreFiscalDigital)
+
+
+def test_unknown_complemento_is_not_matched_by_its_fields():
+    # an unknown complemento with the same fields of a TimbreFiscalDigital must not become one
+    unknown = {"otro_timbre": TIMBRE["timbre_fiscal_digital"]}
+    assert parse_complementos(unknown) == [TIMBRE["timbre_fiscal_digital"]]
+
+
+def test_register_complemento(registry):
+    cfdi = _xml_to_json("tests/samples/cfdv40-ejemplo-signed-tfd.xml")["comprobante"]
+    cfdi["complemento"]["leyendas_fiscales"] = [{"version": "1.0", "leyenda": "a"}, {"version": "1.0"}]
+    register_complemento("leyendasFisc:LeyendasFiscales", Leyendas)
+    parsed = parse_model(CFDI40, cfdi)
+    assert [type(complemento) for complemento in parsed.complemento] == [TimbreFiscalDigital, Leyendas, Leyendas]
+    assert parsed.get_complemento(Leyendas).leyenda == "a"
+
+
+def test_parse_complementos_without_names():
+    timbre = parse_model(TimbreFiscalDigital, TIMBRE["timbre_fiscal_digital"])
+    parsed = parse_complementos([TIMBRE["timbre_fiscal_digital"], timbre, {"custom": 1}])
+    assert parsed == [timbre, timbre, {"custom": 1}]
+    assert parsed[1] is timbre
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_unregistered_complemento_is_kept_as_dict(lazy):
+    with open("tests/samples/cfdv40-ejemplo-signed-tfd.xml", "rb") as f:
+        content = f.read()
+    pagos = (
+        b'<pago20:Pagos xmlns:pago20="http://www.sat.gob.mx/Pagos20" Version="2.0">'
+        b'<pago20:Totales MontoTotalPagos="10.00"/></pago20:Pagos></cfdi:Complemento>'
+    )
+    cfdi = read_xml(content.replace(b"</cfdi:Complemento>", pagos), lazy=lazy)
+    timbre, pagos = cfdi.complemento
+    assert isinstance(timbre, TimbreFiscalDigital)
+    assert pagos == {"version": "2.0", "totales": {"monto_total_pagos": "10.00"}}
+    assert dump_model(cfdi)["complemento"][1] == pagos
+    assert "monto_total_pagos" in repr(cfdi)
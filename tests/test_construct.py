@@ -0,0 +1,43 @@
+import glob
+from decimal import Decimal
+
+import pytest
+
+from cfdibills import read_many, read_xml
+from cfdibills.errors import InvalidCFDIError
+from cfdibills.io import _get_cfdi_with_version, _parse_cfdi, _xml_to_json
+from cfdibills.schemas.complementos import TimbreFiscalDigital
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("tests/samples/*.xml")))
+def test_construct_matches_validation(path):
+    constructed = read_xml(path, validate=False)
+    validated = read_xml(path)
+    assert type(constructed) is type(validated)
+    assert constructed == validated
+    # repr also compares the types of the values (i.e. Decimal and float)
+    assert repr(constructed) == repr(validated)
+
+
+def test_construct_types():
+    cfdi = read_xml("tests/samples/cfdv40-ejemplo-signed-tfd.xml", validate=False)
+    assert isinstance(cfdi.total, Decimal)
+    assert isinstance(cfdi.get_complemento(TimbreFiscalDigital), TimbreFiscalDigital)
+    # mutable defaults are not shared between instances
+    first, second = [read_xml("tests/samples/cfdv40-min.xml", validate=False) for _ in range(2)]
+    assert first.informacion_global == [] and first.informacion_global is not second.informacion_global
+
+
+def test_construct_invalid_values():
+    cfdi, version = _get_cfdi_with_version(_xml_to_json("tests/samples/cfdv40-min.xml"))
+    with pytest.raises(InvalidCFDIError):
+        _parse_cfdi({**cfdi, "total": "not a number"}, version, validate=False)
+    missing = dict(cfdi)
+    del missing["emisor"]
+    with pytest.raises(InvalidCFDIError):
+        _parse_cfdi(missing, version, validate=False)
+
+
+def test_read_many_without_validation():
+    results = list(read_many("tests/samples", workers=1, validate=False))
+    assert [result.cfdi for result in results] == [read_xml(result.path) for result in results]
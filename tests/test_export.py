@@ -0,0 +1,85 @@
+import glob
+from decimal import Decimal
+
+import pytest
+from pytest import mark
+
+from cfdibills import read_xml
+from cfdibills.export import LEVELS, _value, iter_batches, schema, to_parquet, to_tables
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+PATHS = sorted(glob.glob("tests/samples/*.xml"))
+
+
+def _expected_rows(cfdis):
+    conceptos = [concepto for cfdi in cfdis for concepto in cfdi.conceptos]
+    impuestos = [
+        tax
+        for concepto in conceptos
+        if concepto.impuestos is not None
+        for tax in concepto.impuestos.traslados + concepto.impuestos.retenciones
+    ]
+    return {"comprobante": len(cfdis), "concepto": len(conceptos), "impuesto": len(impuestos)}
+
+
+def test_tables_have_a_row_per_item():
+    cfdis = [read_xml(path) for path in PATHS]
+    tables = to_tables(cfdis)
+    assert set(tables) == set(LEVELS)
+    for level, rows in _expected_rows(cfdis).items():
+        assert tables[level].num_rows == rows
+    comprobante = tables["comprobante"].to_pylist()
+    assert [row["total"] for row in comprobante] == [cfdi.total for cfdi in cfdis]
+    assert [row["version"] for row in comprobante] == [cfdi.version for cfdi in cfdis]
+
+
+def test_schemas_are_stable():
+    empty = to_tables([])
+    only_33 = to_tables(["tests/samples/cfdv33-min.xml"])
+    only_40 = to_tables(["tests/samples/cfdv40-min.xml"])
+    for level in LEVELS:
+        assert empty[level].schema == only_33[level].schema == only_40[level].schema == schema(level)
+    assert only_33["comprobante"].column("exportacion").to_pylist() == [None]
+    assert only_40["comprobante"].column("exportacion").to_pylist() == ["03"]
+
+
+def test_paths_and_cfdis_give_the_same_tables():
+    assert to_tables(PATHS) == to_tables([read_xml(path) for path in PATHS])
+    assert to_tables(PATHS, validate=False) == to_tables(PATHS)
+
+
+def test_contents_give_the_same_tables():
+    contents = []
+    for path in PATHS:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+    assert to_tables(contents) == to_tables(PATHS)
+
+
+@mark.parametrize("batch_size", [1, 2, 4, 100])
+def test_batches_are_bounded(batch_size):
+    batches = list(iter_batches(PATHS, batch_size=batch_size))
+    assert len(batches) == -(-len(PATHS) // batch_size)
+    assert all(batch["comprobante"].num_rows <= batch_size for batch in batches)
+    assert sum(batch["comprobante"].num_rows for batch in batches) == len(PATHS)
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        next(iter_batches(PATHS, batch_size=0))
+
+
+def test_to_parquet(tmp_path):
+    paths = to_parquet(PATHS, tmp_path / "export", batch_size=3, compression="zstd")
+    tables = to_tables(PATHS)
+    for level in LEVELS:
+        written = pq.read_table(paths[level])
+        assert written.schema.equals(schema(level))
+        assert written.equals(tables[level])
+
+
+def test_values_fit_their_columns():
+    assert _value(Decimal("1.1234567")) == Decimal("1.123457")
+    assert _value(Decimal("1.5")) == Decimal("1.5")
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+
+from pytest import mark
+
+#: Max cumulative import time (in ms) of the modules of cfdibills. The budgets are loose so the tests are not flaky,
+#: but they are still far below what importing pydantic, requests or the schemas takes.
+BUDGETS_MS = {
+    "import cfdibills": 30,
+    "from cfdibills import verify": 80,
+}
+#: Modules that must not be imported until they are needed
+DEFERRED = ["pydantic", "requests", "xmltodict", "asyncio", "cfdibills.schemas", "cfdibills.io"]
+
+
+def _import_time(statement: str) -> float:
+    """
+    Cumulative time in ms to import the modules of cfdibills executing ``statement`` in a new interpreter, as
+    reported by ``python -X importtime``.
+    """
+    run = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True)
+    total = 0
+    for line in run.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # only the top level imports, as the cumulative time already includes the nested ones
+        if name.strip().startswith("cfdibills") and not name.startswith("  ", 1):
+            total += int(cumulative)
+    return total / 1000
+
+
+@mark.parametrize("statement", BUDGETS_MS.keys())
+def test_import_time(statement):
+    # the best of some runs, as the first one may read the files from disk
+    assert min(_import_time(statement) for _ in range(3)) < BUDGETS_MS[statement]
+
+
+@mark.parametrize("statement", BUDGETS_MS.keys())
+def test_dependencies_are_deferred(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    assert [module for module in DEFERRED if module in loaded] == []
+
+
+def test_lazy_attributes():
+    import cfdibills
+    import cfdibills.schemas
+    from cfdibills.io import read_xml
+    from cfdibills.schemas.catalogs import UsoCFDI
+    from cfdibills.schemas.complementos import TimbreFiscalDigital
+    from cfdibills.verifiers import verify_many
+
+    assert cfdibills.read_xml is read_xml
+    assert cfdibills.verify_many is verify_many and "verify_many" in cfdibills.__all__
+    assert cfdibills.__version__ and "verify" in dir(cfdibills)
+    assert cfdibills.schemas.UsoCFDI is UsoCFDI
+    assert cfdibills.schemas.TimbreFiscalDigital is TimbreFiscalDigital
+    assert cfdibills.schemas.cfdi40.CFDI40.__name__ == "CFDI40"
+    for module, name in [(cfdibills, "nothing"), (cfdibills.schemas, "nothing"), (cfdibills.schemas, "_private")]:
+        assert not hasattr(module, name)
+
+
+def test_star_import_of_schemas():
+    namespace: dict = {}
+    exec("from cfdibills.schemas import *", namespace)
+    assert {"cfdi33", "cfdi40", "UsoCFDI", "TimbreFiscalDigital", "CatalogEnum"} <= namespace.keys()
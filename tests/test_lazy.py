@@ -0,0 +1,49 @@
+import pytest
+from pytest import mark
+
+from cfdibills import read_xml
+from cfdibills.errors import InvalidCFDIError
+from cfdibills.schemas.cfdi33 import CFDI33
+from cfdibills.schemas.cfdi40 import CFDI40
+from cfdibills.schemas.compat import dump_model
+from cfdibills.schemas.complementos import ComercioExterior, TimbreFiscalDigital
+from cfdibills.schemas.lazy import LazyCFDI40
+
+
+@mark.parametrize(
+    "path, cfdi_type",
+    [
+        ("tests/samples/cfdv40-ejemplo-signed-tfd.xml", CFDI40),
+        ("tests/samples/cfdv33-signed-tfd.xml", CFDI33),
+        ("tests/samples/aerolineas.xml", CFDI33),
+        ("tests/samples/comercio_exterior.xml", CFDI33),
+    ],
+)
+def test_lazy_matches_eager(path, cfdi_type):
+    lazy = read_xml(path, lazy=True)
+    assert isinstance(lazy, cfdi_type)
+    assert set(lazy._pending) >= {"conceptos", "complemento"}
+    assert lazy.emisor == read_xml(path).emisor
+    assert "conceptos" in lazy._pending
+    assert lazy == read_xml(path)
+    assert not lazy._pending
+
+
+def test_lazy_nodes_validated_on_access():
+    cfdi = read_xml("tests/samples/comercio_exterior.xml", lazy=True)
+    assert isinstance(cfdi.get_complemento(ComercioExterior), ComercioExterior)
+    assert "complemento" not in cfdi._pending and "conceptos" in cfdi._pending
+    assert cfdi.get_complemento(TimbreFiscalDigital) is cfdi.get_complemento(TimbreFiscalDigital)
+
+
+def test_lazy_invalid_node():
+    cfdi = read_xml("tests/samples/cfdv40-ejemplo-signed-tfd.xml", lazy=True)
+    cfdi._pending["conceptos"] = {"concepto": [{"clave_prod_serv": "01010101"}]}
+    with pytest.raises(InvalidCFDIError):
+        cfdi.conceptos
+
+
+def test_lazy_assignment():
+    cfdi = LazyCFDI40.parse_lazy(dump_model(read_xml("tests/samples/cfdv40-min.xml")))
+    cfdi.conceptos = []
+    assert cfdi.conceptos == [] and cfdi.materialize().conceptos == []
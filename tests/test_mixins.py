@@ -1,10 +1,13 @@
 import datetime
 from collections import namedtuple
 from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
 
 import pytest
 from pytest import mark
 
+from cfdibills import read_xml
 from cfdibills.errors import ComplementoNotFoundError
 from cfdibills.schemas import Aerolineas, Impuesto, TimbreFiscalDigital
 from cfdibills.schemas.mixins import CFDIMixin
@@ -14,7 +17,7 @@ from tests.utils import does_not_raise
 @dataclass
 class DummyTax:
     impuesto: Impuesto
-    importe: float
+    importe: Optional[Decimal]
 
 
 @dataclass
@@ -37,13 +40,15 @@ def generate_dummy_cfdi(with_taxes: bool = True):
     if with_taxes:
         taxes = {
             "traslados": [
-                DummyTax(impuesto=Impuesto.iva, importe=50),
-                DummyTax(impuesto=Impuesto.iva, importe=20),
-                DummyTax(impuesto=Impuesto.ieps, importe=20),
+                DummyTax(impuesto=Impuesto.iva, importe=Decimal("50.10")),
+                DummyTax(impuesto=Impuesto.iva, importe=Decimal("19.90")),
+                DummyTax(impuesto=Impuesto.iva, importe=None),
+                DummyTax(impuesto=Impuesto.ieps, importe=Decimal("20")),
             ],
             "retenciones": [
-                DummyTax(impuesto=Impuesto.iva, importe=50),
-                DummyTax(impuesto=Impuesto.isr, importe=20),
+                DummyTax(impuesto=Impuesto.iva, importe=Decimal("0.1")),
+                DummyTax(impuesto=Impuesto.iva, importe=Decimal("0.2")),
+                DummyTax(impuesto=Impuesto.isr, importe=Decimal("20")),
             ],
         }
         dummy.impuestos = namedtuple("Impuestos", taxes.keys())(*taxes.values())  # type: ignore
@@ -61,21 +66,30 @@ def generate_dummy_cfdi(with_taxes: bool = True):
         (generate_dummy_cfdi(with_taxes=False), Impuesto.iva, 0),
     ],
 )
-def test_total_transferred_tax(dummy, tax: Impuesto, amount: float):
-    assert dummy.get_total_transferred_tax(tax) == amount
+def test_total_transferred_tax(dummy, tax: Impuesto, amount: Decimal):
+    total = dummy.get_total_transferred_tax(tax)
+    assert total == amount and isinstance(total, Decimal)
 
 
 @mark.parametrize(
     "dummy, tax, amount",
     [
-        (generate_dummy_cfdi(), Impuesto.iva, 50),
+        (generate_dummy_cfdi(), Impuesto.iva, Decimal("0.3")),
         (generate_dummy_cfdi(), Impuesto.ieps, 0),
         (generate_dummy_cfdi(), Impuesto.isr, 20),
         (generate_dummy_cfdi(with_taxes=False), Impuesto.iva, 0),
     ],
 )
-def test_total_withheld_tax(dummy, tax: Impuesto, amount: float):
-    assert dummy.get_total_withheld_tax(tax) == amount
+def test_total_withheld_tax(dummy, tax: Impuesto, amount: Decimal):
+    total = dummy.get_total_withheld_tax(tax)
+    assert total == amount and isinstance(total, Decimal)
+
+
+@mark.parametrize("path", ["tests/samples/aerolineas.xml", "tests/samples/cfdv40-ejemplo.xml"])
+def test_taxes_are_exact(path):
+    cfdi = read_xml(path)
+    assert cfdi.get_total_transferred_tax(Impuesto.iva) == cfdi.impuestos.total_impuestos_trasladados
+    assert all(isinstance(concepto.valor_unitario, Decimal) for concepto in cfdi.conceptos)
 
 
 @mark.parametrize(
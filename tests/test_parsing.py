@@ -1,14 +1,34 @@
+import glob
+import io
+import tracemalloc
+import zipfile
+
+import pytest
 from devtools import debug
 from pytest import mark
 
-from cfdibills import read_xml
+from cfdibills import read_many, read_xml
+from cfdibills.errors import InvalidCFDIError, UnsupportedCFDIError
+from cfdibills.io import (
+    VerificationKey,
+    _get_key_index,
+    _normalize_key,
+    _xml_to_json,
+    iter_conceptos,
+    normalize_dict_keys,
+    read_header,
+    read_verification_key,
+)
 from cfdibills.schemas.cfdi33 import CFDI33
 from cfdibills.schemas.cfdi40 import CFDI40
+from cfdibills.schemas.compat import dump_model
 from cfdibills.schemas.complementos import (
     Aerolineas,
     CertificadoDeDestruccion,
     ComercioExterior,
+    TimbreFiscalDigital,
 )
+from cfdibills.schemas.naming import camel_to_snake
 from tests.utils import does_not_raise
 
 
@@ -41,3 +61,277 @@ def test_complementos(path, complement_type):
     with does_not_raise():
         cfdi = debug(read_xml(path))
         cfdi.get_complemento(complement_type)
+
+
+@mark.parametrize(
+    "path",
+    [
+        "tests/samples/cfdv40-min.xml",
+        "tests/samples/cfdv40-ejemplo.xml",
+        "tests/samples/cfdv40-ejemplo-signed-tfd.xml",
+        "tests/samples/cfdv33-base.xml",
+        "tests/samples/cfdv33-min.xml",
+        "tests/samples/cfdv33-signed-tfd.xml",
+        "tests/samples/aerolineas.xml",
+        "tests/samples/certificado_de_destruccion.xml",
+        "tests/samples/comercio_exterior.xml",
+    ],
+)
+def test_single_pass_normalization(path):
+    expected = normalize_dict_keys(_xml_to_json(path, normalize=False))
+    assert _xml_to_json(path) == expected
+
+
+def _traced_memory(function, *args):
+    """Calls ``function`` tracing its memory. Returns the memory kept by its result and the peak, in bytes."""
+    tracemalloc.start()
+    try:
+        result = function(*args)  # noqa: F841
+        return tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+
+def _normalize_in_two_passes(path):
+    return normalize_dict_keys(_xml_to_json(path, normalize=False))
+
+
+@mark.parametrize("path", glob.glob("tests/samples/*.xml"))
+def test_normalization_memory(path):
+    # warm up the caches of the keys
+    _xml_to_json(path)
+    _, peak = _traced_memory(_xml_to_json, path)
+    _, two_passes_peak = _traced_memory(_normalize_in_two_passes, path)
+    assert peak < two_passes_peak
+
+
+def test_normalization_memory_has_no_intermediate_tree(tmp_path):
+    path = _many_conceptos(tmp_path, 3000)
+    _xml_to_json(path)
+    kept, peak = _traced_memory(_xml_to_json, path)
+    # a second copy of the tree would take as much as the result
+    assert peak - kept < kept / 2
+    kept, peak = _traced_memory(_normalize_in_two_passes, path)
+    assert peak - kept > kept
+
+
+def test_malformed_xml(tmp_path):
+    path = tmp_path / "malformed.xml"
+    path.write_text("<cfdi:Comprobante Version='4.0'>")
+    with pytest.raises(InvalidCFDIError):
+        read_xml(str(path))
+
+
+@mark.parametrize("key", ["Version", "UsoCFDI", "NoCertificadoSAT", "TUA", "TimbreFiscalDigital", "AddendaCustomKey"])
+def test_normalize_key(key):
+    assert _normalize_key(key) == camel_to_snake(key)
+
+
+def test_key_index_matches_conversion():
+    for key, normalized in _get_key_index().items():
+        assert camel_to_snake(key) == normalized
+
+
+@mark.parametrize("workers, ordered", [(1, True), (2, True), (2, False)])
+def test_read_many(tmp_path, workers, ordered):
+    samples = sorted(glob.glob("tests/samples/*.xml"))
+    invalid = tmp_path / "invalid.xml"
+    invalid.write_text("<cfdi:Comprobante xmlns:cfdi='http://www.sat.gob.mx/cfd/4' Version='9.9'/>")
+    paths = samples + [str(invalid)]
+    results = list(read_many(paths, workers=workers, ordered=ordered, chunksize=2))
+    if ordered:
+        assert [result.path for result in results] == paths
+    assert {result.path for result in results} == set(paths)
+    for result in results:
+        if result.path == str(invalid):
+            assert isinstance(result.error, UnsupportedCFDIError) and result.cfdi is None
+        else:
+            assert isinstance(result.cfdi, (CFDI33, CFDI40)) and result.error is None
+
+
+def test_read_many_glob():
+    results = list(read_many("tests/samples/cfdv40-*.xml", workers=1))
+    assert [result.path for result in results] == sorted(glob.glob("tests/samples/cfdv40-*.xml"))
+    assert len(list(read_many("tests/samples", workers=1))) == len(glob.glob("tests/samples/*.xml"))
+
+
+def _sources(path: str) -> list:
+    """Every kind of in-memory source of the XML in ``path``"""
+    with open(path, "rb") as f:
+        content = f.read()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("cfdi.xml", content)
+    return [
+        content,
+        bytearray(content),
+        memoryview(content),
+        memoryview(b"garbage" + content)[7:],
+        io.BytesIO(content),
+        zipfile.ZipFile(archive).open("cfdi.xml"),
+    ]
+
+
+@mark.parametrize("path", glob.glob("tests/samples/*.xml"))
+def test_read_xml_from_memory(path):
+    cfdi = dump_model(read_xml(path))
+    for source in _sources(path):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        assert dump_model(read_xml(source)) == cfdi
+    assert _xml_to_json(_sources(path)[2], normalize=False) == _xml_to_json(path, normalize=False)
+
+
+def test_read_xml_from_memory_malformed():
+    with pytest.raises(InvalidCFDIError):
+        read_xml(b"<cfdi:Comprobante")
+    with pytest.raises(InvalidCFDIError):
+        read_xml(io.BytesIO(b""))
+
+
+@mark.parametrize("workers", [1, 2])
+def test_read_many_from_memory(workers):
+    paths = sorted(glob.glob("tests/samples/*.xml"))
+    sources = [source for path in paths for source in _sources(path)[:5]] + [b"<invalid"]
+    results = list(read_many(sources, workers=workers, chunksize=3))
+    assert [result.index for result in results] == list(range(len(sources)))
+    assert all(result.path is None for result in results)
+    expected = [dump_model(read_xml(path)) for path in paths]
+    assert [dump_model(result.cfdi) for result in results[:-1]] == [cfdi for cfdi in expected for _ in range(5)]
+    assert isinstance(results[-1].error, InvalidCFDIError)
+
+
+def test_read_many_mixed_sources():
+    path = "tests/samples/cfdv40-min.xml"
+    with open(path, "rb") as f:
+        results = list(read_many([path, f, memoryview(b"<invalid")], workers=2, ordered=False))
+    assert sorted((result.index, result.path, result.error is None) for result in results) == [
+        (0, path, True),
+        (1, None, True),
+        (2, None, False),
+    ]
+
+
+@mark.parametrize("source", [b"<cfdi:Comprobante/>", io.BytesIO(b"<cfdi:Comprobante/>")])
+def test_read_many_single_xml(source):
+    with pytest.raises(TypeError):
+        next(read_many(source, workers=1))
+
+
+@mark.parametrize(
+    "path",
+    [
+        "tests/samples/cfdv40-ejemplo-signed-tfd.xml",
+        "tests/samples/cfdv33-signed-tfd.xml",
+        "tests/samples/aerolineas.xml",
+        "tests/samples/comercio_exterior.xml",
+    ],
+)
+def test_read_verification_key(path):
+    cfdi = read_xml(path)
+    key = read_verification_key(path)
+    assert all(read_verification_key(source) == key for source in _sources(path))
+    assert key._replace(uuid=key.uuid.lower()) == VerificationKey(
+        str(cfdi.get_complemento(TimbreFiscalDigital).uuid),
+        cfdi.emisor.rfc,
+        cfdi.receptor.rfc,
+        cfdi.total,
+        cfdi.version,
+    )
+
+
+def test_read_verification_key_missing_timbre():
+    with pytest.raises(InvalidCFDIError):
+        read_verification_key("tests/samples/cfdv40-min.xml")
+
+
+def _many_conceptos(tmp_path, count: int) -> str:
+    """Writes cfdv40-min.xml with its concepto repeated ``count`` times"""
+    with open("tests/samples/cfdv40-min.xml", encoding="utf-8") as f:
+        xml = f.read()
+    start, end = xml.index("<cfdi:Concepto "), xml.index("</cfdi:Conceptos>")
+    path = tmp_path / "many.xml"
+    path.write_text(xml[:start] + xml[start:end] * count + xml[end:], encoding="utf-8")
+    return str(path)
+
+
+@mark.parametrize("path", glob.glob("tests/samples/*.xml"))
+@mark.parametrize("validate", [True, False])
+def test_iter_conceptos_and_read_header(path, validate):
+    cfdi = read_xml(path, validate=validate)
+    assert list(iter_conceptos(path, validate=validate)) == cfdi.conceptos
+    header = read_header(path, validate=validate)
+    assert header.conceptos == []
+    assert {**dump_model(header), "conceptos": dump_model(cfdi)["conceptos"]} == dump_model(cfdi)
+
+
+def test_iter_conceptos_from_memory(tmp_path, monkeypatch):
+    # small chunks, so the conceptos are split across them
+    monkeypatch.setattr("cfdibills.io._STREAM_CHUNK_SIZE", 100)
+    path = _many_conceptos(tmp_path, 5)
+    conceptos = list(iter_conceptos(path))
+    header = dump_model(read_header(path))
+    for source in _sources(path):
+        assert list(iter_conceptos(source)) == conceptos
+    for source in _sources(path):
+        assert dump_model(read_header(source)) == header
+
+
+def test_iter_conceptos_memory_is_bounded(tmp_path):
+    path = _many_conceptos(tmp_path, 3000)
+    peaks = []
+    for read in [read_xml, lambda path: sum(1 for _ in iter_conceptos(path))]:
+        tracemalloc.start()
+        try:
+            read(path)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    whole, streamed = peaks
+    assert streamed < whole / 10
+
+
+def test_iter_conceptos_invalid(tmp_path):
+    path = _many_conceptos(tmp_path, 3)
+    with open(path, encoding="utf-8") as f:
+        xml = f.read()
+    (tmp_path / "invalid.xml").write_text(xml.replace('Cantidad="1.5"', 'Cantidad="-1"', 1), encoding="utf-8")
+    with pytest.raises(InvalidCFDIError, match="Concepto 0"):
+        next(iter_conceptos(str(tmp_path / "invalid.xml")))
+    (tmp_path / "unsupported.xml").write_text(xml.replace('Version="4.0"', 'Version="3.2"'), encoding="utf-8")
+    with pytest.raises(UnsupportedCFDIError):
+        next(iter_conceptos(str(tmp_path / "unsupported.xml")))
+
+
+class _UnreadableFile(io.RawIOBase):
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        raise OSError("Input/output error")
+
+
+@mark.parametrize("workers", [1, 2])
+def test_read_many_unreadable_sources(tmp_path, workers):
+    missing = str(tmp_path / "missing.xml")
+    sources = [missing, "tests/samples/cfdv40-min.xml", _UnreadableFile()]
+    results = list(read_many(sources, workers=workers, chunksize=1))
+    assert isinstance(results[0].error, FileNotFoundError) and results[0].path == missing
+    assert isinstance(results[1].cfdi, CFDI40)
+    assert isinstance(results[2].error, OSError) and results[2].cfdi is None
+
+
+@mark.parametrize("ordered", [True, False])
+def test_read_many_reads_ahead_a_bounded_window(ordered):
+    taken = []
+
+    def sources():
+        for i in range(50):
+            taken.append(i)
+            yield "tests/samples/cfdv40-min.xml"
+
+    results = read_many(sources(), workers=2, ordered=ordered, chunksize=1)
+    next(results)
+    # 2 chunks per worker, plus the one submitted when the first result was consumed
+    assert len(taken) <= 5
+    assert len(list(results)) == 49 and len(taken) == 50
@@ -0,0 +1,71 @@
+import re
+
+import pytest
+from pytest import mark
+
+from cfdibills.schemas.compat import BaseModel, ValidationError, parse_model
+from cfdibills.schemas.fields import CURP, RFC, Digits5, Text20
+from cfdibills.schemas.patterns import compile_pattern
+
+VALUES = [
+    "",
+    "a",
+    "12345",
+    "123456",
+    "1234",
+    "abc|d",
+    "|",
+    "a" * 20,
+    "a" * 21,
+    "12a45",
+    "ABCde",
+    "１２３４５",
+    "²2345",
+    " 1234",
+]
+
+
+@mark.parametrize("pattern", [r"[^|]{1,20}", r"[0-9]{5}", r"[0-9]{1,150}", r"[0-9a-zA-Z]{5}", r"[A-Z]{2}[0-9]{3}"])
+@mark.parametrize("value", VALUES)
+def test_compile_pattern_matches_regex(pattern, value):
+    assert compile_pattern(pattern)(value) == (re.fullmatch(pattern, value) is not None)
+
+
+def test_compile_pattern_cached():
+    assert compile_pattern(r"[0-9]{5}") is compile_pattern(r"[0-9]{5}")
+
+
+class Model(BaseModel):
+    rfc: RFC  # type: ignore
+    curp: CURP  # type: ignore
+    codigo_postal: Digits5  # type: ignore
+    unidad: Text20  # type: ignore
+
+
+VALID = {"rfc": " EKU9003173C9", "curp": "GOMC800101HDFRRR09", "codigo_postal": "01000", "unidad": "Pieza"}
+
+
+@mark.parametrize(
+    "field, value, valid",
+    [
+        ("rfc", "EKU9003173C9", True),
+        ("rfc", "EKU9003173C9XYZ", False),
+        ("curp", "GOMC800101HDFRRR09", True),
+        ("curp", "GOMC800101HDFRRR0", False),
+        ("codigo_postal", "010000", False),
+        ("codigo_postal", "0100a", False),
+        ("unidad", "Pieza|Caja", False),
+        ("unidad", "x" * 21, False),
+    ],
+)
+def test_patterns_match_whole_value(field, value, valid):
+    data = {**VALID, field: value}
+    if valid:
+        assert getattr(parse_model(Model, data), field) == value
+    else:
+        with pytest.raises(ValidationError):
+            parse_model(Model, data)
+
+
+def test_pattern_strips_whitespace():
+    assert parse_model(Model, VALID).rfc == "EKU9003173C9"
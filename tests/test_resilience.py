@@ -0,0 +1,213 @@
+import asyncio
+import time
+from decimal import Decimal
+
+import pytest
+import requests
+from pytest import mark
+
+from cfdibills import api, verify
+from cfdibills.errors import CircuitOpenError, SATServiceError
+from cfdibills.io import VerificationKey
+from cfdibills.resilience import (
+    CircuitBreaker,
+    Resilience,
+    RetryPolicy,
+    TokenBucket,
+    is_transient,
+)
+from cfdibills.testing import SATStandIn
+
+#: Backoffs short enough for the tests
+FAST = dict(base_delay=0.001, max_delay=0.005)
+
+
+def _failing(*errors: BaseException):
+    calls = []
+
+    def call():
+        calls.append(None)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return call, calls
+
+
+def _keys(count: int):
+    return [
+        VerificationKey(f"00000000-0000-4000-8000-{i:012d}", "AAA010101AAA", "XAXX010101000", Decimal(i), "4.0")
+        for i in range(count)
+    ]
+
+
+@mark.parametrize(
+    "error, expected",
+    [
+        (SATServiceError("", status_code=500), True),
+        (SATServiceError("", status_code=503), True),
+        (SATServiceError("", status_code=429), True),
+        (SATServiceError("", status_code=400), False),
+        (SATServiceError("unknown format"), True),
+        (CircuitOpenError("down"), False),
+        (ConnectionResetError(), True),
+        (requests.ConnectionError(), True),
+        (requests.Timeout(), True),
+        (requests.exceptions.InvalidURL(), False),
+        (ValueError("missing details"), False),
+    ],
+)
+def test_is_transient(error, expected):
+    assert is_transient(error) is expected
+
+
+def test_backoff():
+    policy = RetryPolicy(base_delay=1, multiplier=2, max_delay=5, jitter=False)
+    assert [policy.backoff(retry) for retry in range(1, 5)] == [1, 2, 4, 5]
+    assert policy.backoff(1, SATServiceError("", 503, retry_after=3)) == 3
+    assert policy.backoff(1, SATServiceError("", 503, retry_after=60)) == 5
+    jittered = RetryPolicy(base_delay=1, multiplier=2, max_delay=5)
+    assert all(0 <= jittered.backoff(3) <= 4 for _ in range(100))
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
+
+
+def test_retries_until_success():
+    resilience = Resilience(RetryPolicy(**FAST))
+    call, calls = _failing(SATServiceError("", 503), SATServiceError("unknown format"))
+    assert resilience.call(call) == "ok"
+    metrics = resilience.metrics
+    assert (metrics.attempts, metrics.retries, metrics.throttles, metrics.failures) == (3, 2, 1, 0)
+    assert metrics.breaker_state == CircuitBreaker.CLOSED
+
+
+@mark.parametrize(
+    "error, attempts", [(SATServiceError("", 400), 1), (KeyError("Estado"), 1), (SATServiceError("", 500), 3)]
+)
+def test_gives_up(error, attempts):
+    resilience = Resilience(RetryPolicy(attempts=3, **FAST))
+    call, calls = _failing(*[error] * 5)
+    with pytest.raises(type(error)):
+        resilience.call(call)
+    assert len(calls) == resilience.metrics.attempts == attempts
+    assert resilience.metrics.failures == 1
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    resilience = Resilience(RetryPolicy(attempts=1), breaker=breaker)
+    call, calls = _failing(*[SATServiceError("", 500)] * 3)
+    for _ in range(2):
+        with pytest.raises(SATServiceError):
+            resilience.call(call)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        resilience.call(call)
+    assert len(calls) == 2 and resilience.metrics.rejected == 1
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # a failed probe opens it again
+    with pytest.raises(SATServiceError):
+        resilience.call(call)
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opened == 2
+
+    time.sleep(0.06)
+    assert resilience.call(call) == "ok"
+    metrics = resilience.metrics
+    assert (metrics.breaker_state, metrics.breaker_opened, metrics.failures) == (CircuitBreaker.CLOSED, 2, 4)
+
+
+def test_circuit_breaker_lets_a_single_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+
+
+def test_retries_stop_when_the_breaker_opens():
+    resilience = Resilience(RetryPolicy(attempts=10, **FAST), breaker=CircuitBreaker(failure_threshold=3))
+    call, calls = _failing(*[SATServiceError("", 500)] * 10)
+    with pytest.raises(CircuitOpenError):
+        resilience.call(call)
+    assert len(calls) == 3
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, capacity=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.01, abs=0.002) and waits[3] == pytest.approx(0.02, abs=0.002)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_rate_limit():
+    resilience = Resilience(rate=50, burst=1)
+    start = time.perf_counter()
+    for _ in range(5):
+        resilience.call(lambda: None)
+    assert time.perf_counter() - start >= 0.07
+    assert resilience.metrics.rate_limited == 4 and resilience.metrics.rate_limited_seconds > 0
+
+
+@mark.parametrize("error_status", [500, 503])
+def test_verify_against_a_failing_sat(error_status):
+    resilience = Resilience(RetryPolicy(attempts=20, **FAST), breaker=CircuitBreaker(failure_threshold=20), seed=1)
+    with SATStandIn(error_rate=0.3, error_status=error_status, seed=1) as sat:
+        responses = [verify(key, url=sat.url, resilience=resilience) for key in _keys(20)]
+    assert all(response.estado == "Vigente" for response in responses)
+    metrics = resilience.metrics
+    assert sat.errors > 0 and metrics.retries == sat.errors and metrics.attempts == sat.requests
+    assert metrics.throttles == (sat.errors if error_status == 503 else 0)
+
+
+def test_verify_many_async_against_a_failing_sat():
+    pytest.importorskip("httpx")
+    from cfdibills.verifiers import verify_many_async
+
+    resilience = Resilience(RetryPolicy(attempts=20, **FAST), breaker=CircuitBreaker(failure_threshold=20), seed=1)
+    with SATStandIn(error_rate=0.3, seed=1) as sat:
+        responses = asyncio.run(verify_many_async(_keys(20), concurrency=5, url=sat.url, resilience=resilience))
+    assert all(response.estado == "Vigente" for response in responses)
+    assert sat.errors > 0 and resilience.metrics.retries == sat.errors
+
+
+def test_verify_fails_fast_when_sat_is_down():
+    resilience = Resilience(RetryPolicy(attempts=2, **FAST), breaker=CircuitBreaker(failure_threshold=4))
+    with SATStandIn(error_rate=1) as sat:
+        results = []
+        for key in _keys(5):
+            with pytest.raises(ValueError) as error:
+                verify(key, url=sat.url, resilience=resilience)
+            results.append(type(error.value))
+    assert results == [SATServiceError, SATServiceError, CircuitOpenError, CircuitOpenError, CircuitOpenError]
+    assert sat.requests == 4
+
+
+def test_non_transient_errors_dont_reset_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=3)
+    resilience = Resilience(RetryPolicy(attempts=1), breaker=breaker)
+    errors = [SATServiceError("", 500), SATServiceError("", 500), SATServiceError("", 400), SATServiceError("", 500)]
+    call, calls = _failing(*errors)
+    for error in errors:
+        with pytest.raises(type(error)):
+            resilience.call(call)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_timeouts_are_retried_until_the_breaker_opens():
+    resilience = Resilience(RetryPolicy(attempts=3, **FAST), breaker=CircuitBreaker(failure_threshold=3))
+    values = ("ea8152af-b116-4812-817a-3b4f9617c99c", "AAA010101AAA", "XAXX010101000", 150.5)
+    with SATStandIn(latency=0.3) as sat:
+        with pytest.raises(requests.Timeout):
+            resilience.call(api.consulta_cfdi_service, *values, url=sat.url, timeout=0.05)
+        with pytest.raises(CircuitOpenError):
+            resilience.call(api.consulta_cfdi_service, *values, url=sat.url, timeout=0.05)
+        assert sat.requests <= 3
+    metrics = resilience.metrics
+    assert (metrics.attempts, metrics.retries, metrics.rejected) == (3, 2, 1)
+    assert metrics.breaker_state == CircuitBreaker.OPEN
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+from pytest import mark
+
+from cfdibills import api, verify
+from cfdibills.api import SAT_URL, sat_url
+from cfdibills.io import VerificationKey
+from cfdibills.testing import ESTADOS, SATStandIn, consulta_response
+
+CANCELADO = "ea8152af-b116-4812-817a-3b4f9617c99c"
+NO_ENCONTRADO = "9fe7a7ea-e4d3-4e5b-b0e1-e4f1c0d1a0a2"
+
+
+def _key(uuid: str) -> VerificationKey:
+    return VerificationKey(uuid, "AAA010101AAA", "XAXX010101000", Decimal("150.5"), "4.0")
+
+
+@pytest.fixture
+def sat():
+    with SATStandIn(statuses={CANCELADO: "Cancelado", NO_ENCONTRADO.upper(): "No Encontrado"}) as stand_in:
+        yield stand_in
+
+
+@mark.parametrize("estado", list(ESTADOS))
+def test_consulta_response_is_parsed(estado):
+    assert api._parse_consulta_response(consulta_response(estado)).estado == estado
+
+
+def test_sat_url(monkeypatch):
+    monkeypatch.delenv(api.SAT_URL_ENV_VAR, raising=False)
+    assert sat_url() == SAT_URL
+    monkeypatch.setenv(api.SAT_URL_ENV_VAR, "http://localhost:8080")
+    assert sat_url() == "http://localhost:8080"
+    assert sat_url("http://proxy") == "http://proxy"
+
+
+@mark.parametrize(
+    "uuid, expected",
+    [(CANCELADO, "Cancelado"), (NO_ENCONTRADO, "No Encontrado"), ("00000000-0000-0000-0000-000000000000", "Vigente")],
+)
+def test_verify(sat, uuid, expected):
+    assert verify(_key(uuid), url=sat.url).estado == expected
+    assert sat.requests == 1 and sat.errors == 0
+
+
+def test_verify_with_environment_variable(sat, monkeypatch):
+    monkeypatch.setenv(api.SAT_URL_ENV_VAR, sat.url)
+    assert verify(_key(CANCELADO)).estado == "Cancelado"
+    assert sat.requests == 1
+
+
+def test_errors():
+    with SATStandIn(error_rate=1) as sat:
+        with pytest.raises(ValueError):
+            verify(_key(CANCELADO), url=sat.url)
+    assert sat.requests == sat.errors == 1
+
+
+def test_latency():
+    with SATStandIn(latency=(0.05, 0.06), seed=1) as sat:
+        start = time.perf_counter()
+        verify(_key(CANCELADO), url=sat.url)
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_threaded_clients(sat):
+    keys = [_key(CANCELADO), _key(NO_ENCONTRADO)] * 10
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        estados = [response.estado for response in pool.map(lambda key: verify(key, url=sat.url), keys)]
+    assert estados == ["Cancelado", "No Encontrado"] * 10
+    assert sat.requests == 20
+
+
+def test_async_clients(sat):
+    pytest.importorskip("httpx")
+    from cfdibills.verifiers import verify_many_async
+
+    keys = [_key(CANCELADO), _key(NO_ENCONTRADO)] * 10
+    responses = asyncio.run(verify_many_async(keys, concurrency=5, url=sat.url))
+    assert [response.estado for response in responses] == ["Cancelado", "No Encontrado"] * 10
+    assert sat.requests == 20
+
+
+@mark.parametrize("options", [dict(default="Pendiente"), dict(statuses={CANCELADO: "cancelado"}), dict(error_rate=1.5)])
+def test_invalid_options(options):
+    with pytest.raises(ValueError):
+        SATStandIn(**options)
+
+
+def test_restart():
+    sat = SATStandIn()
+    with sat, pytest.raises(RuntimeError):
+        sat.start()
+    sat.stop()
+    with sat:
+        assert verify(_key(CANCELADO), url=sat.url).estado == "Vigente"
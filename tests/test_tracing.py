@@ -0,0 +1,105 @@
+import os
+import threading
+import types
+
+import pytest
+from pytest import mark
+
+from cfdibills import api, read_xml
+from cfdibills.errors import InvalidCFDIError
+from cfdibills.tracing import OpenTelemetryHook, Tracer, get_tracer, tracing
+from tests.utils import sat_response
+
+SAMPLE = "tests/samples/cfdv40-ejemplo-signed-tfd.xml"
+
+
+def test_disabled_by_default():
+    assert get_tracer() is None
+    read_xml(SAMPLE)
+    with tracing() as tracer:
+        assert get_tracer() is tracer
+    assert get_tracer() is None and len(tracer.spans) == 0
+
+
+@mark.parametrize("validate", [True, False])
+def test_read_xml_stages(validate):
+    with tracing() as tracer:
+        cfdi = read_xml(SAMPLE, validate=validate)
+    assert cfdi == read_xml(SAMPLE)
+    parse, validation = tracer.spans
+    assert parse.name == "read_xml.parse" and validation.name == "read_xml.validate"
+    assert parse.attributes["bytes"] == os.path.getsize(SAMPLE)
+    assert parse.attributes["nodes"] > len(cfdi.conceptos)
+    assert validation.attributes == {"version": "4.0", "validate": validate, "lazy": False}
+    assert parse.start_ns <= validation.start_ns
+    assert set(tracer.durations()) == {"read_xml.parse", "read_xml.validate"}
+    assert all(duration >= 0 for duration in tracer.durations().values())
+
+
+def test_read_xml_from_memory_stages():
+    with open(SAMPLE, "rb") as f:
+        content = f.read()
+    with tracing() as tracer:
+        read_xml(content)
+        read_xml(SAMPLE)
+    assert [span.attributes.get("bytes") for span in tracer.spans] == [len(content), None, len(content), None]
+
+
+def test_failed_stages_are_not_recorded():
+    with tracing() as tracer, pytest.raises(InvalidCFDIError):
+        read_xml(b"<cfdi:Comprobante")
+    assert tracer.spans == []
+
+
+def test_sat_stages(monkeypatch):
+    content = sat_response("Cancelado")
+    monkeypatch.setattr(
+        api.requests, "post", lambda *args, **kwargs: types.SimpleNamespace(status_code=200, content=content, text="")
+    )
+    with tracing() as tracer:
+        response = api.consulta_cfdi_service("uuid", "AAA010101AAA", "XAXX010101000", 10)
+    build, network, parse = tracer.spans
+    assert [build.name, network.name, parse.name] == ["sat.build", "sat.network", "sat.parse"]
+    assert network.attributes == {"bytes_sent": build.attributes["bytes"], "bytes_received": len(content)}
+    assert parse.attributes == {"estado": "Cancelado"}
+    assert network.duration == response.timings.network
+
+
+def test_hooks_and_nested_tracers():
+    hooked = []
+    outer = Tracer(hooks=[hooked.append], keep=False)
+    with tracing(outer):
+        read_xml(SAMPLE)
+        with tracing() as inner:
+            read_xml(SAMPLE)
+        assert get_tracer() is outer
+    assert outer.spans == [] and len(hooked) == 2 and len(inner.spans) == 2
+
+
+def test_tracer_is_scoped_to_its_thread():
+    seen = []
+    with tracing():
+        thread = threading.Thread(target=lambda: seen.append(get_tracer()))
+        thread.start()
+        thread.join()
+    assert seen == [None]
+
+
+def test_opentelemetry_hook():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    with tracing(Tracer(hooks=[OpenTelemetryHook(provider.get_tracer("tests"))])) as tracer:
+        read_xml(SAMPLE)
+    parse, validation = exporter.get_finished_spans()
+    assert [parse.name, validation.name] == ["read_xml.parse", "read_xml.validate"]
+    assert parse.attributes["cfdibills.bytes"] == os.path.getsize(SAMPLE)
+    assert parse.start_time == tracer.spans[0].start_ns
+    assert parse.end_time - parse.start_time == pytest.approx(tracer.spans[0].duration * 1e9, abs=1)
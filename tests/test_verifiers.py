@@ -0,0 +1,170 @@
+import asyncio
+import re
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from cfdibills import read_xml, verifiers
+from cfdibills.api import SATConsultaResponse, consulta_cfdi_service_async
+from cfdibills.cache import MemoryCache
+from cfdibills.errors import ComplementoNotFoundError
+from cfdibills.io import read_verification_key
+from cfdibills.resilience import Resilience, RetryPolicy
+from cfdibills.testing import SATStandIn
+from cfdibills.verifiers import verify_many_async
+from tests.utils import sat_response
+
+if TYPE_CHECKING:
+    import httpx
+else:
+    httpx = pytest.importorskip("httpx")
+
+ESTADOS = {
+    "499e9a70-36ac-448a-bbd9-f3f52102e4be": "Vigente",
+    "ea8152af-b116-4812-817a-3b4f9617c99c": "Cancelado",
+}
+
+
+def _mock_client() -> "httpx.AsyncClient":
+    def handler(request: "httpx.Request") -> "httpx.Response":
+        match = re.search(rb"id=([0-9a-fA-F-]+)", request.content)
+        assert match is not None
+        uuid = match.group(1).decode().lower()
+        return httpx.Response(200, content=sat_response(ESTADOS.get(uuid, "No Encontrado")))
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_consulta_cfdi_service_async():
+    async def run():
+        async with _mock_client() as client:
+            return await consulta_cfdi_service_async(
+                "EA8152AF-B116-4812-817A-3B4F9617C99C", "AAA010101AAA", "XAXX010101000", 150.0, client=client
+            )
+
+    response = asyncio.run(run())
+    assert isinstance(response, SATConsultaResponse)
+    assert response.estado == "Cancelado"
+    assert response.estatus_cancelacion is None
+
+
+def test_consulta_cfdi_service_async_error():
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(500, text="error"))
+        async with httpx.AsyncClient(transport=transport) as client:
+            await consulta_cfdi_service_async("uuid", "AAA010101AAA", "XAXX010101000", 150.0, client=client)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_verify_many_async():
+    signed = [read_xml("tests/samples/cfdv40-ejemplo-signed-tfd.xml"), read_xml("tests/samples/cfdv33-signed-tfd.xml")]
+    unsigned = read_xml("tests/samples/cfdv40-min.xml")
+
+    async def run(**kwargs):
+        async with _mock_client() as client:
+            return await verify_many_async(signed * 3 + [unsigned], concurrency=2, client=client, **kwargs)
+
+    results = asyncio.run(run(return_exceptions=True))
+    assert len(results) == 7
+    assert [result.estado for result in results[:6]] == ["Vigente", "Cancelado"] * 3
+    assert isinstance(results[6], ComplementoNotFoundError)
+    with pytest.raises(ComplementoNotFoundError):
+        asyncio.run(run())
+
+
+def test_verify_many_async_with_cache():
+    cfdis = [read_xml("tests/samples/cfdv40-ejemplo-signed-tfd.xml"), read_xml("tests/samples/cfdv33-signed-tfd.xml")]
+    cache = MemoryCache()
+    calls = []
+
+    def handler(request: "httpx.Request") -> "httpx.Response":
+        calls.append(request)
+        return httpx.Response(200, content=sat_response("Cancelado"))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await verify_many_async(cfdis, client=client, cache=cache)
+
+    assert asyncio.run(run()) == asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_verify_verification_key(monkeypatch):
+    calls = []
+    monkeypatch.setattr(verifiers, "consulta_cfdi_service", lambda *args, **kwargs: calls.append(args))
+    key = read_verification_key("tests/samples/cfdv33-signed-tfd.xml")
+    verifiers.verify(key)
+    assert calls == [(key.uuid, key.rfc_emisor, key.rfc_receptor, key.total)]
+
+
+def test_verify_many():
+    no_encontrado = "9fe7a7ea-e4d3-4e5b-b0e1-e4f1c0d1a0a2"
+    items = [
+        read_xml("tests/samples/cfdv40-ejemplo-signed-tfd.xml"),
+        read_verification_key("tests/samples/cfdv33-signed-tfd.xml"),
+        (no_encontrado, "AAA010101AAA", "XAXX010101000", 150.5),
+        read_xml("tests/samples/cfdv40-min.xml"),
+        (no_encontrado, "AAA010101AAA", None, 150.5),
+    ]
+    with SATStandIn(statuses={**ESTADOS, no_encontrado: "No Encontrado"}) as sat:
+        results = verifiers.verify_many(items * 5, max_workers=3, url=sat.url)
+    assert len(results) == 25 and sat.requests == 15
+    for group in zip(*[iter(results)] * 5):
+        assert [result.estado for result in group[:3]] == ["Vigente", "Cancelado", "No Encontrado"]
+        assert isinstance(group[3], ComplementoNotFoundError) and isinstance(group[4], ValueError)
+
+
+def test_verify_many_reuses_a_session_per_thread(monkeypatch):
+    sessions = []
+
+    class Session(requests.Session):
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+            sessions.append(self)
+
+        def post(self, *args, **kwargs):
+            self.calls += 1
+            return super().post(*args, **kwargs)
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    monkeypatch.setattr(requests, "Session", Session)
+    key = read_verification_key("tests/samples/cfdv33-signed-tfd.xml")
+    with SATStandIn(latency=0.001) as sat:
+        results = verifiers.verify_many([key] * 20, max_workers=2, url=sat.url)
+    assert [result.estado for result in results] == ["Vigente"] * 20
+    assert 1 <= len(sessions) <= 2 and sum(session.calls for session in sessions) == 20
+    assert all(session.closed for session in sessions)
+
+
+def test_verify_many_with_cache_and_resilience():
+    key = read_verification_key("tests/samples/cfdv33-signed-tfd.xml")
+    resilience = Resilience(RetryPolicy(attempts=10, base_delay=0.001, max_delay=0.005))
+    with SATStandIn(error_rate=0.5, seed=2) as sat:
+        results = verifiers.verify_many(
+            [key, key], max_workers=1, url=sat.url, cache=MemoryCache(), resilience=resilience
+        )
+    assert [result.estado for result in results] == ["Vigente"] * 2
+    assert sat.requests - sat.errors == 1 and resilience.metrics.attempts == sat.requests
+
+
+def test_verify_many_invalid_workers():
+    with pytest.raises(ValueError):
+        verifiers.verify_many([], max_workers=0)
+
+
+def test_verify_many_timeout():
+    key = read_verification_key("tests/samples/cfdv33-signed-tfd.xml")
+    with SATStandIn(latency=0.3) as sat:
+        start = time.perf_counter()
+        results = verifiers.verify_many([key] * 4, max_workers=2, timeout=0.05, url=sat.url)
+        elapsed = time.perf_counter() - start
+    assert all(isinstance(result, requests.Timeout) for result in results)
+    assert elapsed < 0.3
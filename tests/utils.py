@@ -4,3 +4,15 @@ from contextlib import contextmanager
 @contextmanager
 def does_not_raise():
     yield
+
+
+def sat_response(estado: str = "Vigente", es_cancelable: str = "Cancelable con aceptación") -> bytes:
+    """Builds the body of a response of SAT's ConsultaCFDIService"""
+    return f"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<ConsultaResponse xmlns="http://tempuri.org/"><ConsultaResult
+xmlns:a="http://schemas.datacontract.org/2004/07/Sat.Cfdi.Negocio.ConsultaCfdi.Servicio"
+xmlns:i="http://www.w3.org/2001/XMLSchema-instance">
+<a:CodigoEstatus>S - Comprobante obtenido satisfactoriamente.</a:CodigoEstatus>
+<a:EsCancelable>{es_cancelable}</a:EsCancelable><a:Estado>{estado}</a:Estado>
+<a:EstatusCancelacion/><a:ValidacionEFOS>200</a:ValidacionEFOS>
+</ConsultaResult></ConsultaResponse></s:Body></s:Envelope>""".encode()